@@ -1,809 +1,1840 @@
-# PyPong Legacy - Beta 0.14
-# Welcome to Pypong!
-# This is a project made by Nihal (Beta 0.14 - Ocean Update)
-# Just hit run to start. Enjoy!
-# PyPong Beta 0.14
-# Nihal Presents - A Classic Revival:
-# PyPong!
-# Made fully in Python + Pygame, no external assets required.
-
-import pygame
-import sys
-import random
-import time
-import math 
-
-# Initialize Pygame
-pygame.init()
-
-# --- Game Constants ---
-SCREEN_WIDTH = 1000
-SCREEN_HEIGHT = 700
-PADDLE_WIDTH = 20
-PADDLE_HEIGHT = 120
-BALL_SIZE = 20
-FPS = 60
-MAX_SCORE = 5 
-
-# Initial speeds
-BALL_INITIAL_SPEED = 7
-PADDLE_SPEED = 8
-
-# AI Speeds for different difficulties
-AI_SPEEDS = {
-    "easy": 6,
-    "medium": 7,
-    "hard": 8
-}
-
-# --- Game Events & Timers ---
-BALL_ACTIVATE_EVENT = pygame.USEREVENT + 1
-ARENA_LOAD_EVENT = pygame.USEREVENT + 2
-LOADING_TIME_MS = 2000 # 2 seconds for the loading screen
-
-# --- Colors (RGB tuples) ---
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0) 
-DARK_GRAY = (30, 30, 30) 
-GRAY = (70, 70, 70)
-LIGHT_GRAY = (150, 150, 150)
-RED = (255, 50, 50) # From Script 1 for splash screen
-ACCENT_COLOR = (0, 200, 200) # Cyan
-ACCENT_DARK = (0, 150, 150) 
-PARTICLE_COLOR = (255, 100, 0) # Orange-red for particles
-
-# --- Arena Colors ---
-BASKETBALL_ORANGE = (255, 140, 0) 
-TABLE_TENNIS_BLUE = (0, 128, 255) 
-ARENA_LINE_COLOR = (255, 255, 255) 
-
-# --- NEW: Ocean Arena Colors ---
-OCEAN_BLUE = (0, 150, 255)       # Bright "summer" blue
-WAVE_COLOR = (200, 230, 255)    # Light blue/white for wave foam
-BALL_YELLOW = (255, 255, 50)    # Bright yellow for high visibility
-
-# --- Set up the display screen ---
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("PyPong - The Classic Arcade Game")
-
-# --- Fonts ---
-font_large = pygame.font.Font(None, 100)
-font_medium = pygame.font.Font(None, 60)
-font_small = pygame.font.Font(None, 35)
-
-# --- Splash Screen Functions (from Script 1) ---
-
-# Fade utility
-def fade(alpha):
-    fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) # Adapted to SCREEN_WIDTH/HEIGHT
-    fade_surface.fill(BLACK)
-    fade_surface.set_alpha(alpha)
-    screen.blit(fade_surface, (0, 0)) # Adapted to use 'screen'
-
-# --- Clean, modern splash screen ---
-def splash_sequence():
-    global game_state, splash_start_time
-    elapsed = time.time() - splash_start_time
-
-    screen.fill(BLACK)
-
-    # Use Pygame’s built-in clean font (no external files)
-    clean_font_large = pygame.font.SysFont("arial", 64, bold=True)
-    clean_font_small = pygame.font.SysFont("arial", 48, bold=True)
-
-    if elapsed < 3:
-        # First splash: "Nihal presents"
-        text_surface = clean_font_large.render("Nihal presents", True, WHITE)
-        text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-        screen.blit(text_surface, text_rect)
-
-        # === Red beam animation (expand & fade) ===
-        beam_length_max = 520
-        beam_height = 5
-        beam_center_y = SCREEN_HEIGHT // 2 + 40
-
-        # Expanding out from center for first 1.5 seconds
-        if elapsed < 1.5:
-            progress = elapsed / 1.5
-            beam_length = int(beam_length_max * progress)
-            alpha = 255
-        else:
-            beam_length = beam_length_max
-            # Then fade out for the last 1.5 seconds
-            fade_progress = min((elapsed - 1.5) / 1.5, 1)
-            alpha = int(255 * (1 - fade_progress))
-
-        # Create beam surface with alpha
-        beam_surface = pygame.Surface((beam_length, beam_height), pygame.SRCALPHA)
-        beam_surface.fill((*RED, alpha))
-        screen.blit(beam_surface, (SCREEN_WIDTH // 2 - beam_length // 2, beam_center_y))
-
-        # Text fade
-        if elapsed < 0.5:
-            fade(255 - int(elapsed * 510))
-        elif elapsed > 2.5:
-            fade(int((elapsed - 2.5) * 510))
-
-    elif elapsed < 6:
-        # Second splash: "A classic revival..."
-        text_surface = clean_font_small.render("A classic revival...", True, WHITE)
-        text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-        screen.blit(text_surface, text_rect)
-
-        # Fade in/out
-        if elapsed < 3.5:
-            fade(255 - int((elapsed - 3) * 510))
-        elif elapsed > 5.5:
-            fade(int((elapsed - 5.5) * 510))
-    else:
-        game_state = "menu"
-
-# --- End of Splash Screen Functions ---
-
-
-class Paddle:
-    """Represents a player's or AI's paddle in the Pong game."""
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, PADDLE_WIDTH, PADDLE_HEIGHT)
-        self.speed = 0
-        self.color = WHITE # NEW: Added color attribute
-
-    def move(self):
-        """Updates the paddle's vertical position and keeps it within screen bounds."""
-        self.rect.y += self.speed
-        if self.rect.top < 0:
-            self.rect.top = 0
-        if self.rect.bottom > SCREEN_HEIGHT:
-            self.rect.bottom = SCREEN_HEIGHT
-
-    def draw(self):
-        """Draws the paddle on the screen with a slight border radius for style."""
-        # MODIFIED: Uses self.color instead of hardcoded WHITE
-        pygame.draw.rect(screen, self.color, self.rect, border_radius=5)
-
-class Ball:
-    """Represents the ball in the Pong game, now with a trail."""
-    def __init__(self):
-        self.rect = pygame.Rect(SCREEN_WIDTH // 2 - BALL_SIZE // 2,
-                                  SCREEN_HEIGHT // 2 - BALL_SIZE // 2,
-                                  BALL_SIZE, BALL_SIZE)
-        self.speed_x = 0
-        self.speed_y = 0
-        self.game_active = False
-        self.current_speed_magnitude = BALL_INITIAL_SPEED 
-        self.trail = [] 
-        self.max_trail_length = 20 
-        self.trail_segment_size = 5 
-        self.color = WHITE # NEW: Added color attribute
-        
-        self.reset_speeds() 
-
-    def reset_speeds(self):
-        """Calculates initial speed vectors with varied angles."""
-        self.current_speed_magnitude = BALL_INITIAL_SPEED 
-        angle = random.uniform(math.pi/6, math.pi/3) 
-        direction_x = random.choice([-1, 1]) 
-        direction_y = random.choice([-1, 1])
-        
-        self.speed_x = direction_x * math.cos(angle) * self.current_speed_magnitude
-        self.speed_y = direction_y * math.sin(angle) * self.current_speed_magnitude
-
-    def move(self):
-        """Moves the ball and updates its trail if the game is active."""
-        if self.game_active:
-            self.rect.x += self.speed_x
-            self.rect.y += self.speed_y
-            self.trail.append(self.rect.center) 
-            if len(self.trail) > self.max_trail_length:
-                self.trail.pop(0) 
-
-    def check_collision(self, paddle1, paddle2, particles_list):
-        """Handles ball collisions and generates particles on paddle hits."""
-        # Wall collisions
-        if self.rect.top <= 0 or self.rect.bottom >= SCREEN_HEIGHT:
-            self.speed_y *= -1
-
-        # Paddle collisions
-        if self.rect.colliderect(paddle1.rect) or self.rect.colliderect(paddle2.rect):
-            
-            for _ in range(10): 
-                particles_list.append(Particle(self.rect.centerx, self.rect.centery))
-
-            self.speed_x *= -1 
-
-            self.current_speed_magnitude += 0.3
-            
-            current_vector_length = (self.speed_x**2 + self.speed_y**2)**0.5
-            
-            if current_vector_length > 0:
-                self.speed_x = (self.speed_x / current_vector_length) * self.current_speed_magnitude
-                self.speed_y = (self.speed_y / current_vector_length) * self.current_speed_magnitude
-            else:
-                self.reset_speeds()
-
-            max_abs_speed = 20 
-            if abs(self.speed_x) > max_abs_speed:
-                self.speed_x = max_abs_speed * (1 if self.speed_x > 0 else -1)
-            if abs(self.speed_y) > max_abs_speed:
-                self.speed_y = max_abs_speed * (1 if self.speed_y > 0 else -1)
-
-    def reset(self):
-        """Resets the ball to the center and clears its trail."""
-        self.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        self.reset_speeds() 
-        self.game_active = False
-        self.trail = [] 
-        pygame.time.set_timer(BALL_ACTIVATE_EVENT, 1500)
-
-    def draw(self):
-        """Draws the ball and its trail using surfaces for transparency."""
-        # Draw trail segments, fading out
-        for i, pos in enumerate(self.trail):
-            alpha = int(255 * (i / self.max_trail_length)) 
-            
-            s = pygame.Surface((self.trail_segment_size * 2, self.trail_segment_size * 2), pygame.SRCALPHA)
-            
-            # MODIFIED: Uses self.color instead of hardcoded WHITE
-            trail_color_with_alpha = (self.color[0], self.color[1], self.color[2], alpha)
-            
-            pygame.draw.circle(s, trail_color_with_alpha, (self.trail_segment_size, self.trail_segment_size),
-                                 self.trail_segment_size)
-            screen.blit(s, (pos[0] - self.trail_segment_size, pos[1] - self.trail_segment_size))
-
-        # Draw the main ball
-        # MODIFIED: Uses self.color instead of hardcoded WHITE
-        pygame.draw.ellipse(screen, self.color, self.rect)
-
-
-class Particle:
-    """Represents a small particle for visual effects."""
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = random.randint(3, 7) 
-        self.color = PARTICLE_COLOR
-        self.velocity_x = random.uniform(-3, 3) 
-        self.velocity_y = random.uniform(-3, 3) 
-        self.lifetime = random.randint(20, 40) 
-        self.age = 0 
-
-    def move(self):
-        """Updates particle position and age."""
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.age += 1
-
-    def draw(self):
-        """Draws the particle, fading out over its lifetime using surfaces for alpha."""
-        alpha = max(0, 255 - int(255 * (self.age / self.lifetime))) 
-        current_color = (self.color[0], self.color[1], self.color[2], alpha)
-        
-        s = pygame.Surface((self.radius * 2, self.radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(s, current_color, (self.radius, self.radius), self.radius)
-        screen.blit(s, (self.x - self.radius, self.y - self.radius))
-
-    def is_dead(self):
-        """Checks if the particle's lifetime has expired."""
-        return self.age >= self.lifetime
-
-
-# --- Initialize Game Objects ---
-paddle1 = Paddle(50, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
-paddle2 = Paddle(SCREEN_WIDTH - 50 - PADDLE_WIDTH, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
-ball = Ball()
-
-# List to hold active particles
-particles = []
-
-# --- Game Variables ---
-player1_score = 0
-player2_score = 0
-
-# Arena Management 
-# NEW: Added "ocean_wave"
-ARENA_STYLES = ["original", "basketball", "table_tennis", "ocean_wave"]
-current_arena = "original" 
-
-# Game State Management
-game_state = "splash" 
-splash_start_time = time.time() 
-
-# Specific game mode details
-current_game_mode = None
-ai_difficulty_level = None 
-current_ai_speed = 0 
-
-# Survival Mode specific variables
-survival_start_time = 0
-survival_time_elapsed = 0
-
-winning_player = None
-
-# --- Button Class for Interactive Menu Elements ---
-class Button:
-    """A clickable button for menu navigation and game state changes."""
-    def __init__(self, x, y, width, height, text, font, action):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.font = font
-        self.action = action 
-        self.color = ACCENT_COLOR
-        self.hover_color = ACCENT_DARK
-        self.text_color = WHITE
-
-    def draw(self, surface):
-        """Draws the button on the given surface."""
-        current_color = self.hover_color if self.rect.collidepoint(pygame.mouse.get_pos()) else self.color
-        pygame.draw.rect(surface, current_color, self.rect)
-        pygame.draw.rect(surface, LIGHT_GRAY, self.rect, 5) # Border
-
-        text_surf = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
-
-    def is_clicked(self, event):
-        """Checks if the button was clicked by the left mouse button."""
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.rect.collidepoint(event.pos):
-                return True
-        return False
-
-# --- Menu Buttons Instances ---
-# Main Menu Buttons 
-single_player_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 80, 300, 70, "Single Player", font_medium, "single_player_difficulty_select")
-two_player_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 20, 300, 70, "Two Player", font_medium, "two_player")
-quit_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 120, 300, 70, "Quit", font_medium, "quit")
-
-# AI Modes Sub-Menu Buttons 
-easy_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 150, 300, 70, "Easy AI", font_medium, "easy")
-medium_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 50, 300, 70, "Medium AI", font_medium, "medium")
-hard_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50, 300, 70, "Hard AI", font_medium, "hard")
-survival_mode_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 150, 300, 70, "Survival Mode", font_medium, "survival")
-back_to_main_menu_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 250, 300, 70, "Back", font_medium, "menu")
-
-# Game Over Screen Buttons 
-play_again_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50, 300, 70, "Play Again", font_medium, "play_again")
-game_over_back_to_menu_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 130, 300, 70, "Back to Menu", font_medium, "menu")
-
-
-# --- Drawing Functions for Different Game States ---
-
-def draw_background():
-    """Draws a subtle gradient background."""
-    for i in range(SCREEN_HEIGHT // 2):
-        color_val = max(0, int(BLACK[0] + (DARK_GRAY[0] - BLACK[0]) * (i / (SCREEN_HEIGHT // 2))))
-        pygame.draw.line(screen, (color_val, color_val, color_val), (0, i), (SCREEN_WIDTH, i))
-        pygame.draw.line(screen, (color_val, color_val, color_val), (0, SCREEN_HEIGHT - 1 - i), (SCREEN_WIDTH, SCREEN_HEIGHT - 1 - i))
-
-
-def draw_arena_elements():
-    """Draws the arena-specific elements based on the current_arena."""
-    
-    if current_arena == "basketball":
-        # Orange themed basketball court
-        line_color = BASKETBALL_ORANGE
-        
-        # Keys (half-court)
-        pygame.draw.rect(screen, line_color, (50, SCREEN_HEIGHT//2 - 100, 150, 200), 5)
-        pygame.draw.rect(screen, line_color, (SCREEN_WIDTH - 200, SCREEN_HEIGHT//2 - 100, 150, 200), 5)
-        
-        # Center circle 
-        pygame.draw.circle(screen, line_color, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 100, 5)
-        
-        # Hoops
-        pygame.draw.circle(screen, PARTICLE_COLOR, (40, SCREEN_HEIGHT//2), 10, 5)
-        pygame.draw.circle(screen, PARTICLE_COLOR, (SCREEN_WIDTH - 40, SCREEN_HEIGHT//2), 10, 5)
-        
-    elif current_arena == "table_tennis":
-        # Table Tennis style: solid blue table area with white lines
-        
-        # 1. Fill the playing area with the Table Tennis Blue
-        pygame.draw.rect(screen, TABLE_TENNIS_BLUE, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        # 2. Draw the white boundary lines (the "table" edge)
-        pygame.draw.rect(screen, ARENA_LINE_COLOR, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), 10)
-        
-        # 3. Draw the center line/net (thick white line)
-        pygame.draw.line(screen, ARENA_LINE_COLOR, (SCREEN_WIDTH // 2, 0), (SCREEN_WIDTH // 2, SCREEN_HEIGHT), 5)
-        
-        # 4. Draw the court dividing line for doubles (the small line per side, usually only in half-court)
-        pygame.draw.line(screen, ARENA_LINE_COLOR, (SCREEN_WIDTH // 2 - 2, 0), (SCREEN_WIDTH // 2 - 2, SCREEN_HEIGHT), 1)
-        pygame.draw.line(screen, ARENA_LINE_COLOR, (SCREEN_WIDTH // 2 + 2, 0), (SCREEN_WIDTH // 2 + 2, SCREEN_HEIGHT), 1)
-        
-    # --- NEW: Ocean Wave Arena ---
-    elif current_arena == "ocean_wave":
-        # 1. Fill the background with the solid Ocean Blue
-        screen.fill(OCEAN_BLUE)
-        
-        # 2. Draw dynamic, oscillating waves
-        current_time = time.time()
-        num_waves = 5
-        # Calculate base positions for the waves, evenly spaced
-        base_y_positions = [y * (SCREEN_HEIGHT // (num_waves + 1)) for y in range(1, num_waves + 1)]
-        
-        for i, y_base in enumerate(base_y_positions):
-            amplitude = 10 + (i % 2) * 4  # Vary amplitude (10 or 14)
-            speed = 1.0 + (i * 0.15)       # Vary speed for each wave
-            phase_shift = i * (math.pi / 2.5) # Vary phase to de-sync waves
-            
-            points = []
-            # Create a list of points for the sine wave
-            for x in range(0, SCREEN_WIDTH + 1, 15): # Segments every 15px
-                y_offset = math.sin((x / 120.0) + current_time * speed + phase_shift) * amplitude
-                y = y_base + y_offset
-                points.append((x, y))
-            
-            # Draw the wave using the list of points
-            pygame.draw.lines(screen, WAVE_COLOR, False, points, 4) # 4px thick line
-            
-    else: # "original" (Default/Fallback)
-        # Draw the original middle line and center circle
-        pygame.draw.line(screen, GRAY, (SCREEN_WIDTH // 2, 0), (SCREEN_WIDTH // 2, SCREEN_HEIGHT), 5)
-        pygame.draw.circle(screen, GRAY, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2), 100, 5)
-
-
-def draw_arena_loading_screen():
-    """Draws the screen that randomly selects and displays the next arena."""
-    draw_background() 
-
-    arena_name = current_arena.replace("_", " ").title()
-    
-    # 1. Loading Text 
-    loading_text = font_large.render("LOADING ARENA...", True, WHITE)
-    loading_rect = loading_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-    screen.blit(loading_text, loading_rect)
-    
-    # 2. Arena Name Reveal
-    arena_text = font_medium.render(f"Arena: {arena_name}", True, ACCENT_COLOR)
-    arena_rect = arena_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-    screen.blit(arena_text, arena_rect)
-    
-    # 3. Simple Animation (Loading dots)
-    dots = int(time.time() * 3) % 4 
-    dots_text = font_medium.render("." * dots, True, LIGHT_GRAY)
-    screen.blit(dots_text, (loading_rect.right + 10, loading_rect.centery - 10))
-
-
-def draw_menu():
-    """Draws the main menu screen."""
-    draw_background()
-
-    title_text = font_large.render("PyPong", True, ACCENT_COLOR)
-    title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 200))
-    screen.blit(title_text, title_rect)
-
-    controls_text = font_small.render("Player 1: UP/DOWN Arrows | Player 2: W/S Keys (2P mode)", True, LIGHT_GRAY)
-    controls_rect = controls_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 140))
-    screen.blit(controls_text, controls_rect)
-
-    single_player_button.draw(screen) 
-    two_player_button.draw(screen)
-    quit_button.draw(screen)
-
-def draw_single_player_difficulty_select_menu():
-    """Draws the Single Player menu (formerly AI Modes)."""
-    draw_background()
-
-    # CLEANED UP HEADER TEXT
-    title_text = font_large.render("Single Player", True, ACCENT_COLOR) 
-    title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 250))
-    screen.blit(title_text, title_rect)
-
-    easy_ai_button.draw(screen)
-    medium_ai_button.draw(screen)
-    hard_ai_button.draw(screen)
-    survival_mode_button.draw(screen)
-    back_to_main_menu_button.draw(screen)
-
-
-def draw_game():
-    """Draws the main game screen, including particles and survival info."""
-    
-    # MODIFIED: Skip default background for ocean_wave arena too
-    if current_arena != "table_tennis" and current_arena != "ocean_wave":
-        draw_background()
-    
-    draw_arena_elements() 
-
-    # Draw paddles and ball
-    paddle1.draw()
-    paddle2.draw()
-    ball.draw()
-
-    # Draw scores for classic modes, or time for survival mode
-    if current_game_mode == "survival":
-        time_text = font_medium.render(f"Time: {int(survival_time_elapsed)}s", True, WHITE)
-        screen.blit(time_text, (SCREEN_WIDTH // 2 - time_text.get_width() // 2, 20))
-        speed_text = font_small.render(f"Speed: {ball.current_speed_magnitude:.1f}", True, LIGHT_GRAY)
-        screen.blit(speed_text, (SCREEN_WIDTH // 2 - speed_text.get_width() // 2, 80))
-    else:
-        # Score text is black on the bright blue table, white otherwise
-        # MODIFIED: White text works for ocean_wave, so this logic is still good.
-        score_color = BLACK if current_arena == "table_tennis" else WHITE 
-        score_text1 = font_medium.render(str(player1_score), True, score_color)
-        screen.blit(score_text1, (SCREEN_WIDTH // 4 - score_text1.get_width() // 2, 20))
-        score_text2 = font_medium.render(str(player2_score), True, score_color)
-        screen.blit(score_text2, (SCREEN_WIDTH * 3 // 4 - score_text2.get_width() // 2, 20))
-
-
-    # Draw particles
-    for particle in particles:
-        particle.draw()
-
-    # If the ball is not active, display "GET READY!"
-    if not ball.game_active:
-        countdown_text = font_large.render("GET READY!", True, LIGHT_GRAY)
-        countdown_rect = countdown_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-        screen.blit(countdown_text, countdown_rect)
-
-def draw_game_over():
-    """Draws the game over screen."""
-    draw_background()
-
-    if current_game_mode == "survival":
-        game_over_text = font_large.render("Time's Up!", True, ACCENT_COLOR)
-        score_text = font_medium.render(f"Survived: {int(survival_time_elapsed)} seconds", True, WHITE)
-        score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-        screen.blit(score_text, score_rect)
-    else:
-        if winning_player:
-            game_over_text = font_large.render(f"{winning_player} Wins!", True, ACCENT_COLOR)
-        else:
-            game_over_text = font_large.render("Game Over", True, ACCENT_COLOR)
-
-    game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-    screen.blit(game_over_text, game_over_rect)
-
-    play_again_button.draw(screen)
-    game_over_back_to_menu_button.draw(screen)
-
-# --- Game Reset Function ---
-def reset_game():
-    """Resets all game parameters for a new game."""
-    global player1_score, player2_score, winning_player, survival_start_time, survival_time_elapsed, particles
-    player1_score = 0
-    player2_score = 0
-    winning_player = None
-    survival_start_time = 0
-    survival_time_elapsed = 0
-    particles = [] 
-    
-    ball.reset()
-    paddle1.rect.midleft = (50, SCREEN_HEIGHT // 2)
-    paddle2.rect.midright = (SCREEN_WIDTH - 50, SCREEN_HEIGHT // 2)
-    paddle1.speed = 0
-    paddle2.speed = 0
-    ball.game_active = False 
-
-    # NEW: Reset colors and trail properties to default
-    ball.color = WHITE
-    paddle1.color = WHITE
-    paddle2.color = WHITE
-    ball.trail_segment_size = 5  # Default size
-    ball.max_trail_length = 20   # Default length
-
-# --- Game Start Handler (Helper function for transition logic) ---
-def start_game_transition():
-    """Selects the arena, resets the game, and starts the loading timer."""
-    global current_arena, game_state, survival_start_time
-    
-    # 1. Pick Arena
-    current_arena = random.choice(ARENA_STYLES)
-    
-    # 2. Reset Game objects (sets all colors/trails to default)
-    reset_game() 
-    
-    # 3. NEW: Apply arena-specific modifications
-    if current_arena == "ocean_wave":
-        ball.color = BALL_YELLOW       # Make ball stand out
-        ball.trail_segment_size = 8    # Bigger "splash" trail
-        ball.max_trail_length = 15     # Shorter "splash" trail
-        # Paddles remain white (set by reset_game)
-    
-    # 4. Set the state and start the timer
-    game_state = "arena_loading"
-    pygame.time.set_timer(ARENA_LOAD_EVENT, LOADING_TIME_MS)
-    survival_start_time = time.time() 
-
-
-# --- Main Game Loop ---
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    # --- Event Handling ---
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            sys.exit()
-
-        if event.type == BALL_ACTIVATE_EVENT: 
-            if not ball.game_active:
-                ball.game_active = True
-                pygame.time.set_timer(BALL_ACTIVATE_EVENT, 0) 
-
-        if event.type == ARENA_LOAD_EVENT: 
-            if game_state == "arena_loading":
-                pygame.time.set_timer(ARENA_LOAD_EVENT, 0)
-                game_state = "game_running"
-
-
-        # Handle button clicks based on current game state
-        if game_state == "menu":
-            if single_player_button.is_clicked(event): 
-                game_state = "single_player_difficulty_select"
-            elif two_player_button.is_clicked(event):
-                current_game_mode = "two_player"
-                start_game_transition()
-            elif quit_button.is_clicked(event):
-                running = False
-                sys.exit()
-
-        elif game_state == "single_player_difficulty_select":
-            if easy_ai_button.is_clicked(event):
-                current_game_mode = "classic_ai"
-                ai_difficulty_level = "easy"
-                current_ai_speed = AI_SPEEDS["easy"]
-                start_game_transition()
-            elif medium_ai_button.is_clicked(event):
-                current_game_mode = "classic_ai"
-                ai_difficulty_level = "medium"
-                current_ai_speed = AI_SPEEDS["medium"]
-                start_game_transition()
-            elif hard_ai_button.is_clicked(event):
-                current_game_mode = "classic_ai"
-                ai_difficulty_level = "hard"
-                current_ai_speed = AI_SPEEDS["hard"]
-                start_game_transition()
-            elif survival_mode_button.is_clicked(event):
-                current_game_mode = "survival"
-                # Survival AI speed is set here
-                ai_difficulty_level = "medium" 
-                current_ai_speed = AI_SPEEDS["medium"]
-                start_game_transition()
-            elif back_to_main_menu_button.is_clicked(event):
-                game_state = "menu"
-
-        elif game_state == "game_over":
-            if play_again_button.is_clicked(event):
-                # Restarts with the same game mode/difficulty but a new arena
-                start_game_transition()
-            
-            elif game_over_back_to_menu_button.is_clicked(event):
-                game_state = "menu"
-                reset_game() 
-
-        # Handle keyboard input for paddles during active game states.
-        if game_state == "game_running":
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    paddle1.speed = -PADDLE_SPEED
-                if event.key == pygame.K_DOWN:
-                    paddle1.speed = PADDLE_SPEED
-                if current_game_mode == "two_player":
-                    if event.key == pygame.K_w:
-                        paddle2.speed = -PADDLE_SPEED
-                    if event.key == pygame.K_s:
-                        paddle2.speed = PADDLE_SPEED
-            if event.type == pygame.KEYUP:
-                if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    paddle1.speed = 0
-                if current_game_mode == "two_player":
-                    if event.key == pygame.K_w or event.key == pygame.K_s:
-                        paddle2.speed = 0
-
-    # --- Game Logic Updates (only if in an active game state) ---
-    if game_state == "game_running":
-        paddle1.move()
-
-        # AI Logic for paddle 2 
-        if current_game_mode in ["classic_ai", "survival"]:
-            
-            # --- AI Difficulty Parameters ---
-            ai_lag = 0      # Reaction delay
-            ai_inaccuracy = 0 # Random vertical offset
-            
-            # Set parameters based on difficulty level for CLASSIC AI MODE
-            if current_game_mode == "classic_ai":
-                if ai_difficulty_level == "easy":
-                    current_ai_speed = AI_SPEEDS["easy"]
-                    ai_lag = 40 
-                    ai_inaccuracy = random.randint(-40, 40) 
-                elif ai_difficulty_level == "medium":
-                    current_ai_speed = AI_SPEEDS["medium"]
-                    ai_lag = 15 
-                    ai_inaccuracy = random.randint(-20, 20) 
-                elif ai_difficulty_level == "hard":
-                    current_ai_speed = AI_SPEEDS["hard"]
-                    ai_lag = 5 
-                    ai_inaccuracy = random.randint(-5, 5) 
-
-            # Set parameters for SURVIVAL MODE (PERFECT AI)
-            elif current_game_mode == "survival":
-                current_ai_speed = AI_SPEEDS["medium"]
-                ai_lag = 0      # Perfect reaction
-                ai_inaccuracy = 0 # Perfect aim
-
-            
-            # --- AI Movement Logic ---
-            if ball.game_active:
-                
-                target_position = ball.rect.centery + ai_inaccuracy
-                
-                if target_position < paddle2.rect.centery - ai_lag:
-                    paddle2.speed = -current_ai_speed
-                elif target_position > paddle2.rect.centery + ai_lag:
-                    paddle2.speed = current_ai_speed
-                else:
-                    paddle2.speed = 0 
-            else:
-                paddle2.speed = 0 
-            
-            paddle2.move()
-        elif current_game_mode == "two_player":
-            paddle2.move() 
-
-        ball.move()
-        ball.check_collision(paddle1, paddle2, particles) 
-
-        # Update and remove dead particles
-        for particle in particles[:]: 
-            particle.move()
-            if particle.is_dead():
-                particles.remove(particle)
-
-        # Scoring Logic
-        if ball.rect.left <= 0: 
-            if current_game_mode == "survival":
-                winning_player = "You" 
-                game_state = "game_over" # Game over
-            else: 
-                player2_score += 1
-                ball.reset()
-        elif ball.rect.right >= SCREEN_WIDTH: 
-            if current_game_mode == "survival":
-                # AI is perfect, so this shouldn't happen unless
-                # the ball spawns weirdly. We just reset.
-                ball.reset()
-            else: 
-                player1_score += 1
-                ball.reset()
-
-        # Game Win Condition
-        if current_game_mode in ["classic_ai", "two_player"]:
-            if player1_score >= MAX_SCORE:
-                winning_player = "Player 1"
-                game_state = "game_over"
-            elif player2_score >= MAX_SCORE:
-                winning_player = "Player 2"
-                game_state = "game_over"
-
-        # Survival Mode Specific Logic (time tracking)
-        if current_game_mode == "survival" and survival_start_time != 0:
-            survival_time_elapsed = time.time() - survival_start_time
-
-    # --- Drawing ---
-    
-    if game_state == "splash":
-        splash_sequence()
-    elif game_state == "menu":
-        draw_menu()
-    elif game_state == "single_player_difficulty_select":
-        draw_single_player_difficulty_select_menu()
-    elif game_state == "arena_loading": 
-        draw_arena_loading_screen()
-    elif game_state == "game_running":
-        draw_game()
-    elif game_state == "game_over":
-        draw_game_over()
-
-    # --- Update Display ---
-    pygame.display.flip()
-
-    # --- Frame Rate Control ---
-    clock.tick(FPS)
-
-# --- Game Exit ---
-pygame.quit()
-
-sys.exit()
+# PyPong Legacy - Beta 0.14
+# Welcome to Pypong!
+# This is a project made by Nihal (Beta 0.14 - Ocean Update)
+# Just hit run to start. Enjoy!
+# PyPong Beta 0.14
+# Nihal Presents - A Classic Revival:
+# PyPong!
+# Made fully in Python + Pygame, no external assets required.
+
+import time
+STARTUP_TIME = time.perf_counter() # Boot clock for the startup metrics, read before pygame loads
+
+import pygame
+import gc
+import os
+import sys
+import random
+import math 
+import itertools
+from array import array
+from collections import deque
+
+# Game rules live in the headless simulation module next to this file
+import pong_sim
+import pong_multiball
+import pong_net
+import pong_text
+import pong_replay
+import pong_profile
+import pong_quality
+import pong_capture
+import pong_shared
+from pong_sim import SCREEN_WIDTH, SCREEN_HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE, BALL_INITIAL_SPEED
+
+# Initialize only what the game uses (the display brings events with it);
+# pygame.init() would also start audio, joystick and other unused subsystems
+pygame.display.init()
+pygame.font.init()
+
+# --- Game Constants ---
+FPS = 60 # Render rate cap; raise it for 144/240 Hz displays, gameplay speed is unaffected
+
+# Physics runs on a fixed timestep, independent of the render rate
+SIM_TICK_RATE = pong_sim.TICK_RATE # Simulation steps per second
+SIM_TICK_SECONDS = 1 / SIM_TICK_RATE
+MAX_CATCH_UP_TICKS = 8 # Most steps run in one frame before a slow machine drops time
+
+# Repaint and upload only the screen regions that changed, where the scene allows it
+DIRTY_RECT_RENDERING = True
+
+# Display: the game is laid out in SCREEN_WIDTH x SCREEN_HEIGHT screen units, the simulation's
+# own. PYPONG_RENDER_SCALE draws the picture at that fraction of them (0.5 for half-res on weak
+# hardware), so the per-frame fill cost follows the render size, not the display's.
+# PYPONG_DISPLAY=fullscreen or <width>x<height> shows it on a display of another size, scaled
+# to fit with black bars: PYPONG_SCALER=fast (nearest pixel) or smooth scales it in software
+# once per frame, =gpu leaves it to SDL's renderer (pygame.SCALED)
+RENDER_SCALE = min(max(float(os.environ.get("PYPONG_RENDER_SCALE") or 1), 0.25), 2.0)
+RENDER_WIDTH = round(SCREEN_WIDTH * RENDER_SCALE)
+RENDER_HEIGHT = round(SCREEN_HEIGHT * RENDER_SCALE)
+DISPLAY = os.environ.get("PYPONG_DISPLAY") or None
+DISPLAY_SCALER = os.environ.get("PYPONG_SCALER", "fast")
+
+# Boot straight to the menu (cabinets can set PYPONG_SKIP_SPLASH=1); any key or click skips it too
+SKIP_SPLASH = os.environ.get("PYPONG_SKIP_SPLASH") == "1"
+
+# Print boot-to-first-frame and boot-to-interactive times (PYPONG_STARTUP_METRICS=1)
+PRINT_STARTUP_METRICS = os.environ.get("PYPONG_STARTUP_METRICS") == "1"
+
+# Folder to save a replay of every finished match in (None keeps only the last one in memory)
+REPLAY_DIR = None
+
+# LAN netplay: PYPONG_NETPLAY=host or join:<host address> turns "Two Player" into a
+# match against another cabinet on pong_net.NETPLAY_PORT; unset, it stays local
+NETPLAY = os.environ.get("PYPONG_NETPLAY")
+
+# Input latency, for competitive cabinets: PYPONG_LATE_INPUT=1 also reads the paddle keys'
+# held state right before every physics tick (pygame.key.get_pressed), not only the key
+# events at the start of the frame, and lets a changed input run the next tick up to
+# EARLY_TICK_SECONDS ahead of time rather than wait a frame for it; PYPONG_BUSY_WAIT=1 paces frames with a busy loop, which
+# starts them on time instead of whenever a coarse sleep returns but keeps a CPU core busy;
+# PYPONG_INPUT_LATENCY=1 prints input-to-display latency percentiles on exit
+LATE_INPUT_SAMPLING = os.environ.get("PYPONG_LATE_INPUT") == "1"
+BUSY_WAIT_PACING = os.environ.get("PYPONG_BUSY_WAIT") == "1"
+REPORT_INPUT_LATENCY = os.environ.get("PYPONG_INPUT_LATENCY") == "1"
+EARLY_TICK_SECONDS = SIM_TICK_SECONDS / 2
+
+# Profiling overlay: per-frame timings of each stage, toggled in game with F3
+PROFILING_ENABLED = False
+PROFILER_TOGGLE_KEY = pygame.K_F3
+PROFILER_OVERLAY_REFRESH = 0.25 # Seconds between overlay text updates
+
+# Screen recording: F9 starts and stops saving every frame as PNGs in a new folder under
+# CAPTURE_DIR; frames the encoders can't keep up with are skipped, never waited for
+CAPTURE_TOGGLE_KEY = pygame.K_F9
+CAPTURE_DIR = "captures"
+
+# State export: PYPONG_SHARED_MEMORY=<name> publishes the match every tick in that shared
+# memory segment (see pong_shared), and PYPONG_SHARED_FRAME=1 adds a downscaled frame
+SHARED_MEMORY = os.environ.get("PYPONG_SHARED_MEMORY")
+SHARED_FRAME = os.environ.get("PYPONG_SHARED_FRAME") == "1"
+SHARED_FRAME_SIZE = (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4)
+
+# Adaptive quality: shed effects, in QUALITY_STEPS order, when frames run close to budget
+QUALITY_GOVERNOR = True
+
+# Particle effects
+PARTICLE_CAPACITY = 1024   # Max live particles in the pool
+PARTICLE_BURST = 10        # Particles emitted per paddle hit
+PARTICLE_ALPHA_STEPS = 32  # Fade levels with a pre-rendered sprite each
+
+# Multi-ball mode draws a short trail behind every ball
+MULTI_BALL_TRAIL_LENGTH = 6
+MULTI_BALL_TRAIL_SEGMENT_SIZE = 4
+
+# Effect settings at full quality, and what each quality tier gives up (first shed first)
+FULL_QUALITY = {
+    "particle_burst": PARTICLE_BURST,
+    "trail_scale": 1.0,          # Fraction of the trail length kept
+    "trail_faded": True,         # Fading alpha trail, or a plain (cheaper to blit) one
+    "ocean_wave_stride": 1,      # Draw every Nth ocean wave
+    "gradient_background": True, # Gradient behind menus, or a flat fill
+}
+QUALITY_STEPS = [
+    ("particle_burst", 4),
+    ("trail_scale", 0.5),
+    ("trail_faded", False),
+    ("ocean_wave_stride", 2),
+    ("gradient_background", False),
+]
+FLAT_BACKGROUND_COLOR = (15, 15, 15)
+
+# --- Game Events & Timers ---
+ARENA_LOAD_EVENT = pygame.USEREVENT + 2
+LOADING_TIME_MS = 2000 # 2 seconds for the loading screen
+
+# --- Colors (RGB tuples) ---
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0) 
+DARK_GRAY = (30, 30, 30) 
+GRAY = (70, 70, 70)
+LIGHT_GRAY = (150, 150, 150)
+RED = (255, 50, 50) # From Script 1 for splash screen
+ACCENT_COLOR = (0, 200, 200) # Cyan
+ACCENT_DARK = (0, 150, 150) 
+PARTICLE_COLOR = (255, 100, 0) # Orange-red for particles
+
+# --- Arena Colors ---
+BASKETBALL_ORANGE = (255, 140, 0) 
+TABLE_TENNIS_BLUE = (0, 128, 255) 
+ARENA_LINE_COLOR = (255, 255, 255) 
+
+# --- NEW: Ocean Arena Colors ---
+OCEAN_BLUE = (0, 150, 255)       # Bright "summer" blue
+WAVE_COLOR = (200, 230, 255)    # Light blue/white for wave foam
+BALL_YELLOW = (255, 255, 50)    # Bright yellow for high visibility
+
+# --- Set up the display screen ---
+# Screen units to render pixels; drawing code places everything through these
+def px(length):
+    """A length or coordinate in screen units, in whole render pixels."""
+    return round(length * RENDER_SCALE)
+
+def line_width(width):
+    """An outline width in render pixels, never thinner than one."""
+    return max(1, px(width))
+
+def to_render(point):
+    """A screen-unit point in render pixels."""
+    return (px(point[0]), px(point[1]))
+
+def to_render_rect(rect):
+    """The render pixels a screen-unit rect covers."""
+    left, top = px(rect[0]), px(rect[1])
+    return pygame.Rect(left, top, px(rect[0] + rect[2]) - left, px(rect[1] + rect[3]) - top)
+
+class DisplayScaler:
+    """Shows the game's fixed-size screen surface on a display of any size.
+
+    Everything is drawn on `surface`, a RENDER_WIDTH x RENDER_HEIGHT surface
+    in the display's pixel format, so drawing costs the same on any display.
+    present() scales it once into the largest centered area of the display
+    with the same aspect ratio; to_logical() maps mouse positions back to
+    screen units.
+    """
+    def __init__(self, smooth=False):
+        self.surface = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT), 0, pygame.display.get_surface())
+        self.scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        self.resize()
+
+    def resize(self):
+        """Fits the picture to the display's current size."""
+        display = pygame.display.get_surface()
+        width, height = display.get_size()
+        factor = min(width / SCREEN_WIDTH, height / SCREEN_HEIGHT)
+        self.target = pygame.Rect(0, 0, max(1, round(SCREEN_WIDTH * factor)), max(1, round(SCREEN_HEIGHT * factor)))
+        self.target.center = (width // 2, height // 2)
+        self._target_surface = display.subsurface(self.target)
+        display.fill(BLACK) # The bars
+        self.full_update = True
+
+    def to_logical(self, pos):
+        """A display position in screen surface coordinates."""
+        return ((pos[0] - self.target.x) * SCREEN_WIDTH // self.target.width,
+                (pos[1] - self.target.y) * SCREEN_HEIGHT // self.target.height)
+
+    def to_display(self, rect):
+        """The display area a screen surface rect is scaled onto, rounded outwards."""
+        target = self.target
+        left = target.x + rect.left * target.width // RENDER_WIDTH
+        top = target.y + rect.top * target.height // RENDER_HEIGHT
+        right = target.x - (-rect.right * target.width // RENDER_WIDTH)
+        bottom = target.y - (-rect.bottom * target.height // RENDER_HEIGHT)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def present(self, rects=None):
+        """Scales the frame onto the display and uploads the `rects` it changed, or all of it."""
+        self.scale(self.surface, self.target.size, self._target_surface)
+        if rects is None or self.full_update:
+            pygame.display.flip()
+            self.full_update = False
+        else:
+            pygame.display.update([self.to_display(rect) for rect in rects])
+
+def open_display():
+    """Opens the display DISPLAY asks for; returns the surface to draw on and the scaler, if any."""
+    render_size = (RENDER_WIDTH, RENDER_HEIGHT)
+    fullscreen = pygame.FULLSCREEN if DISPLAY == "fullscreen" else 0
+    if DISPLAY is None and RENDER_SCALE == 1:
+        return pygame.display.set_mode(render_size), None
+    display_size = None
+    if DISPLAY is None:
+        display_size = (SCREEN_WIDTH, SCREEN_HEIGHT) # A reduced render scaled back up to the usual window
+    elif not fullscreen:
+        display_size = tuple(int(n) for n in DISPLAY.split("x"))
+    if DISPLAY_SCALER == "gpu":
+        surface = pygame.display.set_mode(render_size, pygame.SCALED | fullscreen)
+        if display_size is not None:
+            # SCALED picks an integer multiple of the picture for its window; the renderer
+            # scales to whatever size the window is given
+            from pygame._sdl2.video import Window
+            Window.from_display_module().size = display_size
+        return surface, None
+    pygame.display.set_mode(display_size or (0, 0), fullscreen) # (0, 0): the desktop's resolution
+    scaler = DisplayScaler(smooth=DISPLAY_SCALER == "smooth")
+    return scaler.surface, scaler
+
+screen, display_scaler = open_display()
+pygame.display.set_caption("PyPong - The Classic Arcade Game")
+
+def present_display(rects=None):
+    """Shows the finished frame on the display: all of it, or just the `rects` areas of the screen."""
+    if display_scaler is not None:
+        display_scaler.present(rects)
+    elif rects is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(rects)
+
+def to_logical(position):
+    """A display position (a mouse event's, say) in screen units."""
+    if display_scaler is not None:
+        return display_scaler.to_logical(position)
+    if RENDER_SCALE != 1:
+        # pygame.SCALED reports positions in render pixels
+        return (int(position[0] / RENDER_SCALE), int(position[1] / RENDER_SCALE))
+    return position
+
+def mouse_position():
+    """Where the mouse is, in screen units."""
+    return to_logical(pygame.mouse.get_pos())
+
+# --- Fonts ---
+# Name -> (system font family or None for pygame's default, size in screen units, bold)
+FONT_SPECS = {
+    "large": (None, 100, False),
+    "medium": (None, 60, False),
+    "small": (None, 35, False),
+    # Use Pygame’s built-in clean font (no external files)
+    "splash_large": ("arial", 64, True),
+    "splash_small": ("arial", 48, True),
+    "debug": (None, 22, False),
+}
+_fonts = {}
+
+def get_font(name):
+    """Returns the named font, loading it on first use.
+
+    Each is loaded once; SysFont in particular scans the system fonts on every call.
+    """
+    font = _fonts.get(name)
+    if font is None:
+        family, size, bold = FONT_SPECS[name]
+        size = max(1, px(size))
+        if family is None:
+            font = pygame.font.Font(None, size)
+        else:
+            font = pygame.font.SysFont(family, size, bold=bold)
+        _fonts[name] = font
+    return font
+
+# Every string drawn goes through this cache, so unchanged text is never re-rendered
+text_cache = pong_text.TextCache()
+
+def render_text(font, text, color):
+    """Returns the antialiased text in the named font, rendered only the first time it's seen."""
+    return text_cache.render(get_font(font), text, color)
+
+# --- Splash Screen Functions (from Script 1) ---
+
+# Fade utility
+_fade_surface = None # Full-screen black overlay, made once and re-used at each alpha
+
+def fade(alpha):
+    global _fade_surface
+    if _fade_surface is None or _fade_surface.get_size() != screen.get_size():
+        _fade_surface = pygame.Surface(screen.get_size()).convert()
+        _fade_surface.fill(BLACK)
+    _fade_surface.set_alpha(alpha)
+    screen.blit(_fade_surface, (0, 0)) # Adapted to use 'screen'
+
+# --- Clean, modern splash screen ---
+def splash_sequence():
+    global game_state, splash_start_time
+    elapsed = time.time() - splash_start_time
+
+    screen.fill(BLACK)
+
+    if elapsed < 3:
+        # First splash: "Nihal presents"
+        text_surface = render_text("splash_large", "Nihal presents", WHITE)
+        text_rect = text_surface.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20)))
+        screen.blit(text_surface, text_rect)
+
+        # === Red beam animation (expand & fade) ===
+        beam_length_max = 520
+        beam_height = 5
+        beam_center_y = SCREEN_HEIGHT // 2 + 40
+
+        # Expanding out from center for first 1.5 seconds
+        if elapsed < 1.5:
+            progress = elapsed / 1.5
+            beam_length = int(beam_length_max * progress)
+            alpha = 255
+        else:
+            beam_length = beam_length_max
+            # Then fade out for the last 1.5 seconds
+            fade_progress = min((elapsed - 1.5) / 1.5, 1)
+            alpha = int(255 * (1 - fade_progress))
+
+        # Create beam surface with alpha
+        beam_surface = pygame.Surface((px(beam_length), line_width(beam_height)), pygame.SRCALPHA)
+        beam_surface.fill((*RED, alpha))
+        screen.blit(beam_surface, to_render((SCREEN_WIDTH // 2 - beam_length // 2, beam_center_y)))
+
+        # Text fade
+        if elapsed < 0.5:
+            fade(255 - int(elapsed * 510))
+        elif elapsed > 2.5:
+            fade(int((elapsed - 2.5) * 510))
+
+    elif elapsed < 6:
+        # Second splash: "A classic revival..."
+        text_surface = render_text("splash_small", "A classic revival...", WHITE)
+        text_rect = text_surface.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+        screen.blit(text_surface, text_rect)
+
+        # Fade in/out
+        if elapsed < 3.5:
+            fade(255 - int((elapsed - 3) * 510))
+        elif elapsed > 5.5:
+            fade(int((elapsed - 5.5) * 510))
+    else:
+        game_state = "menu"
+
+# --- End of Splash Screen Functions ---
+
+
+class Paddle:
+    """Draws a player's or AI's paddle from its simulated PaddleState."""
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(x, y, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.color = WHITE # NEW: Added color attribute
+        self.y = y            # Simulated position after the latest tick
+        self.previous_y = y   # ... and after the tick before it
+
+    def sync(self, paddle_state):
+        """Records the simulated position after a tick."""
+        self.previous_y = self.y
+        self.y = paddle_state.y
+
+    def snap(self):
+        """Drops the previous position so the next frame doesn't interpolate from it."""
+        self.previous_y = self.y
+
+    def interpolate(self, alpha):
+        """Places the paddle's Rect `alpha` of the way from the previous tick to the latest."""
+        self.rect.y = self.previous_y + (self.y - self.previous_y) * alpha
+
+    def draw(self):
+        """Draws the paddle on the screen with a slight border radius for style."""
+        # MODIFIED: Uses self.color instead of hardcoded WHITE
+        return pygame.draw.rect(screen, self.color, to_render_rect(self.rect), border_radius=line_width(5))
+
+# --- Ball Trail Sprite Atlas ---
+# Faded trail segments are pre-tinted once per (color, segment size, alpha) and
+# reused, so drawing the trail never allocates a Surface. Sizes are radii in
+# screen units; the sprites are drawn at render size.
+_trail_sprites = {}
+_trail_sprite_rows = {}
+
+def get_trail_sprite(color, size, alpha):
+    """Returns the cached trail segment sprite for a color, radius and alpha."""
+    key = (color, size, alpha)
+    sprite = _trail_sprites.get(key)
+    if sprite is None:
+        radius = line_width(size)
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (color[0], color[1], color[2], alpha), (radius, radius), radius)
+        _trail_sprites[key] = sprite
+    return sprite
+
+def get_plain_trail_sprite(color, size):
+    """Returns the cached unfaded trail segment: an opaque colorkeyed circle, cheaper to blit."""
+    key = (color, size, None)
+    sprite = _trail_sprites.get(key)
+    if sprite is None:
+        colorkey = BLACK if color != BLACK else WHITE
+        radius = line_width(size)
+        sprite = pygame.Surface((radius * 2, radius * 2)).convert()
+        sprite.fill(colorkey)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        _trail_sprites[key] = sprite
+    return sprite
+
+def get_trail_sprite_row(color, size, length, faded=True):
+    """Returns the list of sprites for a whole trail, oldest (most faded) first."""
+    key = (color, size, length, faded)
+    row = _trail_sprite_rows.get(key)
+    if row is None:
+        if faded:
+            row = [get_trail_sprite(color, size, int(255 * (i / length))) for i in range(length)]
+        else:
+            row = [get_plain_trail_sprite(color, size)] * length
+        _trail_sprite_rows[key] = row
+    return row
+
+
+class Ball:
+    """Draws the simulated ball, now with a trail."""
+    def __init__(self):
+        self.rect = pygame.Rect(SCREEN_WIDTH // 2 - BALL_SIZE // 2,
+                                  SCREEN_HEIGHT // 2 - BALL_SIZE // 2,
+                                  BALL_SIZE, BALL_SIZE)
+        self.game_active = False
+        self.current_speed_magnitude = BALL_INITIAL_SPEED 
+        self.trail = deque(maxlen=20) # Ring buffer of recent centers
+        self.trail_length = 20        # Requested length; the quality governor may keep fewer
+        self.trail_scale = 1.0
+        self.trail_faded = True
+        self.trail_segment_size = 5 
+        self.color = WHITE # NEW: Added color attribute
+        self.x, self.y = self.rect.topleft                    # Simulated position after the latest tick
+        self.previous_x, self.previous_y = self.rect.topleft  # ... and after the tick before it
+
+    @property
+    def max_trail_length(self):
+        """How many past positions the trail keeps at full quality."""
+        return self.trail_length
+
+    @max_trail_length.setter
+    def max_trail_length(self, length):
+        self.trail_length = length
+        self._resize_trail()
+
+    def set_trail_quality(self, scale, faded):
+        """Keeps `scale` of the trail length, drawn faded or plain."""
+        self.trail_scale = scale
+        self.trail_faded = faded
+        self._resize_trail()
+
+    def _resize_trail(self):
+        length = max(1, round(self.trail_length * self.trail_scale))
+        if length != self.trail.maxlen:
+            self.trail = deque(self.trail, maxlen=length) # Keeps the newest positions
+
+    def sync(self, ball_state):
+        """Copies the simulated ball after a tick and extends the trail while it is in play."""
+        self.previous_x, self.previous_y = self.x, self.y
+        self.x, self.y = ball_state.x, ball_state.y
+        self.game_active = ball_state.active
+        self.current_speed_magnitude = ball_state.speed_magnitude
+        if self.game_active:
+            # Oldest entry drops off automatically
+            self.trail.append((self.x + BALL_SIZE // 2, self.y + BALL_SIZE // 2))
+
+    def snap(self):
+        """Drops the previous position so the next frame doesn't interpolate from it."""
+        self.previous_x, self.previous_y = self.x, self.y
+
+    def interpolate(self, alpha):
+        """Places the ball's Rect `alpha` of the way from the previous tick to the latest."""
+        self.rect.topleft = (self.previous_x + (self.x - self.previous_x) * alpha,
+                             self.previous_y + (self.y - self.previous_y) * alpha)
+
+    @property
+    def trail_segments(self):
+        return len(self.trail)
+
+    def reset(self):
+        """Clears the trail when the ball goes back to the center."""
+        self.trail.clear() 
+
+    def draw(self):
+        """Draws the ball and its fading trail from the cached sprite atlas; returns the area covered."""
+        # Draw trail segments, fading out
+        size = self.trail_segment_size
+        sprites = get_trail_sprite_row(self.color, size, self.trail.maxlen, self.trail_faded)
+        radius = line_width(size)
+        scale = RENDER_SCALE
+        trail_rects = screen.blits([(sprite, (pos[0] * scale - radius, pos[1] * scale - radius))
+                                    for sprite, pos in zip(sprites, self.trail)])
+
+        # Draw the main ball
+        # MODIFIED: Uses self.color instead of hardcoded WHITE
+        return pygame.draw.ellipse(screen, self.color, to_render_rect(self.rect)).unionall(trail_rects)
+
+
+class BallSwarm:
+    """Draws every ball of a multi-ball match and their trails in one batched blit.
+
+    The trail is a ring buffer of whole ticks (the tick number and the
+    position lists synced then), so extending it costs nothing per ball.
+    A ball's trail only goes back to the tick it was last served.
+    """
+    def __init__(self):
+        self.color = WHITE
+        self.trail_length = MULTI_BALL_TRAIL_LENGTH
+        self.trail_scale = 1.0
+        self.trail_faded = True
+        self.trail_segment_size = MULTI_BALL_TRAIL_SEGMENT_SIZE
+        self.trail = deque(maxlen=MULTI_BALL_TRAIL_LENGTH) # (tick, xs, ys), oldest first
+        self.trail_segments = 0 # Segments drawn last frame
+        self.balls = None
+        self.game_active = False
+        self.x, self.y = [], []                    # Simulated positions after the latest tick
+        self.previous_x, self.previous_y = [], []  # ... and after the tick before it
+        self.alpha = 1.0
+
+    def set_trail_quality(self, scale, faded):
+        """Keeps `scale` of the trail length, drawn faded or plain."""
+        self.trail_scale = scale
+        self.trail_faded = faded
+        length = max(1, round(self.trail_length * scale))
+        if length != self.trail.maxlen:
+            self.trail = deque(self.trail, maxlen=length)
+
+    def sync(self, balls, tick):
+        """Copies the simulated balls after a tick and extends the trail."""
+        self.balls = balls
+        self.previous_x, self.previous_y = self.x, self.y
+        self.x, self.y = balls.x[:], balls.y[:]
+        self.game_active = True in balls.active
+        self.trail.append((tick, self.x, self.y))
+
+    def snap(self):
+        """Drops the previous positions so the next frame doesn't interpolate from them."""
+        self.previous_x, self.previous_y = self.x, self.y
+
+    def interpolate(self, alpha):
+        """Draws the balls `alpha` of the way from the previous tick to the latest."""
+        self.alpha = alpha
+
+    def reset(self):
+        """Clears every trail."""
+        self.trail.clear()
+
+    def draw(self):
+        """Draws the trails, then the balls over them; returns the area covered, or None."""
+        if self.balls is None:
+            return None
+        active, served_at = self.balls.active, self.balls.served_at
+        size = self.trail_segment_size
+        scale = RENDER_SCALE
+        offset = BALL_SIZE // 2 * scale - line_width(size)
+        blit_sequence = []
+        append = blit_sequence.append
+        sprites = get_trail_sprite_row(self.color, size, self.trail.maxlen, self.trail_faded)
+        for sprite, (tick, xs, ys) in zip(sprites, self.trail):
+            for x, y, in_play, served in zip(xs, ys, active, served_at):
+                if in_play and served < tick:
+                    append((sprite, (x * scale + offset, y * scale + offset)))
+        self.trail_segments = len(blit_sequence)
+
+        # The ball sprite is a colorkeyed circle of the ball's size, like the single ball's ellipse
+        sprite = get_plain_trail_sprite(self.color, BALL_SIZE // 2)
+        alpha = self.alpha
+        for x, y, previous_x, previous_y, in_play in zip(self.x, self.y, self.previous_x, self.previous_y, active):
+            if in_play:
+                append((sprite, ((previous_x + (x - previous_x) * alpha) * scale,
+                                 (previous_y + (y - previous_y) * alpha) * scale)))
+        if not blit_sequence:
+            return None
+        rects = screen.blits(blit_sequence)
+        return rects[0].unionall(rects)
+
+
+class ParticleSystem:
+    """A fixed-capacity pool of fading particles stored as parallel arrays.
+
+    Dead particles are swap-removed with the last live one, so the live set is
+    always the first `count` slots and nothing is allocated per frame.
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY, color=PARTICLE_COLOR):
+        self.capacity = capacity
+        self.color = color
+        self.count = 0
+        self.x = array("d", [0.0]) * capacity
+        self.y = array("d", [0.0]) * capacity
+        self.velocity_x = array("d", [0.0]) * capacity
+        self.velocity_y = array("d", [0.0]) * capacity
+        self.age = array("d", [0.0]) * capacity # In pong_sim.TICK_RATE ticks, like the lifetimes
+        self.lifetime = array("i", [0]) * capacity
+        self.radius = array("i", [0]) * capacity
+        self._sprites = {} # (radius, alpha step) -> pre-rendered circle
+        self.rng = random.Random() # Reseeded per match so replays show the same effects
+
+    def emit(self, x, y, amount=PARTICLE_BURST):
+        """Spawns a burst of particles at (x, y); extras are dropped once the pool is full."""
+        amount = min(amount, self.capacity - self.count)
+        for i in range(self.count, self.count + amount):
+            self.x[i] = x
+            self.y[i] = y
+            self.radius[i] = self.rng.randint(3, 7) 
+            self.velocity_x[i] = self.rng.uniform(-3, 3) 
+            self.velocity_y[i] = self.rng.uniform(-3, 3) 
+            self.lifetime[i] = self.rng.randint(20, 40) 
+            self.age[i] = 0 
+        self.count += amount
+
+    def update(self, ticks=1.0):
+        """Moves and ages every live particle by `ticks` pong_sim.TICK_RATE ticks, compacting out the expired ones."""
+        x, y = self.x, self.y
+        velocity_x, velocity_y = self.velocity_x, self.velocity_y
+        age, lifetime, radius = self.age, self.lifetime, self.radius
+
+        i = 0
+        count = self.count
+        while i < count:
+            new_age = age[i] + ticks
+            if new_age >= lifetime[i]:
+                # Swap the last live particle into this slot and process it next
+                count -= 1
+                x[i] = x[count]
+                y[i] = y[count]
+                velocity_x[i] = velocity_x[count]
+                velocity_y[i] = velocity_y[count]
+                age[i] = age[count]
+                lifetime[i] = lifetime[count]
+                radius[i] = radius[count]
+                continue
+            age[i] = new_age
+            x[i] += velocity_x[i] * ticks
+            y[i] += velocity_y[i] * ticks
+            i += 1
+        self.count = count
+
+    def clear(self):
+        """Removes all particles."""
+        self.count = 0
+
+    def _sprite(self, radius, step):
+        """Returns the cached circle sprite for a radius (in screen units) and fade step."""
+        key = (radius, step)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            alpha = step * 255 // (PARTICLE_ALPHA_STEPS - 1)
+            radius = line_width(radius)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*self.color, alpha), (radius, radius), radius)
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface):
+        """Draws every particle, fading out over its lifetime, in one batched blit.
+
+        Returns the area covered, or None when there are no particles.
+        """
+        x, y = self.x, self.y
+        age, lifetime, radius = self.age, self.lifetime, self.radius
+        max_step = PARTICLE_ALPHA_STEPS - 1
+        scale = RENDER_SCALE
+        blit_sequence = []
+        for i in range(self.count):
+            r = radius[i]
+            alpha = 255 - int(255 * age[i] / lifetime[i])
+            offset = line_width(r)
+            blit_sequence.append((self._sprite(r, alpha * max_step // 255), (x[i] * scale - offset, y[i] * scale - offset)))
+        if not blit_sequence:
+            return None
+        rects = surface.blits(blit_sequence)
+        return rects[0].unionall(rects)
+
+
+# --- Initialize Game Objects ---
+paddle1 = Paddle(50, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
+paddle2 = Paddle(SCREEN_WIDTH - 50 - PADDLE_WIDTH, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
+ball = Ball()
+swarm = BallSwarm()
+ball_view = ball # Whichever of the two draws the current match
+
+# Pool holding active particles
+particles = ParticleSystem()
+
+# Effect settings currently in use; the governor lowers them when frames run long
+quality_governor = pong_quality.QualityGovernor(pong_quality.shed_levels(FULL_QUALITY, QUALITY_STEPS), 1000 / FPS)
+quality = quality_governor.settings
+
+# The running match; the menus keep a placeholder one until a game starts
+sim = pong_sim.new_game("two_player", serve_delay=0)
+recorder = pong_replay.ReplayRecorder.for_game(sim, 0, 0)
+last_replay = None # Replay of the most recently finished match
+
+# Netplay session while a LAN match is connecting or running (see NETPLAY)
+netplay = None
+
+# Screen recording in progress, if any (see CAPTURE_TOGGLE_KEY)
+capture = None
+
+# Shared memory the match is published in, if SHARED_MEMORY is set
+shared = None
+shared_frame = None # Downscaled copy of the screen, in the screen's pixel format
+if SHARED_MEMORY:
+    try:
+        shared = pong_shared.SharedStateWriter(SHARED_MEMORY, frame_size=SHARED_FRAME_SIZE if SHARED_FRAME else (0, 0))
+    except OSError as error:
+        print(f"PyPong state export: can't publish in {SHARED_MEMORY!r}: {error}", file=sys.stderr)
+if shared is not None and SHARED_FRAME:
+    shared_frame = pygame.Surface(SHARED_FRAME_SIZE, 0, screen)
+
+# Held paddle directions from the keyboard (-1 up, 0 none, 1 down)
+player1_input = 0
+player2_input = 0
+tick_inputs = (0, 0) # What the last tick ran with
+
+# Arena Management 
+# NEW: Added "ocean_wave"
+ARENA_STYLES = ["original", "basketball", "table_tennis", "ocean_wave"]
+current_arena = "original" 
+
+# Game State Management
+game_state = "menu" if SKIP_SPLASH else "splash" 
+splash_start_time = time.time() 
+
+# Seconds from STARTUP_TIME to the first frame shown and to the first menu frame (input accepted)
+startup_metrics = {"first_frame": None, "interactive": None}
+
+# Specific game mode details
+current_game_mode = None
+ai_difficulty_level = None 
+
+# Survival Mode specific variables (game time, so it never drifts from the simulation)
+survival_time_elapsed = 0
+
+# Real time not yet simulated; carried between frames by the fixed-timestep loop
+sim_time_accumulator = 0.0
+
+# --- Button Class for Interactive Menu Elements ---
+class Button:
+    """A clickable button for menu navigation and game state changes."""
+    def __init__(self, x, y, width, height, text, font, action):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.font = font # Name in FONT_SPECS, loaded when first drawn
+        self.action = action 
+        self.color = ACCENT_COLOR
+        self.hover_color = ACCENT_DARK
+        self.text_color = WHITE
+        self.drawn_hovered = None # Hover state when last drawn
+
+    def is_hovered(self):
+        return self.rect.collidepoint(mouse_position())
+
+    def draw(self, surface):
+        """Draws the button on the given surface; returns the area covered."""
+        self.drawn_hovered = self.is_hovered()
+        current_color = self.hover_color if self.drawn_hovered else self.color
+        rect = to_render_rect(self.rect)
+        pygame.draw.rect(surface, current_color, rect)
+        pygame.draw.rect(surface, LIGHT_GRAY, rect, line_width(5)) # Border
+
+        text_surf = render_text(self.font, self.text, self.text_color)
+        text_rect = text_surf.get_rect(center=rect.center)
+        surface.blit(text_surf, text_rect)
+        return rect
+
+    def is_clicked(self, event):
+        """Checks if the button was clicked by the left mouse button."""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos):
+                return True
+        return False
+
+# --- Menu Buttons Instances ---
+# Main Menu Buttons 
+single_player_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 80, 300, 70, "Single Player", "medium", "single_player_difficulty_select")
+two_player_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 10, 300, 70, "Two Player", "medium", "two_player")
+multi_ball_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 100, 300, 70, "Multi-Ball", "medium", "multi_ball")
+quit_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 190, 300, 70, "Quit", "medium", "quit")
+
+# AI Modes Sub-Menu Buttons 
+easy_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 150, 300, 70, "Easy AI", "medium", "easy")
+medium_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 - 50, 300, 70, "Medium AI", "medium", "medium")
+hard_ai_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50, 300, 70, "Hard AI", "medium", "hard")
+survival_mode_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 150, 300, 70, "Survival Mode", "medium", "survival")
+back_to_main_menu_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 250, 300, 70, "Back", "medium", "menu")
+
+# Game Over Screen Buttons 
+play_again_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50, 300, 70, "Play Again", "medium", "play_again")
+game_over_back_to_menu_button = Button(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 130, 300, 70, "Back to Menu", "medium", "menu")
+
+
+# --- Drawing Functions for Different Game States ---
+
+# --- Pre-rendered Background Layers ---
+# Static backdrops (the gradient and the fixed arena markings) are drawn once per
+# render size and cached, so each frame only needs a single blit.
+_layer_cache = {}
+
+def _build_gradient_layer(size):
+    """Renders the subtle vertical gradient used behind menus and most arenas."""
+    width, height = size
+    layer = pygame.Surface(size).convert()
+    half_height = height // 2
+    for i in range(half_height):
+        color_val = max(0, int(BLACK[0] + (DARK_GRAY[0] - BLACK[0]) * (i / half_height)))
+        pygame.draw.line(layer, (color_val, color_val, color_val), (0, i), (width, i))
+        pygame.draw.line(layer, (color_val, color_val, color_val), (0, height - 1 - i), (width, height - 1 - i))
+    return layer
+
+def _build_original_layer(size):
+    """Gradient plus the original middle line and center circle."""
+    width, height = size
+    layer = get_layer("gradient", size).copy()
+    pygame.draw.line(layer, GRAY, (width // 2, 0), (width // 2, height), line_width(5))
+    pygame.draw.circle(layer, GRAY, (width // 2, height // 2), px(100), line_width(5))
+    return layer
+
+def _build_basketball_layer(size):
+    """Gradient plus the orange basketball court markings."""
+    width, height = size
+    layer = get_layer("gradient", size).copy()
+    line_color = BASKETBALL_ORANGE
+
+    # Keys (half-court)
+    pygame.draw.rect(layer, line_color, (px(50), height // 2 - px(100), px(150), px(200)), line_width(5))
+    pygame.draw.rect(layer, line_color, (width - px(200), height // 2 - px(100), px(150), px(200)), line_width(5))
+
+    # Center circle
+    pygame.draw.circle(layer, line_color, (width // 2, height // 2), px(100), line_width(5))
+
+    # Hoops
+    pygame.draw.circle(layer, PARTICLE_COLOR, (px(40), height // 2), px(10), line_width(5))
+    pygame.draw.circle(layer, PARTICLE_COLOR, (width - px(40), height // 2), px(10), line_width(5))
+    return layer
+
+def _build_table_tennis_layer(size):
+    """Solid blue table with white edges and net (no gradient underneath)."""
+    width, height = size
+    layer = pygame.Surface(size).convert()
+
+    # 1. Fill the playing area with the Table Tennis Blue
+    layer.fill(TABLE_TENNIS_BLUE)
+
+    # 2. Draw the white boundary lines (the "table" edge)
+    pygame.draw.rect(layer, ARENA_LINE_COLOR, (0, 0, width, height), line_width(10))
+
+    # 3. Draw the center line/net (thick white line)
+    pygame.draw.line(layer, ARENA_LINE_COLOR, (width // 2, 0), (width // 2, height), line_width(5))
+
+    # 4. Draw the court dividing line for doubles (the small line per side, usually only in half-court)
+    pygame.draw.line(layer, ARENA_LINE_COLOR, (width // 2 - px(2), 0), (width // 2 - px(2), height), 1)
+    pygame.draw.line(layer, ARENA_LINE_COLOR, (width // 2 + px(2), 0), (width // 2 + px(2), height), 1)
+    return layer
+
+LAYER_BUILDERS = {
+    "gradient": _build_gradient_layer,
+    "original": _build_original_layer,
+    "basketball": _build_basketball_layer,
+    "table_tennis": _build_table_tennis_layer,
+}
+
+def get_layer(name, size=None):
+    """Returns the cached layer for the given name, building it on first use for this size."""
+    if size is None:
+        size = screen.get_size()
+    key = (name, size)
+    layer = _layer_cache.get(key)
+    if layer is None:
+        layer = LAYER_BUILDERS[name](size)
+        _layer_cache[key] = layer
+    return layer
+
+def clear_layer_cache():
+    """Drops every cached layer; they are rebuilt lazily at the new render size."""
+    _layer_cache.clear()
+
+# --- Ocean Wave Strips ---
+# A wave is a fixed sine curve scrolling sideways, so its shape never changes.
+# Each one is drawn once into a strip a full period wider than the screen, and
+# a frame just blits the screen-wide window at the wave's current phase.
+OCEAN_WAVE_COUNT = 5
+OCEAN_WAVE_SEGMENT = 15       # Polyline segment length in screen units
+OCEAN_WAVE_LENGTH = 120.0     # Screen units per radian of the sine
+OCEAN_WAVE_THICKNESS = 4
+OCEAN_WAVE_PERIOD = 2 * math.pi * OCEAN_WAVE_LENGTH
+
+def _build_ocean_wave_strips(size):
+    """Renders one strip per wave; returns (strip, top, speed, phase shift) tuples."""
+    width, height = size
+    wave_length = OCEAN_WAVE_LENGTH * RENDER_SCALE
+    segment = line_width(OCEAN_WAVE_SEGMENT)
+    thickness = line_width(OCEAN_WAVE_THICKNESS)
+    strip_width = width + math.ceil(OCEAN_WAVE_PERIOD * RENDER_SCALE) + segment
+    waves = []
+    for i in range(OCEAN_WAVE_COUNT):
+        y_base = (i + 1) * (height // (OCEAN_WAVE_COUNT + 1)) # Evenly spaced
+        amplitude = px(10 + (i % 2) * 4)   # Vary amplitude (10 or 14)
+        speed = 1.0 + (i * 0.15)           # Vary speed for each wave
+        phase_shift = i * (math.pi / 2.5)  # Vary phase to de-sync waves
+
+        margin = amplitude + thickness
+        # Waves never overlap, so an opaque strip on the ocean color blits as a plain copy
+        strip = pygame.Surface((strip_width, 2 * margin)).convert()
+        strip.fill(OCEAN_BLUE)
+        points = [(x, margin + math.sin(x / wave_length) * amplitude)
+                  for x in range(0, strip_width + 1, segment)]
+        pygame.draw.lines(strip, WAVE_COLOR, False, points, thickness)
+        waves.append((strip, y_base - margin, speed, phase_shift))
+    return waves
+
+def get_ocean_wave_strips(size=None):
+    """Returns the cached wave strips for the render size, building them on first use."""
+    if size is None:
+        size = screen.get_size()
+    key = ("ocean_wave_strips", size)
+    waves = _layer_cache.get(key)
+    if waves is None:
+        waves = _build_ocean_wave_strips(size)
+        _layer_cache[key] = waves
+    return waves
+
+def draw_background():
+    """Draws a subtle gradient background (a flat fill at the lowest quality tier)."""
+    if quality["gradient_background"]:
+        screen.blit(get_layer("gradient"), (0, 0))
+    else:
+        screen.fill(FLAT_BACKGROUND_COLOR)
+
+
+def draw_arena_elements():
+    """Draws the arena-specific elements based on the current_arena."""
+    
+    # Static arenas are a single blit of their pre-rendered layer
+    if current_arena in LAYER_BUILDERS:
+        screen.blit(get_layer(current_arena), (0, 0))
+        
+    # --- NEW: Ocean Wave Arena ---
+    elif current_arena == "ocean_wave":
+        # 1. Fill the background with the solid Ocean Blue
+        screen.fill(OCEAN_BLUE)
+        
+        # 2. Draw the oscillating waves by scrolling their pre-rendered strips
+        current_time = time.time()
+        width = screen.get_width()
+        wave_length = OCEAN_WAVE_LENGTH * RENDER_SCALE
+        period = OCEAN_WAVE_PERIOD * RENDER_SCALE
+        blit_sequence = []
+        waves = itertools.islice(get_ocean_wave_strips(), 0, None, quality["ocean_wave_stride"])
+        for strip, top, speed, phase_shift in waves:
+            # sin(x / L + phase) at screen x is the strip's sin(u / L) at u = x + L * phase
+            offset = int((wave_length * (current_time * speed + phase_shift)) % period)
+            blit_sequence.append((strip, (0, top), (offset, 0, width, strip.get_height())))
+        screen.blits(blit_sequence, False)
+            
+    else: # "original" (Default/Fallback)
+        screen.blit(get_layer("original"), (0, 0))
+
+
+def draw_arena_loading_screen():
+    """Draws the screen that randomly selects and displays the next arena."""
+    draw_background() 
+
+    arena_name = current_arena.replace("_", " ").title()
+    
+    # 1. Loading Text 
+    loading_text = render_text("large", "LOADING ARENA...", WHITE)
+    loading_rect = loading_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100)))
+    screen.blit(loading_text, loading_rect)
+    
+    # 2. Arena Name Reveal
+    arena_text = render_text("medium", f"Arena: {arena_name}", ACCENT_COLOR)
+    arena_rect = arena_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+    screen.blit(arena_text, arena_rect)
+    
+    # 3. Simple Animation (Loading dots)
+    dots = int(time.time() * 3) % 4 
+    dots_text = render_text("medium", "." * dots, LIGHT_GRAY)
+    screen.blit(dots_text, (loading_rect.right + px(10), loading_rect.centery - px(10)))
+
+
+def draw_netplay_connecting_screen():
+    """Draws the screen shown while a LAN match waits for the other cabinet."""
+    draw_background()
+
+    if netplay.local_player == 1:
+        waiting = "Waiting for Player 2"
+        detail = f"Hosting on port {pong_net.NETPLAY_PORT}"
+    else:
+        waiting = "Joining Player 1"
+        detail = f"Host: {NETPLAY.split(':', 1)[1]}"
+    dots = "." * (int(time.time() * 3) % 4)
+    waiting_text = render_text("medium", waiting + dots, WHITE)
+    screen.blit(waiting_text, waiting_text.get_rect(midleft=to_render((SCREEN_WIDTH // 2 - 250, SCREEN_HEIGHT // 2 - 100))))
+    detail_text = render_text("small", detail, LIGHT_GRAY)
+    screen.blit(detail_text, detail_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))))
+
+    back_to_main_menu_button.draw(screen)
+
+
+def draw_menu():
+    """Draws the main menu screen."""
+    draw_background()
+
+    title_text = render_text("large", "PyPong", ACCENT_COLOR)
+    title_rect = title_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 200)))
+    screen.blit(title_text, title_rect)
+
+    controls_text = render_text("small", "Player 1: UP/DOWN Arrows | Player 2: W/S Keys (2P mode)", LIGHT_GRAY)
+    controls_rect = controls_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 140)))
+    screen.blit(controls_text, controls_rect)
+
+    single_player_button.draw(screen) 
+    two_player_button.draw(screen)
+    multi_ball_button.draw(screen)
+    quit_button.draw(screen)
+
+def draw_single_player_difficulty_select_menu():
+    """Draws the Single Player menu (formerly AI Modes)."""
+    draw_background()
+
+    # CLEANED UP HEADER TEXT
+    title_text = render_text("large", "Single Player", ACCENT_COLOR) 
+    title_rect = title_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 250)))
+    screen.blit(title_text, title_rect)
+
+    easy_ai_button.draw(screen)
+    medium_ai_button.draw(screen)
+    hard_ai_button.draw(screen)
+    survival_mode_button.draw(screen)
+    back_to_main_menu_button.draw(screen)
+
+
+def draw_game():
+    """Draws the main game screen, including particles and survival info."""
+    
+    # Each arena layer already includes its own backdrop (gradient, table or ocean)
+    with profiler.section("draw_arena"):
+        draw_arena_elements() 
+    draw_game_sprites()
+
+def draw_game_sprites():
+    """Draws everything that moves over the arena and returns the screen areas it covered."""
+    # Draw paddles and ball
+    with profiler.section("draw_paddles"):
+        covered = [paddle1.draw(), paddle2.draw()]
+    with profiler.section("draw_ball"):
+        ball_rect = ball_view.draw()
+    if ball_rect is not None:
+        covered.append(ball_rect)
+
+    with profiler.section("draw_hud"):
+        draw_hud(covered)
+
+    # Draw particles
+    with profiler.section("draw_particles"):
+        particles_rect = particles.draw(screen)
+    if particles_rect is not None:
+        covered.append(particles_rect)
+
+    # If the ball is not active, display "GET READY!"
+    if not ball_view.game_active:
+        countdown_text = render_text("large", "GET READY!", LIGHT_GRAY)
+        countdown_rect = countdown_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100)))
+        covered.append(screen.blit(countdown_text, countdown_rect))
+    return covered
+
+def draw_hud(covered):
+    """Draws the scores (and the round clock in multi-ball), or the time and speed in survival mode.
+
+    Adds the areas drawn to `covered`.
+    """
+    # Draw scores for classic modes, or time for survival mode
+    if current_game_mode == "survival":
+        time_text = render_text("medium", f"Time: {int(survival_time_elapsed)}s", WHITE)
+        covered.append(screen.blit(time_text, (px(SCREEN_WIDTH // 2) - time_text.get_width() // 2, px(20))))
+        speed_text = render_text("small", f"Speed: {ball.current_speed_magnitude:.1f}", LIGHT_GRAY)
+        covered.append(screen.blit(speed_text, (px(SCREEN_WIDTH // 2) - speed_text.get_width() // 2, px(80))))
+    else:
+        # Score text is black on the bright blue table, white otherwise
+        # MODIFIED: White text works for ocean_wave, so this logic is still good.
+        score_color = BLACK if current_arena == "table_tennis" else WHITE 
+        score_text1 = render_text("medium", str(sim.player1_score), score_color)
+        covered.append(screen.blit(score_text1, (px(SCREEN_WIDTH // 4) - score_text1.get_width() // 2, px(20))))
+        score_text2 = render_text("medium", str(sim.player2_score), score_color)
+        covered.append(screen.blit(score_text2, (px(SCREEN_WIDTH * 3 // 4) - score_text2.get_width() // 2, px(20))))
+        if current_game_mode == pong_multiball.MULTI_BALL_MODE:
+            minutes, seconds = divmod(math.ceil(sim.time_left), 60)
+            clock_text = render_text("medium", f"{minutes}:{seconds:02d}", score_color)
+            covered.append(screen.blit(clock_text, (px(SCREEN_WIDTH // 2) - clock_text.get_width() // 2, px(20))))
+
+def draw_game_over():
+    """Draws the game over screen."""
+    draw_background()
+
+    if current_game_mode == "survival":
+        game_over_text = render_text("large", "Time's Up!", ACCENT_COLOR)
+        score_text = render_text("medium", f"Survived: {int(survival_time_elapsed)} seconds", WHITE)
+        score_rect = score_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20)))
+        screen.blit(score_text, score_rect)
+    else:
+        if sim.winning_player:
+            game_over_text = render_text("large", f"{sim.winning_player} Wins!", ACCENT_COLOR)
+        else:
+            game_over_text = render_text("large", "Game Over", ACCENT_COLOR)
+
+    game_over_rect = game_over_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100)))
+    screen.blit(game_over_text, game_over_rect)
+
+    # A LAN match that ended early says why
+    if netplay is not None and netplay.error:
+        error_text = render_text("small", netplay.error, LIGHT_GRAY)
+        screen.blit(error_text, error_text.get_rect(center=to_render((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))))
+
+    play_again_button.draw(screen)
+    game_over_back_to_menu_button.draw(screen)
+
+# --- Game Reset Function ---
+def reset_game(seed=None):
+    """Starts a fresh match in the simulation and resets the on-screen objects.
+
+    All of the match's randomness comes from `seed` (a new one if None), and
+    its inputs are recorded, so the match can be replayed exactly.
+    """
+    global sim, recorder, ball_view, player1_input, player2_input, survival_time_elapsed, sim_time_accumulator
+    if seed is None:
+        seed = pong_replay.new_seed()
+    # The arena loading screen outlasts the serve delay, so the ball is live as soon as play starts
+    mode = current_game_mode or "two_player"
+    sim = pong_multiball.rules_for(mode).new_game(mode, ai_difficulty_level, serve_delay=0,
+                                                  rng=random.Random(seed), tick_rate=SIM_TICK_RATE)
+    ball_view = swarm if mode == pong_multiball.MULTI_BALL_MODE else ball
+    recorder = pong_replay.ReplayRecorder.for_game(sim, seed, 0, current_arena)
+    player1_input = 0
+    player2_input = 0
+    survival_time_elapsed = 0
+    sim_time_accumulator = 0.0
+    particles.clear() 
+    particles.rng.seed(seed)
+    
+    ball_view.reset()
+    sync_views()
+    for view in (ball_view, paddle1, paddle2):
+        view.snap()
+        view.interpolate(1.0)
+
+    # NEW: Reset colors and trail properties to default
+    ball.color = WHITE
+    swarm.color = WHITE
+    paddle1.color = WHITE
+    paddle2.color = WHITE
+    ball.trail_segment_size = 5  # Default size
+    ball.max_trail_length = 20   # Default length
+
+    # Nearly everything alive now (assets, caches, the new match) lasts the whole
+    # match, so collect once here and freeze it: a full collection mid-match then
+    # skips those objects instead of stalling a frame to rescan them all
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+# --- Frame Drawing ---
+def draw_frame():
+    """Draws the whole screen for the current game state."""
+    if game_state == "game_running":
+        draw_game()
+        return
+    with profiler.section("draw_screen"):
+        if game_state == "splash":
+            splash_sequence()
+        elif game_state == "menu":
+            draw_menu()
+        elif game_state == "single_player_difficulty_select":
+            draw_single_player_difficulty_select_menu()
+        elif game_state == "arena_loading": 
+            draw_arena_loading_screen()
+        elif game_state == "netplay_connecting":
+            draw_netplay_connecting_screen()
+        elif game_state == "game_over":
+            draw_game_over()
+
+# Buttons on each static menu screen; only these can change while it is shown
+MENU_SCREEN_BUTTONS = {
+    "menu": [single_player_button, two_player_button, multi_ball_button, quit_button],
+    "single_player_difficulty_select": [easy_ai_button, medium_ai_button, hard_ai_button,
+                                        survival_mode_button, back_to_main_menu_button],
+    "game_over": [play_again_button, game_over_back_to_menu_button],
+}
+
+class DirtyRectRenderer:
+    """Repaints and uploads only the parts of the screen that changed.
+
+    A scene is a static backdrop plus things drawn over it. While the scene
+    stays the same, each frame restores last frame's sprite areas from the
+    backdrop, draws the sprites again and pushes just those areas with
+    pygame.display.update(). A new scene gets one full redraw and flip.
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self.scene = None      # Key of the scene currently on screen
+        self.backdrop = None   # Surface the sprite areas are restored from
+        self.full_redraw = True
+        self._dirty = []       # Areas to upload this frame
+        self._sprite_rects = [] # Areas sprites cover now, restored next frame
+
+    def begin(self, scene, backdrop=None):
+        """Starts a frame; returns True when the scene changed and must be drawn in full."""
+        if scene is None or scene != self.scene:
+            self.scene = scene
+            self.backdrop = backdrop
+            self.full_redraw = True
+            self._sprite_rects.clear()
+            if backdrop is not None:
+                self.surface.blit(backdrop, (0, 0))
+            return True
+        if self.backdrop is not None:
+            for rect in self._sprite_rects:
+                self.surface.blit(self.backdrop, rect, rect)
+        self._dirty.extend(self._sprite_rects)
+        self._sprite_rects.clear()
+        return False
+
+    def add_sprite(self, rect):
+        """Marks an area drawn over the backdrop; it is uploaded now and restored next frame."""
+        self._sprite_rects.append(rect)
+        self._dirty.append(rect)
+
+    def add_dirty(self, rect):
+        """Marks an area that was redrawn opaquely and only needs uploading."""
+        self._dirty.append(rect)
+
+    def invalidate(self):
+        """Forces a full redraw next frame (e.g. after the window changes)."""
+        self.scene = None
+
+    def present(self):
+        """Pushes this frame's changes to the display."""
+        if self.full_redraw:
+            present_display()
+        elif self._dirty:
+            bounds = self.surface.get_rect()
+            present_display([rect.clip(bounds) for rect in self._dirty])
+        self._dirty.clear()
+        self.full_redraw = False
+
+renderer = DirtyRectRenderer(screen)
+
+def draw_dirty_frame():
+    """Draws and presents one frame, redrawing only what changed where the scene allows.
+
+    Static arenas and menu screens take the dirty-rect path; animated scenes
+    (splash, loading screen, the ocean_wave arena) are redrawn and flipped in full,
+    and so are multi-ball matches, whose balls cover most of the court anyway.
+    Menus are too while the profiling overlay is up, as they have no backdrop to restore.
+    """
+    size = screen.get_size()
+    if game_state == "game_running" and current_arena in LAYER_BUILDERS and ball_view is ball:
+        with profiler.section("draw_arena"):
+            renderer.begin(("game", current_arena, size), get_layer(current_arena))
+        for rect in draw_game_sprites():
+            renderer.add_sprite(rect)
+        if profiler.enabled:
+            renderer.add_sprite(draw_profiler_overlay())
+    elif game_state in MENU_SCREEN_BUTTONS and not profiler.enabled:
+        if renderer.begin((game_state, size)):
+            draw_frame()
+        else:
+            # The rest of a menu screen is static; buttons change only on hover
+            for button in MENU_SCREEN_BUTTONS[game_state]:
+                if button.is_hovered() != button.drawn_hovered:
+                    renderer.add_dirty(button.draw(screen))
+    else:
+        renderer.begin(None)
+        draw_frame()
+        if profiler.enabled:
+            draw_profiler_overlay()
+    with profiler.section("present"):
+        renderer.present()
+
+# --- Fixed-Timestep Simulation ---
+def sync_views():
+    """Copies the simulation's latest tick into the on-screen objects."""
+    paddle1.sync(sim.paddle1)
+    paddle2.sync(sim.paddle2)
+    if ball_view is swarm:
+        swarm.sync(sim.balls, sim.ticks)
+    else:
+        ball.sync(sim.ball)
+
+def save_replay():
+    """Finishes the current match's replay and saves it if REPLAY_DIR is set."""
+    global last_replay
+    if netplay is not None:
+        last_replay = netplay.replay(0, current_arena) # Only the inputs both sides confirmed
+    else:
+        last_replay = recorder.finish(sim)
+    if REPLAY_DIR is not None:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S") + f"-{last_replay.mode}" + pong_replay.REPLAY_EXTENSION
+        last_replay.save(os.path.join(REPLAY_DIR, name))
+
+def step_simulation():
+    """Runs one physics tick: paddles, AI, ball, scoring and win rules, then effects."""
+    global game_state, survival_time_elapsed, tick_inputs
+    inputs = tick_inputs = (player1_input, player2_input)
+    with profiler.section("simulation"):
+        if netplay is not None:
+            # The arrows steer this cabinet's paddle; the other one comes over the network
+            sim_events = netplay.advance(player1_input)
+        else:
+            recorder.record(sim.ticks, inputs)
+            sim_events = pong_multiball.rules_for(sim.mode).step(sim, inputs)
+    if sim_events is None:
+        return # Letting the other cabinet catch up: this tick's time passes without one
+    input_latency.applied()
+    for sim_event in sim_events:
+        if sim_event[0] == pong_sim.EVENT_PADDLE_HIT:
+            particles.emit(sim_event[1], sim_event[2], quality["particle_burst"])
+        elif sim_event[0] == pong_sim.EVENT_SCORE and ball_view is ball:
+            ball.reset() # Multi-ball trails restart at each ball's own serve
+        elif sim_event[0] == pong_sim.EVENT_GAME_OVER and netplay is None:
+            game_state = "game_over"
+            save_replay()
+    # A LAN match may still be rolled back until the inputs that ended it are confirmed
+    if netplay is not None and netplay.finished:
+        game_state = "game_over"
+        save_replay()
+    sync_views()
+    if not ball_view.game_active:
+        ball_view.snap() # Back in the center: don't slide across the court to get there
+    if shared is not None:
+        shared.publish_state(sim, game_state, current_arena)
+
+    # Update particles and drop the dead ones
+    with profiler.section("particles_update"):
+        particles.update(sim.tick_scale)
+
+    # Survival Mode Specific Logic (time tracking)
+    if current_game_mode == "survival":
+        survival_time_elapsed = sim.survival_time
+
+def sample_held_keys():
+    """Sets the paddle inputs from the keys held right now (LATE_INPUT_SAMPLING).
+
+    Up and down held together cancel out, where key events let the last one pressed win.
+    """
+    global player1_input, player2_input
+    before = (player1_input, player2_input)
+    pygame.event.pump()
+    keys = pygame.key.get_pressed()
+    player1_input = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+    if current_game_mode == "two_player" and netplay is None:
+        player2_input = keys[pygame.K_s] - keys[pygame.K_w]
+    input_latency.sampled((player1_input, player2_input) != before)
+
+def advance_simulation(frame_seconds):
+    """Catches the simulation up with real time in fixed ticks, then interpolates the views.
+
+    After MAX_CATCH_UP_TICKS in one frame the remaining backlog is dropped,
+    so a stall slows the game down briefly instead of freezing it. With
+    LATE_INPUT_SAMPLING, inputs are read again before each tick, and a
+    change may run a tick that is due within EARLY_TICK_SECONDS now; the
+    time is paid back from the next frame.
+    """
+    global sim_time_accumulator
+    sim_time_accumulator += frame_seconds
+    ticks = 0
+    while game_state == "game_running":
+        due = SIM_TICK_SECONDS
+        if LATE_INPUT_SAMPLING:
+            sample_held_keys()
+            if (player1_input, player2_input) != tick_inputs:
+                due -= EARLY_TICK_SECONDS # A fresh input shouldn't wait another frame for its tick
+        if sim_time_accumulator < due:
+            break
+        if ticks == MAX_CATCH_UP_TICKS:
+            sim_time_accumulator = 0.0
+            break
+        step_simulation()
+        sim_time_accumulator -= SIM_TICK_SECONDS
+        ticks += 1
+
+    # Render between the last two ticks, by how far real time has got into the next one
+    alpha = max(0.0, sim_time_accumulator) / SIM_TICK_SECONDS
+    for view in (ball_view, paddle1, paddle2):
+        view.interpolate(alpha)
+
+# --- Game Start Handler (Helper function for transition logic) ---
+def start_game_transition(arena=None, seed=None):
+    """Selects the arena (or uses `arena`), resets the game, and starts the loading timer.
+
+    The match is created from `seed`, or a new one if None.
+    """
+    global current_arena, game_state
+    
+    # 1. Pick Arena (from the match seed, so a replay and a LAN opponent know it too)
+    if seed is None:
+        seed = pong_replay.new_seed()
+    current_arena = arena or random.Random(seed).choice(ARENA_STYLES)
+    
+    # 2. Reset Game objects (sets all colors/trails to default)
+    reset_game(seed) 
+    
+    # 3. NEW: Apply arena-specific modifications
+    if current_arena == "ocean_wave":
+        ball.color = BALL_YELLOW       # Make ball stand out
+        ball.trail_segment_size = 8    # Bigger "splash" trail
+        ball.max_trail_length = 15     # Shorter "splash" trail
+        swarm.color = BALL_YELLOW
+        # Paddles remain white (set by reset_game)
+    
+    # 4. Set the state and start the timer
+    game_state = "arena_loading"
+    pygame.time.set_timer(ARENA_LOAD_EVENT, LOADING_TIME_MS)
+
+
+# --- LAN Netplay ---
+def start_netplay():
+    """Hosts or joins a LAN match, as NETPLAY says, and waits for the other cabinet."""
+    global netplay, game_state
+    close_netplay()
+    try:
+        if NETPLAY == "host":
+            netplay = pong_net.NetplaySession.host(tick_rate=SIM_TICK_RATE)
+        else:
+            netplay = pong_net.NetplaySession.join(NETPLAY.split(":", 1)[1], tick_rate=SIM_TICK_RATE)
+    except (OSError, IndexError) as error:
+        print(f"PyPong netplay: can't start {NETPLAY!r}: {error}", file=sys.stderr)
+        game_state = "menu"
+        return
+    game_state = "netplay_connecting"
+
+def close_netplay():
+    """Leaves the current LAN match, if any."""
+    global netplay
+    if netplay is not None:
+        netplay.close()
+        netplay = None
+
+def update_netplay():
+    """Answers the other cabinet's packets and follows the connection between screens."""
+    global game_state
+    netplay.poll()
+    if game_state == "netplay_connecting":
+        if netplay.connected:
+            # Both cabinets build the same match (and arena) from the host's seed
+            start_game_transition(seed=netplay.seed)
+            netplay.begin(sim)
+        elif netplay.closed:
+            print(f"PyPong netplay: {netplay.error}", file=sys.stderr)
+            close_netplay()
+            game_state = "menu"
+    elif netplay.closed and game_state in ("arena_loading", "game_running"):
+        game_state = "game_over"
+
+
+# --- Adaptive Quality ---
+def apply_quality():
+    """Switches the effects to the governor's current quality level."""
+    global quality
+    quality = quality_governor.settings
+    ball.set_trail_quality(quality["trail_scale"], quality["trail_faded"])
+    swarm.set_trail_quality(quality["trail_scale"], quality["trail_faded"])
+    renderer.invalidate()
+
+# --- State Export ---
+def publish_shared_frame():
+    """Publishes the screen, downscaled, and outside a match the current screen's state."""
+    if game_state != "game_running":
+        shared.publish_state(sim, game_state, current_arena)
+    if shared_frame is not None:
+        pygame.transform.scale(screen, SHARED_FRAME_SIZE, shared_frame)
+        shared.publish_frame(pygame.image.tobytes(shared_frame, "RGB"))
+
+# --- Screen Recording ---
+def toggle_capture():
+    """Starts recording the screen into a new folder under CAPTURE_DIR, or stops the recording."""
+    global capture
+    if capture is None:
+        capture = pong_capture.FrameCapture(screen, os.path.join(CAPTURE_DIR, time.strftime("%Y%m%d-%H%M%S")))
+    else:
+        capture.close(wait=False) # The encoders finish the queued frames in the background
+        capture = None
+
+# --- Profiling Overlay ---
+def toggle_profiler():
+    """Turns timing collection and its overlay on or off, starting from a clean history."""
+    profiler.enabled = not profiler.enabled
+    profiler.reset()
+    profiler_overlay.panel = None
+    renderer.invalidate()
+
+def count_profiler_objects():
+    """Updates the overlay's live object counters."""
+    profiler.count("particles", particles.count)
+    profiler.count("trail_segments", ball_view.trail_segments)
+    if netplay is not None:
+        profiler.count("rollbacks", netplay.rollbacks)
+        profiler.count("max_rollback_ticks", netplay.max_rollback)
+        profiler.count("netplay_stalls", netplay.stalls + netplay.sync_skips)
+    if ball_view is swarm:
+        profiler.count("balls", swarm.balls.active_count)
+        profiler.count("ball_contacts", sim.contacts)
+    profiler.count("quality_level", quality_governor.level)
+    if capture is not None:
+        profiler.count("capture_dropped", capture.dropped)
+    profiler.count("cached_surfaces", len(text_cache) + len(particles._sprites) + len(_trail_sprites)
+                   + len(_trail_sprite_rows) + len(_layer_cache))
+    profiler.count("text_renders", text_cache.misses - profiler_overlay.last_text_misses)
+    profiler_overlay.last_text_misses = text_cache.misses
+
+class ProfilerOverlay:
+    """Draws the profiler's averages as a translucent panel in the top-left corner.
+
+    The panel is re-rendered only every PROFILER_OVERLAY_REFRESH seconds, so
+    the overlay itself adds a single blit to most frames.
+    """
+    ROW_HEIGHT = 18
+    WIDTH = 330
+    BAR_WIDTH = 90
+
+    def __init__(self, profiler, font):
+        self.profiler = profiler
+        self.font = font # Name in FONT_SPECS
+        self.panel = None
+        self.next_refresh = 0.0
+        self.last_text_misses = 0
+
+    def _rebuild(self):
+        metrics = self.profiler.metrics()
+        budget = 1000 / FPS
+        frame = metrics["frame_ms"]
+        sections = sorted(metrics["sections_ms"].items(), key=lambda item: -item[1]["mean"])
+        counters = metrics["counters"]
+        rows = 2 + len(sections) + (len(counters) + 1) // 2
+        # Laid out in screen units like everything else, then built at render size
+        panel = pygame.Surface(to_render((self.WIDTH, rows * self.ROW_HEIGHT + 8)), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+
+        def text(line, x, row, color=WHITE):
+            panel.blit(get_font(self.font).render(line, True, color), to_render((x, 4 + row * self.ROW_HEIGHT)))
+
+        text(f"frame {frame['mean']:6.2f} ms avg {frame['max']:6.2f} max / {budget:.1f} budget", 6, 0,
+             RED if frame["max"] > budget else ACCENT_COLOR)
+        text("section", 6, 1, LIGHT_GRAY)
+        text("avg ms   max ms", 130, 1, LIGHT_GRAY)
+        for row, (name, times) in enumerate(sections, 2):
+            text(f"{name:<18}", 6, row)
+            text(f"{times['mean']:6.2f}   {times['max']:6.2f}", 130, row)
+            bar = min(self.BAR_WIDTH, round(self.BAR_WIDTH * times["mean"] / budget))
+            panel.fill(ACCENT_DARK, to_render_rect((self.WIDTH - self.BAR_WIDTH - 6, 8 + row * self.ROW_HEIGHT, max(bar, 1), 8)))
+        for i, (name, value) in enumerate(sorted(counters.items())):
+            text(f"{name} {value}", 6 + (i % 2) * (self.WIDTH // 2), 2 + len(sections) + i // 2, LIGHT_GRAY)
+        self.panel = panel
+
+    def draw(self, surface):
+        """Blits the panel, refreshing its numbers when due; returns the area covered."""
+        now = time.perf_counter()
+        if self.panel is None or now >= self.next_refresh:
+            self._rebuild()
+            self.next_refresh = now + PROFILER_OVERLAY_REFRESH
+        return surface.blit(self.panel, to_render((8, 8)))
+
+profiler = pong_profile.Profiler(PROFILING_ENABLED)
+input_latency = pong_profile.InputLatency(REPORT_INPUT_LATENCY)
+profiler_overlay = ProfilerOverlay(profiler, "debug")
+
+def draw_profiler_overlay():
+    """Draws the profiling overlay over the frame; returns the area covered."""
+    with profiler.section("draw_overlay"):
+        return profiler_overlay.draw(screen)
+
+# --- Startup ---
+def warm_up():
+    """Builds fonts, layers and sprites ahead of first use, one piece per step.
+
+    Stepped once per frame while the splash and menus are up, which leave
+    most of each frame idle, so the first match starts without a hitch.
+    """
+    for name in FONT_SPECS:
+        get_font(name)
+        yield
+    for name in LAYER_BUILDERS:
+        get_layer(name)
+        yield
+    get_ocean_wave_strips()
+    yield
+    for buttons in MENU_SCREEN_BUTTONS.values():
+        for button in buttons:
+            render_text(button.font, button.text, button.text_color)
+        yield
+    for color, size, length in ((WHITE, 5, 20), (BALL_YELLOW, 8, 15),
+                                (WHITE, MULTI_BALL_TRAIL_SEGMENT_SIZE, MULTI_BALL_TRAIL_LENGTH)):
+        get_trail_sprite_row(color, size, length)
+        yield
+    for radius in range(3, 8):
+        for step in range(PARTICLE_ALPHA_STEPS):
+            particles._sprite(radius, step)
+        yield
+
+warm_up_steps = warm_up()
+
+def warm_up_step():
+    """Runs the next warm-up step, if any are left."""
+    global warm_up_steps
+    if warm_up_steps is not None and next(warm_up_steps, False) is False:
+        warm_up_steps = None
+
+def note_startup_frame():
+    """Records when the first frame, and the first frame that takes input, were shown."""
+    elapsed = time.perf_counter() - STARTUP_TIME
+    if startup_metrics["first_frame"] is None:
+        startup_metrics["first_frame"] = elapsed
+    if game_state == "menu":
+        startup_metrics["interactive"] = elapsed
+        if PRINT_STARTUP_METRICS:
+            print(f"PyPong startup: first frame {startup_metrics['first_frame']:.3f} s, "
+                  f"interactive {elapsed:.3f} s")
+
+# --- Main Game Loop ---
+def handle_event(event):
+    """Applies one pygame event to the game; returns False when the game should quit."""
+    global game_state, current_game_mode, ai_difficulty_level, player1_input, player2_input
+
+    if event.type == pygame.QUIT:
+        return False
+
+    # Buttons are laid out in screen units, which may be drawn and shown at other sizes
+    if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        event.pos = to_logical(event.pos)
+
+    if event.type == pygame.KEYDOWN and event.key == PROFILER_TOGGLE_KEY:
+        toggle_profiler()
+    if event.type == pygame.KEYDOWN and event.key == CAPTURE_TOGGLE_KEY:
+        toggle_capture()
+
+    # Any key or click skips the splash
+    if game_state == "splash" and event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+        game_state = "menu"
+        return True
+
+    # Cached layers are sized to the display, so rebuild them if it changes
+    if event.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+        clear_layer_cache()
+        renderer.invalidate()
+        if display_scaler is not None:
+            display_scaler.resize()
+
+    if event.type == ARENA_LOAD_EVENT: 
+        if game_state == "arena_loading":
+            pygame.time.set_timer(ARENA_LOAD_EVENT, 0)
+            game_state = "game_running"
+
+
+    # Handle button clicks based on current game state
+    if game_state == "menu":
+        if single_player_button.is_clicked(event): 
+            game_state = "single_player_difficulty_select"
+        elif two_player_button.is_clicked(event):
+            current_game_mode = "two_player"
+            if NETPLAY:
+                start_netplay()
+            else:
+                start_game_transition()
+        elif multi_ball_button.is_clicked(event):
+            current_game_mode = pong_multiball.MULTI_BALL_MODE
+            ai_difficulty_level = "medium"
+            start_game_transition()
+        elif quit_button.is_clicked(event):
+            return False
+
+    elif game_state == "single_player_difficulty_select":
+        if easy_ai_button.is_clicked(event):
+            current_game_mode = "classic_ai"
+            ai_difficulty_level = "easy"
+            start_game_transition()
+        elif medium_ai_button.is_clicked(event):
+            current_game_mode = "classic_ai"
+            ai_difficulty_level = "medium"
+            start_game_transition()
+        elif hard_ai_button.is_clicked(event):
+            current_game_mode = "classic_ai"
+            ai_difficulty_level = "hard"
+            start_game_transition()
+        elif survival_mode_button.is_clicked(event):
+            current_game_mode = "survival"
+            # Survival AI plays at medium speed with perfect aim (see pong_sim.ai_profile)
+            ai_difficulty_level = "medium" 
+            start_game_transition()
+        elif back_to_main_menu_button.is_clicked(event):
+            game_state = "menu"
+
+    elif game_state == "netplay_connecting":
+        if back_to_main_menu_button.is_clicked(event):
+            close_netplay()
+            game_state = "menu"
+
+    elif game_state == "game_over":
+        if play_again_button.is_clicked(event):
+            # Restarts with the same game mode/difficulty but a new arena
+            if netplay is not None:
+                start_netplay() # A rematch: the other cabinet has to pick Play Again too
+            else:
+                start_game_transition()
+        
+        elif game_over_back_to_menu_button.is_clicked(event):
+            close_netplay()
+            game_state = "menu"
+            reset_game() 
+
+    # Handle keyboard input for paddles during active game states.
+    if game_state == "game_running":
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                player1_input = -1
+            if event.key == pygame.K_DOWN:
+                player1_input = 1
+            if current_game_mode == "two_player":
+                if event.key == pygame.K_w:
+                    player2_input = -1
+                if event.key == pygame.K_s:
+                    player2_input = 1
+        if event.type == pygame.KEYUP:
+            if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
+                player1_input = 0
+            if current_game_mode == "two_player":
+                if event.key == pygame.K_w or event.key == pygame.K_s:
+                    player2_input = 0
+    return True
+
+def run_frame(frame_seconds):
+    """Advances the game by `frame_seconds` of real time and draws and presents the result."""
+    if netplay is not None:
+        update_netplay()
+
+    # --- Game Logic Updates (only if in an active game state) ---
+    if game_state == "game_running":
+        # Paddles, AI, ball, scoring and win rules all run in the simulation at a fixed rate
+        advance_simulation(frame_seconds)
+    else:
+        warm_up_step()
+
+    # --- Drawing & Display Update ---
+    if DIRTY_RECT_RENDERING:
+        draw_dirty_frame()
+    else:
+        draw_frame()
+        if profiler.enabled:
+            draw_profiler_overlay()
+        with profiler.section("present"):
+            present_display()
+    input_latency.presented()
+
+    if capture is not None:
+        with profiler.section("capture"):
+            capture.capture(screen)
+    if shared is not None:
+        with profiler.section("shared_export"):
+            publish_shared_frame()
+
+    if startup_metrics["interactive"] is None:
+        note_startup_frame()
+
+def main():
+    """Runs the game until the window is closed or Quit is clicked."""
+    clock = pygame.time.Clock()
+    frame_seconds = 0.0 # Real time the last frame took
+    running = True
+
+    while running:
+        profiler.begin_frame()
+
+        # --- Event Handling ---
+        with profiler.section("events"):
+            held = (player1_input, player2_input)
+            for event in pygame.event.get():
+                if not handle_event(event):
+                    running = False
+                    break
+            input_latency.sampled((player1_input, player2_input) != held)
+        if not running:
+            break
+
+        run_frame(frame_seconds)
+        if profiler.enabled:
+            count_profiler_objects()
+        profiler.end_frame()
+
+        # --- Frame Rate Control ---
+        frame_seconds = (clock.tick_busy_loop(FPS) if BUSY_WAIT_PACING else clock.tick(FPS)) / 1000
+
+        # get_rawtime() is the frame's own work, without the limiter's sleep
+        if QUALITY_GOVERNOR and quality_governor.observe(clock.get_rawtime()):
+            apply_quality()
+
+    # --- Game Exit ---
+    close_netplay()
+    if capture is not None:
+        capture.close()
+    if shared is not None:
+        shared.close()
+    if REPORT_INPUT_LATENCY:
+        report = input_latency.percentiles()
+        bounds = ", ".join(f"{name} {report['lower_ms'][name]}-{report['upper_ms'][name]} ms" for name in report["lower_ms"])
+        print(f"PyPong input-to-display latency over {report['samples']} input changes: {bounds}")
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
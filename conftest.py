@@ -0,0 +1 @@
+# Lets the tests in tests/ import the flat pong_* modules from the repository root
@@ -0,0 +1,453 @@
+# PyPong - Vectorized Batch Simulator
+# Runs N independent matches at once as NumPy arrays, applying the same rules
+# as pong_sim.step() to every match in a single vectorized step. Meant for
+# Monte-Carlo tuning of AI_SPEEDS / AI_REACTION_TICKS / AI_ERROR, where stepping
+# matches one at a time is far too slow.
+# On one CPU core this runs about 2*10^4 match-steps per millisecond with 10^4
+# matches and 5-6*10^4 with 10^5 to 10^6 (AI vs AI).
+#
+# Requires NumPy (the game itself does not).
+
+import math
+
+import numpy as np
+
+from pong_sim import (SCREEN_WIDTH, SCREEN_HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE,
+                      MAX_SCORE, PADDLE_MARGIN, BALL_INITIAL_SPEED, PADDLE_SPEED,
+                      BALL_SPEED_INCREMENT, BALL_MAX_AXIS_SPEED, SERVE_DELAY_TICKS,
+                      GAME_MODES, PADDLE1_CONTACT_X, PADDLE2_CONTACT_X, BALL_MAX_Y,
+                      MAX_SUBSTEPS, ai_profile)
+
+PADDLE1_X = PADDLE_MARGIN
+PADDLE2_X = SCREEN_WIDTH - PADDLE_MARGIN - PADDLE_WIDTH
+BALL_START_X = SCREEN_WIDTH // 2 - BALL_SIZE // 2
+BALL_START_Y = SCREEN_HEIGHT // 2 - BALL_SIZE // 2
+PADDLE_START_Y = SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2
+
+# The court is mirror-symmetric around the ball's start column, so the ball's
+# horizontal distance from it tells both "crossed a paddle face" and "scored"
+FACE_DISTANCE = BALL_START_X - PADDLE1_CONTACT_X # Touching a paddle face at this distance
+GOAL_DISTANCE = BALL_START_X                     # Scored when at least this far
+
+PADDLE_CENTER_MIN = PADDLE_HEIGHT // 2
+PADDLE_CENTER_MAX = SCREEN_HEIGHT - PADDLE_HEIGHT // 2
+COURT_SPAN = BALL_MAX_Y # Range of the ball's top edge, wall to wall
+
+# Per-match quantities are float32: halving memory traffic matters more than
+# precision here, since positions and paddle speeds only hold whole numbers
+FLOAT = np.float32
+
+
+def _per_match(value, n, dtype=FLOAT):
+    """Broadcasts a scalar or per-match sequence to an array of length n."""
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,)).copy()
+
+
+def predict_arrival_y(ball_x, ball_y, speed_x, speed_y, player):
+    """Vectorized pong_sim.predict_arrival_y: arrival center y at the player's paddle."""
+    across = PADDLE2_CONTACT_X - PADDLE1_CONTACT_X
+    if player == 2:
+        distance = np.where(speed_x > 0, PADDLE2_CONTACT_X - ball_x,
+                            (ball_x - PADDLE1_CONTACT_X) + across)
+    else:
+        distance = np.where(speed_x < 0, ball_x - PADDLE1_CONTACT_X,
+                            (PADDLE2_CONTACT_X - ball_x) + across)
+    travel = np.maximum(distance, 0) / np.abs(speed_x) * speed_y
+    y = np.mod(ball_y + travel, 2 * COURT_SPAN)
+    return np.where(y <= COURT_SPAN, y, 2 * COURT_SPAN - y) + BALL_SIZE / 2
+
+
+class _AIColumn:
+    """Per-match predictive AI (pong_sim.PaddleAI) for one paddle.
+
+    Targets are kept as the paddle top y to head for, always within the court,
+    so moving toward one never needs clamping.
+    """
+
+    def __init__(self, n, player, speed, reaction_ticks, error):
+        self.player = player
+        self.speed = _per_match(speed, n)
+        self.neg_speed = -self.speed
+        self.reaction_ticks = _per_match(reaction_ticks, n, np.int64)
+        self.error = _per_match(error, n)
+        self.target = np.full(n, PADDLE_START_Y, dtype=FLOAT)
+        self.planned_target = np.full(n, PADDLE_START_Y, dtype=FLOAT)
+        self.react_at = np.zeros(n, dtype=np.int64)
+        # Reactions waiting to happen, keyed by batch tick like the serve queue
+        self.react_queue = {}
+
+    def schedule(self, idx, target, tick):
+        """Sets new paddle center targets for the given matches, adopted after each one's reaction delay."""
+        self.planned_target[idx] = np.clip(target, PADDLE_CENTER_MIN, PADDLE_CENTER_MAX) - PADDLE_HEIGHT // 2
+        react_at = tick + self.reaction_ticks[idx]
+        self.react_at[idx] = react_at
+        for due in np.unique(react_at):
+            group = idx[react_at == due]
+            if due <= tick:
+                self.target[group] = self.planned_target[group]
+            else:
+                self.react_queue.setdefault(int(due), []).append(group)
+
+    def react(self, tick):
+        """Switches to the planned target wherever the reaction delay ends at `tick`."""
+        pending = self.react_queue.pop(tick, None)
+        if not pending:
+            return
+        idx = np.concatenate(pending)
+        idx = idx[self.react_at[idx] == tick] # Skip plans replaced by a newer one
+        self.target[idx] = self.planned_target[idx]
+
+
+class BatchSim:
+    """N matches advanced together; every attribute is an array indexed by match.
+
+    Paddle 2 is always the AI (as in pong_sim). Paddle 1 is the AI too when
+    `player1_difficulty` is given, otherwise it follows the inputs passed to
+    step(). AI parameters may be scalars or one value per match, so a single
+    batch can sweep a whole parameter grid.
+
+    Balls whose straight move this tick would cross a wall or a paddle face
+    are re-resolved with pong_sim's swept collision test; every other ball
+    just moves, so the per-tick cost stays a few whole-array operations.
+
+    Matches always step at pong_sim.TICK_RATE, the rate the rules are tuned for.
+
+    The rules match pong_sim.step() tick for tick, but random numbers are drawn
+    from one NumPy generator for the whole batch and velocities are single
+    precision, so matches are statistically equivalent to scalar runs rather
+    than bit-identical to one with the same seed.
+    """
+
+    def __init__(self, n, mode="classic_ai", difficulty="medium", player1_difficulty=None,
+                 seed=None, ai_speed=None, ai_reaction_ticks=None, ai_error=None,
+                 player1_ai_speed=None, player1_ai_reaction_ticks=None, player1_ai_error=None,
+                 serve_delay=SERVE_DELAY_TICKS):
+        if mode not in GAME_MODES or mode == "two_player":
+            raise ValueError(f"BatchSim needs an AI opponent, got mode {mode!r}")
+        self.n = n
+        self.mode = mode
+        self.serve_delay = max(serve_delay, 0)
+        self.rng = np.random.default_rng(seed)
+        self.player1_ai = player1_difficulty is not None
+
+        # Every per-match quantity shares one float dtype so a step never casts
+        speed, reaction_ticks, error = ai_profile(mode, difficulty)
+        self.ai = _AIColumn(n, 2, speed if ai_speed is None else ai_speed,
+                            reaction_ticks if ai_reaction_ticks is None else ai_reaction_ticks,
+                            error if ai_error is None else ai_error)
+        speed, reaction_ticks, error = ai_profile("classic_ai", player1_difficulty or "medium")
+        self.player1_ai_params = _AIColumn(
+            n, 1, speed if player1_ai_speed is None else player1_ai_speed,
+            reaction_ticks if player1_ai_reaction_ticks is None else player1_ai_reaction_ticks,
+            error if player1_ai_error is None else player1_ai_error)
+        self._ai_columns = [self.ai, self.player1_ai_params] if self.player1_ai else [self.ai]
+
+        # Match state; x and y rows of one array each, so a straight move is a single add
+        self._position = np.empty((2, n), dtype=FLOAT)
+        self._velocity = np.empty((2, n), dtype=FLOAT)
+        self.ball_x, self.ball_y = self._position
+        self.speed_x, self.speed_y = self._velocity # Zero while the ball waits to be served
+        self.serve_speed_x = np.empty(n, dtype=FLOAT) # Velocity the waiting ball will be served with
+        self.serve_speed_y = np.empty(n, dtype=FLOAT)
+        self.speed_magnitude = np.empty(n, dtype=FLOAT)
+        self.active = np.empty(n, dtype=bool)
+        self.paddle1_y = np.empty(n, dtype=FLOAT)
+        self.paddle2_y = np.empty(n, dtype=FLOAT)
+        self.player1_score = np.empty(n, dtype=np.int32)
+        self.player2_score = np.empty(n, dtype=np.int32)
+        self.done = np.empty(n, dtype=bool)
+        self.winner = np.empty(n, dtype=np.int8) # 0 while playing, else 1 or 2
+        self.start_tick = np.empty(n, dtype=np.int64)
+        self.end_tick = np.empty(n, dtype=np.int64)
+        self.tick = 0 # Ticks stepped by the whole batch
+
+        # Statistics for tuning reports
+        self.paddle_hits = np.empty(n, dtype=np.int64)
+        self.rallies = np.empty(n, dtype=np.int64)
+        self.peak_speed = np.empty(n)
+
+        # Serves waiting to happen, keyed by batch tick, so no per-tick scan is needed
+        self._serve_queue = {}
+
+        # Scratch buffers reused every step so a tick allocates as little as possible
+        self._offset = np.empty(n, dtype=FLOAT)
+        self._distance = np.empty(n, dtype=FLOAT)
+        self._next_distance = np.empty(n, dtype=FLOAT)
+        self._mask = np.empty(n, dtype=bool)
+        self._contact = np.empty(n, dtype=bool)
+
+        self.reset()
+
+    @property
+    def ticks(self):
+        """Ticks played by each match (frozen once it has finished)."""
+        return np.where(self.done, self.end_tick, self.tick) - self.start_tick
+
+    # --- Setup ---
+
+    def reset(self, mask=None):
+        """Starts fresh matches, for every match or only where `mask` is True."""
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        self.paddle1_y[idx] = PADDLE_START_Y
+        self.paddle2_y[idx] = PADDLE_START_Y
+        self.player1_score[idx] = 0
+        self.player2_score[idx] = 0
+        self.done[idx] = False
+        self.winner[idx] = 0
+        self.start_tick[idx] = self.tick
+        self.end_tick[idx] = 0
+        self.paddle_hits[idx] = 0
+        self.rallies[idx] = 0
+        self.peak_speed[idx] = BALL_INITIAL_SPEED
+        for ai in self._ai_columns:
+            ai.target[idx] = PADDLE_START_Y
+            ai.schedule(idx, SCREEN_HEIGHT // 2, self.tick)
+        self._serve(idx)
+        self._launch(self.tick)
+
+    def _serve(self, idx):
+        """Puts the ball back in the center for the given matches with new random directions."""
+        k = len(idx)
+        if k == 0:
+            return
+        rng = self.rng
+        angle = rng.uniform(math.pi/6, math.pi/3, k)
+        direction_x = rng.integers(0, 2, k) * 2 - 1
+        direction_y = rng.integers(0, 2, k) * 2 - 1
+        self.ball_x[idx] = BALL_START_X
+        self.ball_y[idx] = BALL_START_Y
+        self.speed_magnitude[idx] = BALL_INITIAL_SPEED
+        self.serve_speed_x[idx] = direction_x * np.cos(angle) * BALL_INITIAL_SPEED
+        self.serve_speed_y[idx] = direction_y * np.sin(angle) * BALL_INITIAL_SPEED
+        self.speed_x[idx] = 0
+        self.speed_y[idx] = 0
+        self.active[idx] = False
+        self._serve_queue.setdefault(self.tick + self.serve_delay, []).append(idx)
+
+    def _launch(self, tick):
+        """Puts every ball whose serve is due at `tick` into play."""
+        pending = self._serve_queue.pop(tick, None)
+        if not pending:
+            return
+        idx = np.concatenate(pending)
+        idx = idx[~self.done[idx]]
+        self.active[idx] = True
+        self.speed_x[idx] = self.serve_speed_x[idx]
+        self.speed_y[idx] = self.serve_speed_y[idx]
+        self._plan_ai(idx)
+
+    def _finish(self, idx, winner):
+        """Ends the given matches and parks their ball in the center, out of play."""
+        self.done[idx] = True
+        self.winner[idx] = winner
+        self.end_tick[idx] = self.tick + 1
+        self.active[idx] = False
+        self.ball_x[idx] = BALL_START_X
+        self.ball_y[idx] = BALL_START_Y
+        self.speed_x[idx] = 0
+        self.speed_y[idx] = 0
+
+    # --- Simulation ---
+
+    def _plan_ai(self, idx):
+        """Re-predicts the ball's arrival for the given matches (on serves and paddle hits)."""
+        if len(idx) == 0:
+            return
+        ball_x = self.ball_x[idx]
+        ball_y = self.ball_y[idx]
+        speed_x = self.speed_x[idx]
+        speed_y = self.speed_y[idx]
+        # Aim error in [-spread, spread], growing with the rally speed as in pong_sim
+        speed_ratio = self.speed_magnitude[idx] / BALL_INITIAL_SPEED
+        for ai in self._ai_columns:
+            arrival = np.floor(predict_arrival_y(ball_x, ball_y, speed_x, speed_y, ai.player) + 0.5)
+            spread = np.floor(ai.error[idx] * speed_ratio + 0.5).astype(np.int64)
+            arrival += self.rng.integers(-spread, spread + 1)
+            ai.schedule(idx, arrival, self.tick)
+
+    def _ai_move(self, paddle_y, ai):
+        """Moves a whole column of AI paddles straight toward their targets."""
+        ai.react(self.tick)
+        offset = np.subtract(ai.target, paddle_y, out=self._offset)
+        np.minimum(offset, ai.speed, out=offset)
+        np.maximum(offset, ai.neg_speed, out=offset)
+        paddle_y += offset # Targets are inside the court, so this never needs clamping
+
+    @staticmethod
+    def _move_paddle(paddle_y, paddle_speed):
+        paddle_y += paddle_speed
+        np.clip(paddle_y, 0, SCREEN_HEIGHT - PADDLE_HEIGHT, out=paddle_y)
+
+    def _paddle_bounce(self, idx, speed_x, speed_y):
+        """Paddle-face bounces for the given balls moving at (speed_x, speed_y).
+
+        Reverses, speeds up, renormalizes and clamps; returns the new velocity.
+        """
+        speed_x = -speed_x
+        magnitude = self.speed_magnitude[idx] + BALL_SPEED_INCREMENT
+        scale = magnitude / np.hypot(speed_x, speed_y)
+        self.speed_magnitude[idx] = magnitude
+        self.paddle_hits[idx] += 1
+        self.peak_speed[idx] = np.maximum(self.peak_speed[idx], magnitude)
+        return (np.clip(speed_x * scale, -BALL_MAX_AXIS_SPEED, BALL_MAX_AXIS_SPEED),
+                np.clip(speed_y * scale, -BALL_MAX_AXIS_SPEED, BALL_MAX_AXIS_SPEED))
+
+    def _sweep(self, idx):
+        """Replays this tick's move for the given balls with pong_sim's swept collisions.
+
+        Vectorized pong_sim._move_ball: each pass advances every ball to its
+        earliest wall or paddle-face contact (or the end of the tick) and
+        reflects it there. Works on copies of the balls' state, written back
+        as each ball finishes its tick. Returns the balls that hit a paddle.
+        """
+        speed_x = self.speed_x[idx]
+        speed_y = self.speed_y[idx]
+        ball_x = self.ball_x[idx] - speed_x
+        ball_y = self.ball_y[idx] - speed_y
+        paddle1_y = self.paddle1_y[idx]
+        paddle2_y = self.paddle2_y[idx]
+        remaining = np.ones(len(idx), dtype=FLOAT)
+        hits = []
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _ in range(MAX_SUBSTEPS):
+                # With no speed along an axis a ball never meets that axis's lines; a
+                # ball resting on one gives 0/0 = nan, which fmin passes over
+                wall_gap = np.where(speed_y < 0, ball_y, BALL_MAX_Y - ball_y)
+                wall_time = np.maximum(wall_gap, 0) / np.abs(speed_y)
+
+                leftward = speed_x < 0
+                face_gap = np.where(leftward, ball_x - PADDLE1_CONTACT_X, PADDLE2_CONTACT_X - ball_x)
+                face_time = face_gap / np.abs(speed_x)
+                contact_y = ball_y + speed_y * face_time
+                paddle_y = np.where(leftward, paddle1_y, paddle2_y)
+                on_face = ((face_gap >= 0) & (contact_y > paddle_y - BALL_SIZE) &
+                           (contact_y < paddle_y + PADDLE_HEIGHT))
+                face_time[~on_face] = np.inf
+
+                t = np.fmin(np.fmin(wall_time, face_time), remaining)
+                ball_x += speed_x * t
+                ball_y += speed_y * t
+                remaining -= t
+                speed_y[wall_time <= t] *= -1
+                face = face_time <= t
+                if face.any():
+                    hit = idx[face]
+                    speed_x[face], speed_y[face] = self._paddle_bounce(hit, speed_x[face], speed_y[face])
+                    hits.append(hit)
+
+                going = remaining > 0
+                if going.all():
+                    continue
+                done = ~going
+                finished = idx[done]
+                self.ball_x[finished] = ball_x[done]
+                self.ball_y[finished] = ball_y[done]
+                self.speed_x[finished] = speed_x[done]
+                self.speed_y[finished] = speed_y[done]
+                if not going.any():
+                    break
+                idx, remaining = idx[going], remaining[going]
+                ball_x, ball_y, speed_x, speed_y = ball_x[going], ball_y[going], speed_x[going], speed_y[going]
+                paddle1_y, paddle2_y = paddle1_y[going], paddle2_y[going]
+            else:
+                # Out of substeps: the balls stay wherever they got to
+                self.ball_x[idx] = ball_x
+                self.ball_y[idx] = ball_y
+                self.speed_x[idx] = speed_x
+                self.speed_y[idx] = speed_y
+        return np.concatenate(hits) if hits else idx[:0]
+
+    def _score(self, idx):
+        """Awards points (or ends survival runs) for the given balls and re-serves them."""
+        self.rallies[idx] += 1
+        left = idx[self.ball_x[idx] <= 0]
+        right = idx[self.ball_x[idx] > 0]
+        if self.mode == "survival":
+            # The ball got past the player: survival run is over
+            self._serve(right)
+            for ai in self._ai_columns:
+                ai.schedule(right, SCREEN_HEIGHT // 2, self.tick)
+            self._finish(left, 2)
+            return
+        self.player2_score[left] += 1
+        self.player1_score[right] += 1
+        self._serve(idx)
+        for ai in self._ai_columns:
+            ai.schedule(idx, SCREEN_HEIGHT // 2, self.tick)
+        self._finish(idx[self.player1_score[idx] >= MAX_SCORE], 1)
+        self._finish(idx[self.player2_score[idx] >= MAX_SCORE], 2)
+
+    def step(self, player1_input=0):
+        """Advances every unfinished match by one tick.
+
+        `player1_input` is the held direction for paddle 1 (-1, 0 or 1, a scalar
+        or one per match) and is ignored when paddle 1 is AI-controlled.
+        """
+        # Serve countdown
+        self._launch(self.tick)
+
+        # Paddles
+        if self.player1_ai:
+            self._ai_move(self.paddle1_y, self.player1_ai_params)
+        elif np.ndim(player1_input) or player1_input:
+            speed = np.multiply(player1_input, PADDLE_SPEED, dtype=FLOAT)
+            self._move_paddle(self.paddle1_y, np.broadcast_to(speed, (self.n,)))
+        self._ai_move(self.paddle2_y, self.ai)
+
+        # Ball movement: a straight move for every ball, then the few whose path
+        # touched a wall or crossed a paddle face are swept again exactly
+        ball_x = self.ball_x
+        distance = np.subtract(ball_x, BALL_START_X, out=self._distance)
+        np.abs(distance, out=distance)
+        self._position += self._velocity
+        next_distance = np.subtract(ball_x, BALL_START_X, out=self._next_distance)
+        np.abs(next_distance, out=next_distance)
+
+        contact = np.less_equal(distance, FACE_DISTANCE, out=self._contact)
+        contact &= np.greater_equal(next_distance, FACE_DISTANCE, out=self._mask)
+        contact |= np.less_equal(self.ball_y, 0, out=self._mask)
+        contact |= np.greater_equal(self.ball_y, BALL_MAX_Y, out=self._mask)
+        contact = np.flatnonzero(contact)
+        if len(contact):
+            hits = self._sweep(contact)
+            if len(hits):
+                self._plan_ai(hits)
+            next_distance[contact] = np.abs(ball_x[contact] - BALL_START_X)
+        distance = next_distance
+
+        # Scoring Logic (finished matches are parked in the center and never score)
+        scored = np.flatnonzero(np.greater_equal(distance, GOAL_DISTANCE, out=self._mask))
+        if len(scored):
+            self._score(scored)
+
+        if self.serve_delay == 0:
+            # Balls re-served this tick with no delay go live before the next tick runs
+            self._launch(self.tick)
+        self.tick += 1
+
+    def run(self, max_ticks=1_000_000, player1_input=0):
+        """Steps until every match has finished (or max_ticks pass); returns the tick count."""
+        ticks = 0
+        while ticks < max_ticks and not self.done.all():
+            self.step(player1_input)
+            ticks += 1
+        return ticks
+
+    # --- Reporting ---
+
+    def summary(self):
+        """Aggregated results over every finished match."""
+        done = self.done
+        finished = int(done.sum())
+        if not finished:
+            return {"matches": 0, "player1_win_rate": 0.0, "player2_win_rate": 0.0,
+                    "mean_ticks": 0.0, "mean_rally_hits": 0.0, "peak_speed": 0.0}
+        rallies = np.maximum(self.rallies[done], 1)
+        return {
+            "matches": finished,
+            "player1_win_rate": float((self.winner[done] == 1).mean()),
+            "player2_win_rate": float((self.winner[done] == 2).mean()),
+            "mean_ticks": float(self.ticks[done].mean()),
+            "mean_rally_hits": float((self.paddle_hits[done] / rallies).mean()),
+            "peak_speed": float(self.peak_speed[done].max()),
+        }
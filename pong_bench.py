@@ -0,0 +1,428 @@
+# PyPong - Frame-Time Benchmarks
+# Loads the game under SDL's dummy video driver and drives every game state,
+# each arena and a few stress scenarios with scripted inputs, one simulation
+# tick per frame. For each scenario it reports frame time percentiles, the
+# draw calls made on the screen surface and (in a separate traced pass, so
+# tracing never skews the timings) memory allocated per frame, as JSON.
+#
+# With --baseline it compares against an earlier report and exits non-zero
+# when a scenario's frame time regressed by more than --threshold.
+#
+# Usage: python pong_bench.py --output bench.json
+#        python pong_bench.py --baseline bench.json --threshold 0.15
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+# Must be set before pygame opens a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+GAME_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PyPongBeta0.13.py")
+
+DEFAULT_FRAMES = 600      # Measured frames per scenario (10 s of game time)
+DEFAULT_WARMUP = 60       # Frames run first to fill caches and settle the match
+DEFAULT_ALLOC_FRAMES = 200
+DEFAULT_THRESHOLD = 0.10  # Allowed frame-time slowdown before --baseline fails
+DEFAULT_METRIC = "p95"
+
+PERCENTILES = (50, 95, 99)
+
+# Stress settings
+STRESS_PARTICLE_BURST = 40  # Particles emitted every frame; keeps the pool near capacity
+STRESS_TRAIL_LENGTH = 200
+STRESS_TRAIL_SEGMENT_SIZE = 8
+STRESS_BALL_COUNT = 256     # Balls in the multi-ball stress match (the mode's target is 200+ at 60 FPS)
+
+
+def load_game(path=GAME_SCRIPT):
+    """Imports the game script as a module; its main loop only runs when it is __main__."""
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location("pypong_game", path)
+    game = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(game)
+    return game
+
+
+class CountingSurface(pygame.Surface):
+    """Off-screen stand-in for the display surface that counts what is drawn on it.
+
+    Has the display's size and pixel format, so blits cost the same as on the
+    dummy driver's own surface.
+    """
+
+    def __init__(self, like):
+        super().__init__(like.get_size(), 0, like)
+        self.counts = Counter()
+
+    def blit(self, *args, **kwargs):
+        self.counts["blit"] += 1
+        return super().blit(*args, **kwargs)
+
+    def blits(self, blit_sequence, *args, **kwargs):
+        blit_sequence = list(blit_sequence)
+        self.counts["blits"] += 1
+        self.counts["blits_items"] += len(blit_sequence)
+        return super().blits(blit_sequence, *args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        self.counts["fill"] += 1
+        return super().fill(*args, **kwargs)
+
+
+def _count_draw_calls(screen):
+    """Counts pygame.draw primitives on `screen` and display uploads in screen.counts."""
+    def counted_primitive(name, function):
+        def primitive(surface, *args, **kwargs):
+            if surface is screen:
+                screen.counts["draw_" + name] += 1
+            return function(surface, *args, **kwargs)
+        return primitive
+
+    for name in ("rect", "ellipse", "circle", "line", "lines", "aaline", "aalines", "polygon", "arc"):
+        setattr(pygame.draw, name, counted_primitive(name, getattr(pygame.draw, name)))
+
+    flip, update = pygame.display.flip, pygame.display.update
+    screen_area = screen.get_width() * screen.get_height()
+
+    def counted_flip():
+        screen.counts["flip"] += 1
+        screen.counts["uploaded_pixels"] += screen_area
+        return flip()
+
+    def counted_update(rects=None):
+        if rects is None:
+            return counted_flip()
+        screen.counts["update"] += 1
+        rects = list(rects)
+        screen.counts["uploaded_pixels"] += sum(rect.width * rect.height for rect in rects)
+        return update(rects)
+
+    pygame.display.flip = counted_flip
+    pygame.display.update = counted_update
+
+
+# --- Scripted Input ---
+
+class ScriptedMouse:
+    """Replaces pygame.mouse.get_pos with a position the scenario controls."""
+
+    def __init__(self):
+        self.pos = (0, 0)
+        pygame.mouse.get_pos = lambda: self.pos
+
+
+def _key_events(frame):
+    """Player 1 holds up, then down, for half a second each, with short gaps between."""
+    phase = frame % 80
+    if phase == 0:
+        return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP)]
+    if phase == 30:
+        return [pygame.event.Event(pygame.KEYUP, key=pygame.K_UP)]
+    if phase == 40:
+        return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_DOWN)]
+    if phase == 70:
+        return [pygame.event.Event(pygame.KEYUP, key=pygame.K_DOWN)]
+    return []
+
+
+def _hover_buttons(game, mouse, frame):
+    """Moves the mouse onto each button of the screen in turn, and off again."""
+    buttons = game.MENU_SCREEN_BUTTONS[game.game_state]
+    slot = frame // 15 % (len(buttons) + 1)
+    mouse.pos = buttons[slot].rect.center if slot < len(buttons) else (5, 5)
+    return []
+
+
+# --- Scenarios ---
+
+def _start_match(game, arena, mode="classic_ai", difficulty="hard"):
+    game.current_game_mode = mode
+    game.ai_difficulty_level = difficulty
+    game.start_game_transition(arena)
+    pygame.time.set_timer(game.ARENA_LOAD_EVENT, 0) # Frames are driven here, not by the timer
+    game.game_state = "game_running"
+
+
+def _match_scenario(arena, mode="classic_ai"):
+    def setup(game):
+        _start_match(game, arena, mode)
+    return setup
+
+
+def _state_scenario(state):
+    def setup(game):
+        game.game_state = state
+    return setup
+
+
+def _setup_splash(game):
+    game.game_state = "splash"
+
+
+def _splash_frame(game, mouse, frame):
+    # Walk through the whole six-second sequence without letting it finish
+    game.splash_start_time = time.time() - frame % 359 / 60
+    return []
+
+
+def _setup_loading(game):
+    _start_match(game, "original")
+    game.game_state = "arena_loading"
+
+
+def _setup_game_over(game):
+    _start_match(game, "original")
+    game.sim.winning_player = "Player 1"
+    game.game_state = "game_over"
+
+
+def _max_speed_frame(game, mouse, frame):
+    ball = game.sim.ball
+    if ball.active:
+        ball.speed_magnitude = game.pong_sim.BALL_MAX_AXIS_SPEED
+        ball.speed_x = game.pong_sim.BALL_MAX_AXIS_SPEED * (1 if ball.speed_x >= 0 else -1)
+        ball.speed_y = game.pong_sim.BALL_MAX_AXIS_SPEED * (1 if ball.speed_y >= 0 else -1)
+    return _key_events(frame)
+
+
+def _particles_frame(game, mouse, frame):
+    game.particles.emit(game.ball.rect.centerx, game.ball.rect.centery, STRESS_PARTICLE_BURST)
+    return _key_events(frame)
+
+
+def _setup_long_trails(game):
+    _start_match(game, "original")
+    game.ball.max_trail_length = STRESS_TRAIL_LENGTH
+    game.ball.trail_segment_size = STRESS_TRAIL_SEGMENT_SIZE
+
+
+def _setup_many_balls(game):
+    _start_match(game, "original", game.pong_multiball.MULTI_BALL_MODE)
+    # Swap in a bigger match, already in full swing, with every ball served
+    multiball = game.pong_multiball
+    game.sim = multiball.new_game(difficulty=game.ai_difficulty_level, serve_delay=0,
+                                  tick_rate=game.SIM_TICK_RATE, ball_count=STRESS_BALL_COUNT)
+    multiball.run_match(game.sim, max_ticks=STRESS_BALL_COUNT * multiball.MULTI_BALL_SERVE_GAP_TICKS)
+    game.sync_views()
+    game.swarm.snap()
+
+
+def _game_frame(game, mouse, frame):
+    return _key_events(frame)
+
+
+# name -> (setup(game), per-frame script(game, mouse, frame) -> events, game_state it measures)
+SCENARIOS = {
+    "splash": (_setup_splash, _splash_frame, "splash"),
+    "menu": (_state_scenario("menu"), _hover_buttons, "menu"),
+    "single_player_difficulty_select": (_state_scenario("single_player_difficulty_select"),
+                                        _hover_buttons, "single_player_difficulty_select"),
+    "arena_loading": (_setup_loading, _game_frame, "arena_loading"),
+    "game_running_original": (_match_scenario("original"), _game_frame, "game_running"),
+    "game_running_basketball": (_match_scenario("basketball"), _game_frame, "game_running"),
+    "game_running_table_tennis": (_match_scenario("table_tennis"), _game_frame, "game_running"),
+    "game_running_ocean_wave": (_match_scenario("ocean_wave"), _game_frame, "game_running"),
+    "game_running_survival": (_match_scenario("original", "survival"), _game_frame, "game_running"),
+    "game_running_multi_ball": (_match_scenario("original", "multi_ball"), _game_frame, "game_running"),
+    "game_over": (_setup_game_over, _hover_buttons, "game_over"),
+    "stress_max_speed": (_match_scenario("original"), _max_speed_frame, "game_running"),
+    "stress_particles": (_match_scenario("original"), _particles_frame, "game_running"),
+    "stress_long_trails": (_setup_long_trails, _game_frame, "game_running"),
+    "stress_multi_ball": (_setup_many_balls, _game_frame, "game_running"),
+}
+
+
+# --- Measurement ---
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[rank - 1]
+
+
+def _run_frames(game, mouse, name, frames, measure):
+    """Runs `frames` frames of a scenario, calling measure(run_one_frame) for each."""
+    setup, script, state = SCENARIOS[name]
+    frame_seconds = game.SIM_TICK_SECONDS
+    restarts = 0
+    setup(game)
+    frame = 0
+
+    def run_one_frame():
+        for event in script(game, mouse, frame):
+            game.handle_event(event)
+        game.run_frame(frame_seconds)
+
+    for frame in range(frames):
+        if game.game_state != state:
+            # The match ended (or the splash moved on): start the scenario over
+            setup(game)
+            restarts += 1
+        measure(run_one_frame)
+    return restarts
+
+
+def benchmark_scenario(game, mouse, name, frames, warmup, alloc_frames):
+    """Times, counts and allocation-traces one scenario; returns its report entry."""
+    screen = game.screen
+    _run_frames(game, mouse, name, warmup, lambda run: run())
+
+    times = []
+    screen.counts.clear()
+
+    def timed(run):
+        start = time.perf_counter_ns()
+        run()
+        times.append(time.perf_counter_ns() - start)
+
+    restarts = _run_frames(game, mouse, name, frames, timed)
+    counts = dict(screen.counts)
+
+    peaks, nets = [], []
+
+    def traced(run):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        nets.append(current - before)
+
+    if alloc_frames:
+        tracemalloc.start()
+        try:
+            _run_frames(game, mouse, name, alloc_frames, traced)
+        finally:
+            tracemalloc.stop()
+
+    times.sort()
+    frame_ms = {"mean": round(sum(times) / len(times) / 1e6, 4), "max": round(times[-1] / 1e6, 4)}
+    for percent in PERCENTILES:
+        frame_ms[f"p{percent}"] = round(_percentile(times, percent) / 1e6, 4)
+    draw_calls = sum(count for key, count in counts.items() if key in ("blit", "blits", "fill") or key.startswith("draw_"))
+    report = {
+        "frames": frames,
+        "restarts": restarts,
+        "frame_ms": frame_ms,
+        "draw_calls_per_frame": round(draw_calls / frames, 2),
+        "draw_call_breakdown": {key: round(count / frames, 2) for key, count in sorted(counts.items())
+                                if key != "uploaded_pixels"},
+        "uploaded_screen_fraction": round(counts.get("uploaded_pixels", 0) / frames
+                                          / (screen.get_width() * screen.get_height()), 4),
+    }
+    if alloc_frames:
+        report["alloc_per_frame"] = {
+            "peak_bytes_mean": round(sum(peaks) / len(peaks)),
+            "peak_bytes_max": max(peaks),
+            "net_bytes_mean": round(sum(nets) / len(nets), 1),
+        }
+    return report
+
+
+def run_benchmarks(names, frames=DEFAULT_FRAMES, warmup=DEFAULT_WARMUP, alloc_frames=DEFAULT_ALLOC_FRAMES,
+                   game_script=GAME_SCRIPT, progress=None):
+    """Benchmarks the named scenarios and returns the full JSON-ready report."""
+    start = time.perf_counter()
+    game = load_game(game_script)
+    load_ms = (time.perf_counter() - start) * 1000
+    screen = CountingSurface(game.screen)
+    game.screen = screen
+    game.renderer.surface = screen
+    _count_draw_calls(screen)
+    mouse = ScriptedMouse()
+
+    scenarios = {}
+    for name in names:
+        scenarios[name] = benchmark_scenario(game, mouse, name, frames, warmup, alloc_frames)
+        if progress is not None:
+            progress(name, scenarios[name])
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": os.environ["SDL_VIDEODRIVER"],
+            "dirty_rect_rendering": game.DIRTY_RECT_RENDERING,
+            "game_load_ms": round(load_ms, 2), # Importing the game script (pygame already loaded)
+            "frames": frames,
+            "warmup_frames": warmup,
+            "alloc_frames": alloc_frames,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(report, baseline, metric=DEFAULT_METRIC, threshold=DEFAULT_THRESHOLD):
+    """Returns (lines, regressed): a comparison table and the scenarios slower than allowed."""
+    lines = [f"{'scenario':<34}{'baseline':>10}{'current':>10}{'change':>9}"]
+    regressed = []
+    for name, result in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            lines.append(f"{name:<34}{'-':>10}{result['frame_ms'][metric]:>10.3f}{'new':>9}")
+            continue
+        before, after = old["frame_ms"][metric], result["frame_ms"][metric]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:<34}{before:>10.3f}{after:>10.3f}{change:>+9.1%}{flag}")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PyPong frame times under the dummy video driver.")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="unmeasured frames first")
+    parser.add_argument("--alloc-frames", type=int, default=DEFAULT_ALLOC_FRAMES,
+                        help="frames traced with tracemalloc (0 to skip)")
+    parser.add_argument("--game", default=GAME_SCRIPT, help="game script to benchmark")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--metric", default=DEFAULT_METRIC, choices=["mean"] + [f"p{p}" for p in PERCENTILES],
+                        help="frame-time statistic compared with --baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fractional slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    def progress(name, result):
+        ms = result["frame_ms"]
+        print(f"{name:<34} p50 {ms['p50']:7.3f} ms  p95 {ms['p95']:7.3f} ms  p99 {ms['p99']:7.3f} ms  "
+              f"{result['draw_calls_per_frame']:6.1f} draws", file=sys.stderr)
+
+    report = run_benchmarks(args.scenario, args.frames, args.warmup, args.alloc_frames, args.game, progress)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressed = compare(report, baseline, args.metric, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if regressed:
+            print(f"{len(regressed)} scenario(s) regressed by more than {args.threshold:.0%} ({args.metric})",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
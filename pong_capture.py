@@ -0,0 +1,376 @@
+# PyPong - Frame Capture
+# Records what the game draws as a PNG sequence or a raw RGB stream, for
+# attract-mode loops and bug reports. FrameCapture is used in game (F9 starts
+# and stops a recording) and by this script, which renders every frame under
+# SDL's dummy video driver, as fast as rendering and encoding allow:
+#
+#   a replay      --replay match.pprp   (what happened in a bug report)
+#   attract mode  two AIs playing a match from --seed in --arena
+#
+# Each frame is copied once, straight from the screen surface's pixel buffer
+# into a preallocated slot, and handed through a bounded queue to a pool of
+# encoder threads, which convert it to RGB and compress (zlib) and write it;
+# both of those release the GIL. In game, a frame that finds every slot busy
+# is dropped and counted rather than waited for, so capturing never holds up a
+# tick; PNG files are numbered by capture, so drops show up as gaps. This
+# script waits for a slot instead, so its output plays at the game's speed.
+#
+# Usage: python pong_capture.py --replay match.pprp --output frames/
+#        python pong_capture.py --seconds 30 --arena ocean_wave --format raw --output - |
+#            ffmpeg -f rawvideo -pix_fmt rgb24 -s 1000x700 -r 60 -i - attract.mp4
+
+import argparse
+import os
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import pygame
+
+CAPTURE_FORMATS = ("png", "raw")
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+DEFAULT_QUEUE_FRAMES = 8   # Frames waiting for an encoder before new ones are dropped
+DEFAULT_PNG_LEVEL = 1      # zlib level: game frames are mostly flat color, so 1 is nearly as small as 9
+DEFAULT_ATTRACT_SECONDS = 30
+DEFAULT_TAIL_SECONDS = 2   # Game over screen kept at the end of a capture
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Byte order of a 32-bit pixel -> pygame.image.frombuffer format, by (red, green, blue) mask
+_BUFFER_FORMATS = {
+    (0xFF0000, 0x00FF00, 0x0000FF): "BGRA",
+    (0x0000FF, 0x00FF00, 0xFF0000): "RGBX",
+}
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+
+
+def encode_png(rgb, width, height, level=DEFAULT_PNG_LEVEL):
+    """A truecolor PNG of `rgb` (height rows of width packed RGB pixels), unfiltered."""
+    row = width * 3
+    rows = bytearray((row + 1) * height) # Each row starts with its filter type, 0 (none)
+    view = memoryview(rows)
+    pixels = memoryview(rgb)
+    for y in range(height):
+        start = y * (row + 1) + 1
+        view[start:start + row] = pixels[y * row:(y + 1) * row]
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE + _png_chunk(b"IHDR", header) + _png_chunk(b"IDAT", zlib.compress(rows, level))
+            + _png_chunk(b"IEND", b""))
+
+
+def _buffer_format(surface):
+    """frombuffer format matching the surface's pixel bytes, or None if they can't be used as they are."""
+    if surface.get_bytesize() != 4 or surface.get_pitch() != surface.get_width() * 4 or sys.byteorder != "little":
+        return None
+    return _BUFFER_FORMATS.get(tuple(surface.get_masks()[:3]))
+
+
+class FrameCapture:
+    """Copies frames off a surface and encodes them on a pool of worker threads.
+
+    Call capture(surface) after each frame is presented. Frames go to
+    `output`: a folder of frame_000000.png files for "png", or a file (or "-"
+    for stdout) of back-to-back RGB24 frames for "raw". With block=False a
+    frame that finds every buffer slot busy is dropped (frame numbers count
+    dropped frames too); with block=True capture() waits for one. close()
+    finishes the queued frames.
+    """
+
+    def __init__(self, surface, output, capture_format="png", workers=DEFAULT_WORKERS,
+                 queue_frames=DEFAULT_QUEUE_FRAMES, block=False, png_level=DEFAULT_PNG_LEVEL):
+        if capture_format not in CAPTURE_FORMATS:
+            raise ValueError(f"capture_format must be one of {CAPTURE_FORMATS}, got {capture_format!r}")
+        self.size = surface.get_size()
+        self.capture_format = capture_format
+        self.output = output
+        self.block = block
+        self.png_level = png_level
+        self.buffer_format = _buffer_format(surface)
+        self.frames = 0        # Frames queued for encoding
+        self.dropped = 0       # Frames skipped because the encoders were behind
+        self.encoded = 0
+        self.capture_seconds = 0.0 # Time spent in capture(), on the caller's thread, dropped frames included
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+        width, height = self.size
+        slot_size = width * height * (4 if self.buffer_format else 3)
+        # One slot per queued frame and per frame being encoded; a free slot is the right to capture
+        self._free = queue.SimpleQueue()
+        for _ in range(queue_frames + workers):
+            self._free.put(bytearray(slot_size))
+        self._queue = queue.Queue(queue_frames)
+        self._turn = threading.Condition() # Raw frames are written in capture order
+        self._next_write = 0
+
+        if capture_format == "png":
+            os.makedirs(output, exist_ok=True)
+            self._stream = None
+        elif output == "-":
+            self._stream = sys.stdout.buffer
+        else:
+            self._stream = open(output, "wb")
+        self._workers = [threading.Thread(target=self._work, name=f"capture-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+        self._closer = None
+
+    def capture(self, surface):
+        """Queues the surface's current pixels; returns False if the frame was dropped."""
+        start = time.perf_counter()
+        queued = self._queue_frame(surface)
+        if queued:
+            self.frames += 1
+        else:
+            self.dropped += 1
+        self.capture_seconds += time.perf_counter() - start
+        return queued
+
+    def _queue_frame(self, surface):
+        if surface.get_size() != self.size or self._closer is not None:
+            return False
+        try:
+            slot = self._free.get(self.block)
+        except queue.Empty:
+            return False
+        if self.buffer_format:
+            slot[:] = surface.get_buffer() # One copy, straight out of the surface's pixels
+        else:
+            slot[:] = pygame.image.tobytes(surface, "RGB")
+        try:
+            # PNG files are named by capture number, so drops leave gaps; raw frames go out in queue order
+            self._queue.put((self.frames + self.dropped, self.frames, slot), self.block)
+        except queue.Full:
+            self._free.put(slot)
+            return False
+        return True
+
+    def _rgb(self, slot):
+        if not self.buffer_format:
+            return slot
+        return pygame.image.tobytes(pygame.image.frombuffer(slot, self.size, self.buffer_format), "RGB")
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            index, order, slot = item
+            data = None
+            try:
+                data = self._rgb(slot)
+                if self.capture_format == "png":
+                    path = os.path.join(self.output, f"frame_{index:06d}.png")
+                    with open(path, "wb") as f:
+                        f.write(encode_png(data, *self.size, self.png_level))
+                    with self._turn:
+                        self.encoded += 1
+            except Exception as error:
+                self.error = self.error or error
+            if self._stream is not None:
+                self._write_in_order(order, data)
+            self._free.put(slot)
+
+    def _write_in_order(self, order, data):
+        with self._turn:
+            self._turn.wait_for(lambda: self._next_write == order)
+            try:
+                if data is not None and self.error is None:
+                    self._stream.write(data)
+                    self.encoded += 1
+            except Exception as error:
+                self.error = self.error or error
+            finally:
+                self._next_write += 1
+                self._turn.notify_all()
+
+    def _finish(self):
+        for worker in self._workers:
+            worker.join()
+        if self._stream is not None:
+            if self._stream is sys.stdout.buffer:
+                self._stream.flush()
+            else:
+                self._stream.close()
+        self.finished = time.perf_counter()
+
+    def close(self, wait=True):
+        """Stops taking frames and finishes the queued ones (in the background unless `wait`)."""
+        if self._closer is None:
+            for _ in self._workers:
+                self._queue.put(None)
+            self._closer = threading.Thread(target=self._finish, name="capture-close")
+            self._closer.start()
+        if wait:
+            self._closer.join()
+
+    def stats(self):
+        """Frame counts and throughput so far, as a dict."""
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "encoded": self.encoded,
+            "seconds": elapsed,
+            "encode_fps": self.encoded / elapsed if elapsed > 0 else 0.0,
+            "capture_ms_per_frame": 1000 * self.capture_seconds / max(1, self.frames + self.dropped),
+        }
+
+
+# --- Headless Rendering ---
+
+class FrameClock:
+    """Stands in for the game's `time` module so animations follow rendered frames, not the wall clock."""
+
+    def __init__(self, fps):
+        self.now = time.time()
+        self.frame_seconds = 1 / fps
+
+    def time(self):
+        return self.now
+
+    def advance(self):
+        self.now += self.frame_seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _start_match(game, mode, difficulty, arena, seed):
+    game.current_game_mode = mode
+    game.ai_difficulty_level = difficulty
+    game.start_game_transition(arena, seed)
+    pygame.time.set_timer(game.ARENA_LOAD_EVENT, 0) # Frames are driven here, not by the timer
+    game.game_state = "game_running"
+
+
+def _show_match(game, state):
+    """Puts `state` on screen in place of the match start_game_transition created."""
+    game.sim = state
+    game.sync_views()
+    for view in (game.ball_view, game.paddle1, game.paddle2):
+        view.snap()
+        view.interpolate(1.0)
+
+
+def render(game, clock, capture, frames, inputs_at=None, tail_frames=0):
+    """Renders the current match into `capture`, one tick a frame, for at most `frames` frames.
+
+    `clock` is the FrameClock installed as game.time. `inputs_at(tick)` gives
+    the held inputs for a tick (None leaves them alone); after game over,
+    `tail_frames` more frames of the game over screen are rendered. Returns
+    the number of frames rendered.
+    """
+    rendered = 0
+    while True:
+        if game.game_state == "game_over":
+            if tail_frames == 0:
+                break
+            tail_frames -= 1
+        elif rendered >= frames:
+            break
+        elif inputs_at is not None:
+            game.player1_input, game.player2_input = inputs_at(game.sim.ticks)
+        for event in pygame.event.get():
+            game.handle_event(event)
+        game.run_frame(game.SIM_TICK_SECONDS)
+        capture.capture(game.screen)
+        clock.advance()
+        rendered += 1
+    return rendered
+
+
+def _replay_inputs(replay):
+    changes = replay.changes
+    position = 0
+    inputs = (0, 0)
+
+    def inputs_at(tick):
+        nonlocal position, inputs
+        while position < len(changes) and changes[position][0] <= tick:
+            inputs = changes[position][1]
+            position += 1
+        return inputs
+    return inputs_at
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PyPong headlessly to a PNG sequence or raw RGB video.")
+    parser.add_argument("--replay", help="replay file to render (default: an attract-mode match between two AIs)")
+    parser.add_argument("--mode", default="classic_ai", choices=["classic_ai", "multi_ball"],
+                        help="attract-mode match type")
+    parser.add_argument("--difficulty", default="hard", help="attract-mode AI difficulty")
+    parser.add_argument("--arena", help="attract-mode arena (default: picked from the seed)")
+    parser.add_argument("--seed", type=int, help="attract-mode match seed (default: random)")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_ATTRACT_SECONDS,
+                        help="longest capture, in game seconds (a replay stops at its end)")
+    parser.add_argument("--tail-seconds", type=float, default=DEFAULT_TAIL_SECONDS,
+                        help="game over screen captured after the match ends")
+    parser.add_argument("--format", default="png", choices=CAPTURE_FORMATS, help="output format")
+    parser.add_argument("--output", required=True, help="folder for png frames, or file (- for stdout) for raw")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="encoder threads")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_FRAMES, help="frames buffered for the encoders")
+    parser.add_argument("--png-level", type=int, default=DEFAULT_PNG_LEVEL, help="zlib compression level, 0-9")
+    parser.add_argument("--game", help="game script to render with")
+    args = parser.parse_args(argv)
+
+    # Must be set before the game opens a display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYPONG_SKIP_SPLASH", "1")
+    import pong_bench
+    import pong_replay
+    game = pong_bench.load_game(args.game or pong_bench.GAME_SCRIPT)
+    game.QUALITY_GOVERNOR = False # Every frame at full quality; render time isn't real time here
+    clock = game.time = FrameClock(game.SIM_TICK_RATE)
+
+    tick_rate = game.SIM_TICK_RATE
+    frames = int(args.seconds * tick_rate)
+    if args.replay:
+        replay = pong_replay.Replay.load(args.replay)
+        if replay.tick_rate != tick_rate:
+            print(f"{args.replay}: recorded at {replay.tick_rate} ticks/s, the game renders {tick_rate}",
+                  file=sys.stderr)
+            return 1
+        _start_match(game, replay.mode, replay.difficulty, replay.arena, replay.seed)
+        _show_match(game, replay.new_game())
+        inputs_at = _replay_inputs(replay)
+        if replay.final_ticks is not None:
+            frames = replay.final_ticks
+    else:
+        seed = args.seed if args.seed is not None else pong_replay.new_seed()
+        _start_match(game, args.mode, args.difficulty, args.arena, seed)
+        rules = game.pong_multiball.rules_for(args.mode)
+        _show_match(game, rules.new_game(args.mode, args.difficulty, args.difficulty, rng=random.Random(seed),
+                                         serve_delay=0, tick_rate=tick_rate))
+        inputs_at = None
+
+    # Waits for the encoders rather than dropping frames: the output is a video, not a live view
+    capture = FrameCapture(game.screen, args.output, args.format, args.workers, args.queue,
+                           block=True, png_level=args.png_level)
+    start = time.perf_counter()
+    rendered = render(game, clock, capture, frames, inputs_at, int(args.tail_seconds * tick_rate))
+    render_seconds = time.perf_counter() - start
+    capture.close()
+    stats = capture.stats()
+
+    print(f"{rendered} frames rendered at {rendered / render_seconds:.1f} fps; "
+          f"{stats['encoded']} encoded at {stats['encode_fps']:.1f} fps, {stats['dropped']} dropped; "
+          f"capture {stats['capture_ms_per_frame']:.2f} ms/frame", file=sys.stderr)
+    if capture.error is not None:
+        print(f"Capture failed: {capture.error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+# PyPong - Reinforcement Learning Environments
+# Gym-style environments over the headless rules, for training paddle agents
+# without pygame. The agent plays the left paddle (player 1) against one of
+# pong_sim's AI opponents; a trained policy plays the right paddle by
+# mirroring the observation's x axis.
+#
+#   PongEnv     one match on pong_sim, pure Python
+#   VecPongEnv  K matches on pong_batch, stepped together, with observations
+#               and rewards in shared NumPy buffers and automatic resets
+#
+# Both follow the Gymnasium API (reset() -> (obs, info), step(action) ->
+# (obs, reward, terminated, truncated, info)), and their spaces carry the same
+# attributes as Gymnasium's Discrete and Box, so wrapping them for a training
+# library is a thin adapter; nothing here depends on one.
+#
+# Actions: 0 = move up, 1 = stay, 2 = move down.
+# Observation (floats, roughly in [-1, 1]): ball x and y over the court size,
+# ball velocity over BALL_MAX_AXIS_SPEED, both paddle centers over the court
+# height, and 1.0 while the ball is in play.
+#
+# Rewards: +1 when the ball gets past the opponent, -1 when it gets past the
+# agent, plus `rally_reward` for every return the agent makes (reward shaping
+# toward longer rallies). An episode is a single point ("point") or a whole
+# match ("match"), and is truncated after `max_episode_ticks`. Serves wait
+# the game's usual SERVE_DELAY_TICKS, so agents learn to use that time too.
+#
+# PongEnv needs nothing beyond pong_sim; VecPongEnv requires NumPy.
+
+import random
+
+import pong_sim
+from pong_sim import SCREEN_WIDTH, SCREEN_HEIGHT, PADDLE_HEIGHT, BALL_MAX_AXIS_SPEED
+
+try:
+    import numpy as np
+    import pong_batch
+except ImportError: # Only VecPongEnv needs them
+    np = None
+    pong_batch = None
+
+ACTION_UP, ACTION_STAY, ACTION_DOWN = 0, 1, 2
+OBSERVATION_SIZE = 7
+EPISODE_TYPES = ("point", "match")
+
+# Long enough for any real rally; stops an episode where the agent just stalls
+DEFAULT_MAX_EPISODE_TICKS = 60 * pong_sim.TICK_RATE
+
+
+class Discrete:
+    """Integers 0..n-1 (attributes as in gymnasium.spaces.Discrete)."""
+
+    def __init__(self, n):
+        self.n = n
+        self.shape = ()
+        self.dtype = int
+
+    def sample(self, rng=random):
+        return rng.randrange(self.n)
+
+    def contains(self, value):
+        return 0 <= int(value) < self.n
+
+
+class Box:
+    """A float vector bounded per element (attributes as in gymnasium.spaces.Box)."""
+
+    def __init__(self, low, high, shape, dtype="float32"):
+        self.low = low
+        self.high = high
+        self.shape = shape
+        self.dtype = dtype
+
+    def sample(self, rng=random):
+        return tuple(rng.uniform(self.low, self.high) for _ in range(self.shape[-1]))
+
+    def contains(self, value):
+        return len(value) == self.shape[-1] and all(self.low <= v <= self.high for v in value)
+
+
+def _check_options(mode, episode, frame_skip):
+    if mode not in ("classic_ai", "survival"):
+        raise ValueError(f"The agent needs an AI opponent, got mode {mode!r}")
+    if episode not in EPISODE_TYPES:
+        raise ValueError(f"episode must be one of {EPISODE_TYPES}, got {episode!r}")
+    if frame_skip < 1:
+        raise ValueError("frame_skip must be at least 1")
+
+
+class PongEnv:
+    """One match on pong_sim with the agent as player 1."""
+
+    action_space = Discrete(3)
+    observation_space = Box(-1.0, 1.0, (OBSERVATION_SIZE,))
+
+    def __init__(self, mode="classic_ai", difficulty="medium", episode="point", frame_skip=1,
+                 rally_reward=0.0, max_episode_ticks=DEFAULT_MAX_EPISODE_TICKS, seed=None):
+        _check_options(mode, episode, frame_skip)
+        self.mode = mode
+        self.difficulty = difficulty
+        self.episode = episode
+        self.frame_skip = frame_skip
+        self.rally_reward = rally_reward
+        self.max_episode_ticks = max_episode_ticks
+        self.rng = random.Random(seed)
+        self.state = None
+        self.episode_ticks = 0
+
+    def _observation(self):
+        state = self.state
+        ball = state.ball
+        return (ball.x / SCREEN_WIDTH, ball.y / SCREEN_HEIGHT,
+                ball.speed_x / BALL_MAX_AXIS_SPEED, ball.speed_y / BALL_MAX_AXIS_SPEED,
+                (state.paddle1.y + PADDLE_HEIGHT / 2) / SCREEN_HEIGHT,
+                (state.paddle2.y + PADDLE_HEIGHT / 2) / SCREEN_HEIGHT,
+                1.0 if ball.active else 0.0)
+
+    def reset(self, seed=None):
+        """Starts a new match; returns (observation, info)."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.state = pong_sim.new_game(self.mode, self.difficulty, rng=random.Random(self.rng.getrandbits(64)))
+        self.episode_ticks = 0
+        return self._observation(), {}
+
+    def step(self, action):
+        """Holds `action` for frame_skip ticks; returns (observation, reward, terminated, truncated, info)."""
+        state = self.state
+        inputs = (action - 1, 0)
+        reward = 0.0
+        terminated = False
+        for _ in range(self.frame_skip):
+            for event in pong_sim.step(state, inputs):
+                if event[0] == pong_sim.EVENT_PADDLE_HIT:
+                    if event[1] < SCREEN_WIDTH / 2:
+                        reward += self.rally_reward
+                elif event[0] == pong_sim.EVENT_SCORE:
+                    reward += 1.0 if event[1] == 1 else -1.0
+                    terminated = terminated or self.episode == "point"
+            self.episode_ticks += 1
+            terminated = terminated or state.game_over
+            if terminated:
+                break
+        truncated = not terminated and self.episode_ticks >= self.max_episode_ticks
+        return self._observation(), reward, terminated, truncated, {}
+
+
+class VecPongEnv:
+    """K matches on pong_batch stepped together, with the agent as player 1 in each.
+
+    step() takes K actions and returns the shared observation (K, 7), reward,
+    terminated and truncated buffers, which the next step overwrites; copy
+    them to keep them. A finished episode is reset automatically: its row
+    already shows the next episode, and the last observation of the one that
+    ended is in info["final_observation"] (rows where terminated or truncated).
+    An env whose episode ends partway through frame_skip keeps that tick's
+    reward and is masked for the rest of the step: its paddle holds still and
+    nothing more counts toward the episode that ended.
+    """
+
+    def __init__(self, num_envs, mode="classic_ai", difficulty="medium", episode="point", frame_skip=1,
+                 rally_reward=0.0, max_episode_ticks=DEFAULT_MAX_EPISODE_TICKS, seed=None):
+        if np is None:
+            raise ImportError("VecPongEnv requires NumPy")
+        _check_options(mode, episode, frame_skip)
+        self.num_envs = num_envs
+        self.episode = episode
+        self.frame_skip = frame_skip
+        self.rally_reward = rally_reward
+        self.max_episode_ticks = max_episode_ticks
+        self.action_space = Discrete(3)
+        self.observation_space = Box(-1.0, 1.0, (num_envs, OBSERVATION_SIZE))
+        self.sim = pong_batch.BatchSim(num_envs, mode, difficulty, seed=seed)
+
+        self.observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.episode_ticks = np.zeros(num_envs, dtype=np.int64)
+        self._inputs = np.zeros(num_envs, dtype=np.float32)
+        self._ended = np.zeros(num_envs, dtype=bool)
+        self._final_observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+
+    def _observe(self, out):
+        sim = self.sim
+        np.multiply(sim.ball_x, 1 / SCREEN_WIDTH, out=out[:, 0])
+        np.multiply(sim.ball_y, 1 / SCREEN_HEIGHT, out=out[:, 1])
+        # A waiting ball has no velocity yet, as in pong_sim
+        np.multiply(sim.speed_x, 1 / BALL_MAX_AXIS_SPEED, out=out[:, 2])
+        np.multiply(sim.speed_y, 1 / BALL_MAX_AXIS_SPEED, out=out[:, 3])
+        np.multiply(sim.paddle1_y + PADDLE_HEIGHT / 2, 1 / SCREEN_HEIGHT, out=out[:, 4])
+        np.multiply(sim.paddle2_y + PADDLE_HEIGHT / 2, 1 / SCREEN_HEIGHT, out=out[:, 5])
+        out[:, 6] = sim.active
+        return out
+
+    def reset(self, seed=None):
+        """Starts new matches everywhere; returns (observations, info)."""
+        if seed is not None:
+            self.sim.rng = np.random.default_rng(seed)
+        self.sim.reset()
+        self.episode_ticks[:] = 0
+        return self._observe(self.observations), {}
+
+    def step(self, actions):
+        """Holds each env's action for frame_skip ticks; returns (obs, rewards, terminated, truncated, info)."""
+        sim = self.sim
+        np.subtract(actions, 1, out=self._inputs, casting="unsafe")
+        rewards = self.rewards
+        rewards[:] = 0
+        ended = self._ended
+        ended[:] = False
+        final = self._final_observations
+
+        for _ in range(self.frame_skip):
+            player2_score = sim.player2_score.copy()
+            rallies = sim.rallies.copy()
+            hits = sim.paddle_hits.copy()
+            was_done = sim.done.copy()
+            sim.step(self._inputs)
+
+            live = ~ended
+            # A hit that sends the ball right is the agent's return
+            returned = (sim.paddle_hits > hits) & (sim.speed_x > 0) & live
+            lost = ((sim.player2_score > player2_score) | (sim.done & ~was_done & (sim.winner == 2))) & live
+            won = (sim.rallies > rallies) & ~lost & live
+            rewards += returned * np.float32(self.rally_reward)
+            rewards += won
+            rewards -= lost
+            self.episode_ticks += live
+
+            if self.episode == "point":
+                ending = (sim.rallies > rallies) & live
+            else:
+                ending = sim.done & live
+            if ending.any():
+                # Keep how each episode ended, then hold its paddle for the remaining ticks
+                final[ending] = self._observe(np.empty_like(final))[ending]
+                self._inputs[ending] = 0
+                ended |= ending
+
+        terminated = self.terminated
+        np.copyto(terminated, ended)
+        truncated = np.greater_equal(self.episode_ticks, self.max_episode_ticks, out=self.truncated)
+        truncated &= ~terminated
+
+        info = {}
+        finished = terminated | truncated
+        if finished.any():
+            final_observation = self._observe(np.empty_like(self.observations))
+            final_observation[terminated] = final[terminated]
+            info["final_observation"] = final_observation
+            self.episode_ticks[finished] = 0
+            # A point episode carries on in the same match; a finished or truncated match restarts
+            restart = sim.done | truncated
+            if restart.any():
+                sim.reset(restart)
+        return self._observe(self.observations), rewards, terminated, truncated, info
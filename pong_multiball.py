@@ -0,0 +1,401 @@
+# PyPong - Multi-Ball Rules
+# A timed round with a court full of balls. Every ball that gets past a
+# paddle scores a point for the other player and is served again from the
+# center a moment later; whoever leads when the clock runs out wins, and
+# level scores play on until the next point. Paddles, AI profiles, serve
+# angles and speed-ups are pong_sim's.
+#
+# The balls live in a BallSet, one flat list per attribute, and each tick
+# moves and collides all of them in a couple of tight loops:
+#   - walls and paddle faces are swept along each ball's move, so no speed
+#     tunnels through a paddle; only a ball crossing a face line this tick
+#     is tested against that paddle at all
+#   - ball-ball contacts go through a uniform grid broad phase with cells
+#     one ball wide, so each ball is only tested against the balls in its
+#     3x3 neighbourhood and a tick stays linear in the number of balls
+#   - touching balls bounce off each other elastically (equal masses)
+#
+# Like pong_sim this has no pygame dependency, and a match is fully
+# determined by its seed and inputs, so multi-ball matches replay too.
+
+import math
+import random
+import time
+
+import pong_sim
+from pong_sim import (SCREEN_WIDTH, SCREEN_HEIGHT, PADDLE_HEIGHT, BALL_SIZE, BALL_INITIAL_SPEED,
+                      BALL_SPEED_INCREMENT, BALL_MAX_AXIS_SPEED, PADDLE_SPEED, PADDLE1_CONTACT_X,
+                      PADDLE2_CONTACT_X, BALL_MAX_Y, TICK_RATE, SERVE_DELAY_TICKS,
+                      EVENT_PADDLE_HIT, EVENT_SCORE, EVENT_SERVE, EVENT_GAME_OVER)
+
+MULTI_BALL_MODE = "multi_ball"
+
+MULTI_BALL_COUNT = 100          # Balls in play
+MULTI_BALL_ROUND_SECONDS = 60   # Length of the round before the clock decides it
+MULTI_BALL_SERVE_GAP_TICKS = 3  # Ticks between the opening serves, so the balls stream out
+MULTI_BALL_RESERVE_TICKS = 30   # A ball that scored waits this long before it is served again
+
+# Slowest a ball may cross the court; stops a collision from leaving one
+# bouncing between the walls forever
+MULTI_BALL_MIN_SPEED_X = 2
+
+# Broad phase grid: one ball wide, so touching balls are always in neighbouring cells
+GRID_CELL = BALL_SIZE
+_GRID_STRIDE = SCREEN_WIDTH // GRID_CELL + 3 # Cells per row, with room for balls just off the court
+_NEIGHBOUR_CELLS = tuple(row * _GRID_STRIDE + column for row in (-1, 0, 1) for column in (-1, 0, 1))
+
+
+class Rules:
+    """The new_game(), step() and run_match() that play a family of modes."""
+    __slots__ = ("name", "new_game", "step", "run_match")
+
+    def __init__(self, name, new_game, step, run_match):
+        self.name = name
+        self.new_game = new_game
+        self.step = step
+        self.run_match = run_match
+
+    def __repr__(self):
+        return f"Rules({self.name!r})"
+
+
+SIM_RULES = Rules("pong_sim", pong_sim.new_game, pong_sim.step, pong_sim.run_match)
+
+
+def rules_for(mode):
+    """The Rules that play `mode`: MULTI_BALL_RULES for multi-ball, SIM_RULES otherwise."""
+    return MULTI_BALL_RULES if mode == MULTI_BALL_MODE else SIM_RULES
+
+
+class BallSet:
+    """Every ball's top-left position, velocity and serve status, one list per attribute.
+
+    Velocities are in pixels per TICK_RATE tick, as in pong_sim's BallState.
+    """
+    __slots__ = ("x", "y", "speed_x", "speed_y", "active", "serve_timer", "served_at")
+
+    def __init__(self, count):
+        self.x = [float(SCREEN_WIDTH // 2 - BALL_SIZE // 2)] * count
+        self.y = [float(SCREEN_HEIGHT // 2 - BALL_SIZE // 2)] * count
+        self.speed_x = [0.0] * count
+        self.speed_y = [0.0] * count
+        self.active = [False] * count
+        self.serve_timer = [0] * count
+        self.served_at = [0] * count # Tick each ball last went into play
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def active_count(self):
+        return sum(self.active)
+
+    def reset(self, i, rng, serve_delay):
+        """Puts ball `i` back in the center with a new serve angle, waiting `serve_delay` ticks."""
+        self.x[i] = float(SCREEN_WIDTH // 2 - BALL_SIZE // 2)
+        self.y[i] = float(SCREEN_HEIGHT // 2 - BALL_SIZE // 2)
+        angle = rng.uniform(math.pi/6, math.pi/3)
+        direction_x = rng.choice((-1, 1))
+        direction_y = rng.choice((-1, 1))
+        self.speed_x[i] = direction_x * math.cos(angle) * BALL_INITIAL_SPEED
+        self.speed_y[i] = direction_y * math.sin(angle) * BALL_INITIAL_SPEED
+        self.active[i] = False
+        self.serve_timer[i] = serve_delay
+
+
+class MultiBallAI(pong_sim.PaddleAI):
+    """PaddleAI that re-reads the court every reaction_ticks and goes for the ball due first.
+
+    The aim error is rolled once per ball it picks, not per look, so the
+    paddle doesn't jitter while it follows the same ball.
+    """
+    __slots__ = ("ball_index", "aim_error")
+
+    def __init__(self, player, speed, reaction_ticks, error):
+        super().__init__(player, speed, reaction_ticks, error)
+        self.ball_index = None
+        self.aim_error = 0
+
+    def plan(self, state):
+        """Picks the ball that will reach this paddle's face soonest and schedules a move to meet it."""
+        balls = state.balls
+        contact_x = PADDLE2_CONTACT_X if self.player == 2 else PADDLE1_CONTACT_X
+        direction = 1 if self.player == 2 else -1
+        best = None
+        best_time = math.inf
+        for i, (x, speed_x, active) in enumerate(zip(balls.x, balls.speed_x, balls.active)):
+            if active and speed_x * direction > 0:
+                ticks_away = (contact_x - x) / speed_x
+                if 0 <= ticks_away < best_time:
+                    best = i
+                    best_time = ticks_away
+        if best is None:
+            self.ball_index = None
+            self.plan_center(state)
+            return
+
+        x, y = balls.x[best], balls.y[best]
+        speed_x, speed_y = balls.speed_x[best], balls.speed_y[best]
+        if best != self.ball_index:
+            self.ball_index = best
+            self.aim_error = 0
+            if self.error:
+                # Faster balls are harder to read, as in PaddleAI
+                spread = math.floor(self.error * math.hypot(speed_x, speed_y) / BALL_INITIAL_SPEED + 0.5)
+                self.aim_error = state.rng.randint(-spread, spread)
+        arrival = pong_sim.predict_arrival_y(x, y, speed_x, speed_y, self.player)
+        self._schedule(math.floor(arrival + 0.5) + self.aim_error, state.ticks)
+
+
+class MultiBallState(pong_sim.GameState):
+    """A multi-ball match: GameState with a BallSet in place of the single ball."""
+    modes = (MULTI_BALL_MODE,)
+    __slots__ = ("balls", "round_ticks", "reserve_delay", "contacts")
+
+    def __init__(self, mode=MULTI_BALL_MODE, difficulty=None, player1_difficulty=None, rng=None,
+                 tick_rate=TICK_RATE, ball_count=MULTI_BALL_COUNT):
+        super().__init__(mode, difficulty, player1_difficulty, rng, tick_rate)
+        if ball_count < 1:
+            raise ValueError(f"A multi-ball match needs at least one ball, got {ball_count!r}")
+        self.ball = None
+        self.balls = BallSet(ball_count)
+        self.round_ticks = self.scale_ticks(MULTI_BALL_ROUND_SECONDS * TICK_RATE)
+        self.reserve_delay = self.scale_ticks(MULTI_BALL_RESERVE_TICKS)
+        self.contacts = 0 # Ball-ball contacts resolved in the last tick
+
+    def _new_ai(self, player, speed, reaction_ticks, error):
+        return MultiBallAI(player, speed * self.tick_scale, self.scale_ticks(reaction_ticks), error)
+
+    def set_ai(self, player, speed, reaction_ticks, error):
+        """Hands paddle 1 or 2 to an AI with a custom profile (units as in pong_sim.ai_profile)."""
+        ai = self._new_ai(player, speed, reaction_ticks, error)
+        if player == 1:
+            self.player1_ai = ai
+        else:
+            self.player2_ai = ai
+
+    @property
+    def time_left(self):
+        """Seconds left on the round clock (0 while a tie plays on)."""
+        return max(self.round_ticks - self.ticks, 0) / self.tick_rate
+
+
+def new_game(mode=MULTI_BALL_MODE, difficulty="medium", player1_difficulty=None, rng=None,
+             serve_delay=SERVE_DELAY_TICKS, tick_rate=TICK_RATE, ball_count=MULTI_BALL_COUNT):
+    """Creates a multi-ball match, with the balls served one after another from the center.
+
+    Takes pong_sim.new_game's arguments; the first ball is served after
+    `serve_delay` TICK_RATE ticks and each of the others
+    MULTI_BALL_SERVE_GAP_TICKS after the one before.
+    """
+    state = MultiBallState(mode, difficulty, player1_difficulty, rng, tick_rate, ball_count)
+    delay = state.scale_ticks(serve_delay)
+    gap = state.scale_ticks(MULTI_BALL_SERVE_GAP_TICKS)
+    balls = state.balls
+    for i in range(ball_count):
+        balls.reset(i, state.rng, delay + i * gap)
+        if balls.serve_timer[i] <= 0:
+            balls.active[i] = True
+    return state
+
+
+def _bounce_speeds(speed_x, speed_y):
+    """A ball's velocity after a paddle face: x reversed, sped up, each axis capped (as in pong_sim)."""
+    length = math.hypot(speed_x, speed_y)
+    scale = (length + BALL_SPEED_INCREMENT) / length
+    speed_x = max(-BALL_MAX_AXIS_SPEED, min(BALL_MAX_AXIS_SPEED, -speed_x * scale))
+    speed_y = max(-BALL_MAX_AXIS_SPEED, min(BALL_MAX_AXIS_SPEED, speed_y * scale))
+    return speed_x, speed_y
+
+
+def _limit_speeds(balls, i):
+    """Caps each axis of ball `i`'s velocity and keeps it crossing the court."""
+    speed_x = max(-BALL_MAX_AXIS_SPEED, min(BALL_MAX_AXIS_SPEED, balls.speed_x[i]))
+    if -MULTI_BALL_MIN_SPEED_X < speed_x < MULTI_BALL_MIN_SPEED_X:
+        speed_x = math.copysign(MULTI_BALL_MIN_SPEED_X, speed_x)
+    balls.speed_x[i] = speed_x
+    balls.speed_y[i] = max(-BALL_MAX_AXIS_SPEED, min(BALL_MAX_AXIS_SPEED, balls.speed_y[i]))
+
+
+def _move_balls(state):
+    """Serves waiting balls and moves the rest one tick off the walls and paddle faces, scoring goals."""
+    balls = state.balls
+    xs, ys = balls.x, balls.y
+    speeds_x, speeds_y = balls.speed_x, balls.speed_y
+    active, serve_timer = balls.active, balls.serve_timer
+    events = state.events
+    scale = state.tick_scale
+    ticks = state.ticks
+
+    # Ball top y must be strictly between these to meet the paddle's face
+    paddle1_top, paddle1_bottom = state.paddle1.y - BALL_SIZE, state.paddle1.y + PADDLE_HEIGHT
+    paddle2_top, paddle2_bottom = state.paddle2.y - BALL_SIZE, state.paddle2.y + PADDLE_HEIGHT
+
+    for i in range(len(xs)):
+        if not active[i]:
+            serve_timer[i] -= 1
+            if serve_timer[i] <= 0:
+                active[i] = True
+                balls.served_at[i] = ticks
+                events.append((EVENT_SERVE,))
+            continue
+
+        x, y = xs[i], ys[i]
+        speed_x, speed_y = speeds_x[i], speeds_y[i]
+        move_x, move_y = speed_x * scale, speed_y * scale
+        new_x, new_y = x + move_x, y + move_y
+
+        # Walls: mirror the overshoot back into the court
+        if new_y < 0:
+            new_y = -new_y
+            speed_y = -speed_y
+        elif new_y > BALL_MAX_Y:
+            new_y = 2 * BALL_MAX_Y - new_y
+            speed_y = -speed_y
+
+        # Paddle faces: only a ball crossing a face line this tick can hit that paddle
+        if move_x < 0 and new_x < PADDLE1_CONTACT_X <= x:
+            hit_y = pong_sim.fold_ball_y(y + move_y * (x - PADDLE1_CONTACT_X) / -move_x)
+            if paddle1_top < hit_y < paddle1_bottom:
+                new_x = 2 * PADDLE1_CONTACT_X - new_x
+                speed_x, speed_y = _bounce_speeds(speed_x, speed_y)
+                events.append((EVENT_PADDLE_HIT, PADDLE1_CONTACT_X + BALL_SIZE / 2, hit_y + BALL_SIZE / 2))
+        elif move_x > 0 and x <= PADDLE2_CONTACT_X < new_x:
+            hit_y = pong_sim.fold_ball_y(y + move_y * (PADDLE2_CONTACT_X - x) / move_x)
+            if paddle2_top < hit_y < paddle2_bottom:
+                new_x = 2 * PADDLE2_CONTACT_X - new_x
+                speed_x, speed_y = _bounce_speeds(speed_x, speed_y)
+                events.append((EVENT_PADDLE_HIT, PADDLE2_CONTACT_X + BALL_SIZE / 2, hit_y + BALL_SIZE / 2))
+
+        xs[i], ys[i] = new_x, new_y
+        speeds_x[i], speeds_y[i] = speed_x, speed_y
+
+        # Scoring: every ball counts on its own
+        if new_x <= 0:
+            _ball_scored(state, i, 2)
+        elif new_x + BALL_SIZE >= SCREEN_WIDTH:
+            _ball_scored(state, i, 1)
+
+
+def _ball_scored(state, i, scoring_player):
+    """Awards a point for ball `i` and sends it back to the center to be served again."""
+    state.events.append((EVENT_SCORE, scoring_player))
+    if scoring_player == 1:
+        state.player1_score += 1
+    else:
+        state.player2_score += 1
+    state.balls.reset(i, state.rng, state.reserve_delay)
+
+
+def _collide_balls(balls):
+    """Bounces touching balls off each other; returns the number of contacts.
+
+    Broad phase: balls are dropped into a dict of grid cells one at a time,
+    each first tested against the balls already in its own and the eight
+    neighbouring cells, so every close pair is tested exactly once and
+    distant pairs never. Balls are circles of diameter BALL_SIZE here.
+    """
+    xs, ys = balls.x, balls.y
+    speeds_x, speeds_y = balls.speed_x, balls.speed_y
+    touching = BALL_SIZE * BALL_SIZE
+    grid = {}
+    contacts = 0
+    for i, (x, y, active) in enumerate(zip(xs, ys, balls.active)):
+        if not active:
+            continue
+        cell = int(x // GRID_CELL) + int(y // GRID_CELL) * _GRID_STRIDE
+        for neighbour in _NEIGHBOUR_CELLS:
+            others = grid.get(cell + neighbour)
+            if others is None:
+                continue
+            for j in others:
+                dx = xs[j] - x
+                dy = ys[j] - y
+                distance_sq = dx * dx + dy * dy
+                if distance_sq >= touching or distance_sq == 0:
+                    continue
+                # Exchange the velocity components along the line between the centers
+                impulse = ((speeds_x[j] - speeds_x[i]) * dx + (speeds_y[j] - speeds_y[i]) * dy) / distance_sq
+                if impulse >= 0:
+                    continue # Already moving apart
+                speeds_x[i] += impulse * dx
+                speeds_y[i] += impulse * dy
+                speeds_x[j] -= impulse * dx
+                speeds_y[j] -= impulse * dy
+                _limit_speeds(balls, i)
+                _limit_speeds(balls, j)
+                contacts += 1
+        bucket = grid.get(cell)
+        if bucket is None:
+            grid[cell] = [i]
+        else:
+            bucket.append(i)
+    return contacts
+
+
+def step(state, inputs=(0, 0)):
+    """Advances a multi-ball match by one tick and returns the events it produced (see pong_sim.step)."""
+    events = state.events
+    events.clear()
+    if state.game_over:
+        return events
+
+    ticks = state.ticks
+    paddle1 = state.paddle1
+    paddle2 = state.paddle2
+    if state.player1_ai is None:
+        paddle1.speed = inputs[0] * PADDLE_SPEED * state.tick_scale
+    else:
+        paddle1.speed = state.player1_ai.paddle_speed(paddle1, ticks)
+    paddle1.move()
+
+    if state.player2_ai is None:
+        paddle2.speed = inputs[1] * PADDLE_SPEED * state.tick_scale
+    else:
+        paddle2.speed = state.player2_ai.paddle_speed(paddle2, ticks)
+    paddle2.move()
+
+    _move_balls(state)
+    state.contacts = _collide_balls(state.balls)
+
+    # Each AI takes a fresh look once it has acted on its last one
+    for ai in (state.player1_ai, state.player2_ai):
+        if ai is not None and ticks >= ai.react_at:
+            ai.plan(state)
+
+    # Round clock: the leader wins when it runs out, a tie plays on to the next point
+    if ticks + 1 >= state.round_ticks and state.player1_score != state.player2_score:
+        state.winning_player = "Player 1" if state.player1_score > state.player2_score else "Player 2"
+        state.game_over = True
+        events.append((EVENT_GAME_OVER, state.winning_player))
+
+    state.ticks += 1
+    return events
+
+
+def run_match(state, max_ticks=None, inputs=(0, 0)):
+    """Steps a match until it ends (or max_ticks pass) with fixed inputs; returns the state."""
+    while not state.game_over and (max_ticks is None or state.ticks < max_ticks):
+        step(state, inputs)
+    return state
+
+
+MULTI_BALL_RULES = Rules(MULTI_BALL_MODE, new_game, step, run_match)
+
+
+def main(ball_counts=(50, 100, 200, 400)):
+    """Times AI-vs-AI multi-ball ticks for a few ball counts."""
+    for count in ball_counts:
+        state = new_game(difficulty="hard", player1_difficulty="hard", rng=random.Random(count),
+                         serve_delay=0, ball_count=count)
+        run_match(state, max_ticks=count * MULTI_BALL_SERVE_GAP_TICKS) # Until every ball is in play
+        ticks = 600
+        start = time.perf_counter()
+        run_match(state, max_ticks=state.ticks + ticks)
+        elapsed = time.perf_counter() - start
+        print(f"{count:4d} balls: {elapsed / ticks * 1000:.3f} ms per tick, "
+              f"score {state.player1_score}-{state.player2_score}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+# PyPong - LAN Netplay
+# Two cabinets play a two-player match over UDP. Only inputs cross the
+# network: both sides run the same deterministic pong_sim match from a
+# shared seed and exchange each tick's held direction.
+#
+# Local input is applied the tick it is pressed. The remote paddle is
+# predicted by repeating its last known input. When the real input turns
+# up and differs from the prediction, the match is rolled back to the
+# snapshot taken before that tick and re-simulated to the present with
+# the corrected inputs (GGPO-style rollback). Each side only runs
+# MAX_ROLLBACK_TICKS ahead of the inputs it has confirmed and stalls
+# beyond that. The two sides also compare how far each runs ahead of the
+# other's inputs, and the one further ahead now and then sits out a tick,
+# so the rollbacks (and their cost) are shared instead of one side,
+# usually the host that started first, taking them all.
+#
+# Every packet resends all inputs the peer hasn't acknowledged, so a lost
+# packet costs nothing once the next one arrives. Both sides checksum the
+# confirmed state every DIGEST_INTERVAL ticks and compare, so a desync is
+# noticed instead of silently playing on.
+#
+# Usage: python pong_net.py --loopback [--rtt 80] [--jitter 20] [--loss 0.05]
+# plays a scripted match between two peers over real UDP sockets on
+# localhost with simulated latency, jitter and packet loss, and checks
+# that both ended in exactly the same state as an offline re-run.
+
+import argparse
+import heapq
+import random
+import socket
+import struct
+import sys
+import time
+
+import pong_sim
+import pong_replay
+
+PROTOCOL_VERSION = 1
+NETPLAY_PORT = 50600
+
+MAX_ROLLBACK_TICKS = 12     # Furthest a late input can rewrite (200 ms at 60 ticks/s)
+MAX_INPUTS_PER_PACKET = 64  # Unacknowledged inputs resent with every packet
+DIGEST_INTERVAL = 60        # Ticks between state checksums compared with the peer
+SYNC_MARGIN_TICKS = 2       # Lead over the peer's lead that makes this side sit out a tick...
+SYNC_SKIP_INTERVAL = 8      # ...at most once per this many ticks, so the correction stays smooth
+RESEND_SECONDS = 0.1        # Handshake retries, and keep-alives while no ticks are sent
+TIMEOUT_SECONDS = 5.0       # Silence from the peer before the connection counts as lost
+CONNECT_TIMEOUT_SECONDS = 10.0 # Silence from the host before a join attempt gives up
+
+# Packets: magic and type, then per type. A host answers a HELLO of another
+# protocol version with a START carrying its own, which the joining side rejects
+_MAGIC = b"PPNP"
+_HELLO, _START, _INPUTS, _BYE = 1, 2, 3, 4
+_HEADER = struct.Struct("<4sB")
+_HELLO_BODY = struct.Struct("<H")       # Protocol version
+_START_BODY = struct.Struct("<HQH")     # Protocol version, match seed, tick rate
+_INPUTS_BODY = struct.Struct("<IIIIB")  # First tick sent, ticks of peer input received, digest tick and CRC, count
+
+
+class UdpTransport:
+    """A non-blocking UDP socket talking to one peer.
+
+    A host doesn't know its peer's address until a player joins: until
+    `peer` is set, datagrams from anyone are received; after, only the peer's.
+    """
+
+    def __init__(self, port=0, peer=None, bind_address=""):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((bind_address, port))
+        self.sock.setblocking(False)
+        self.peer = peer
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def send(self, data, address=None):
+        """Sends to the peer, or to `address` when given."""
+        address = address or self.peer
+        if address is not None:
+            try:
+                self.sock.sendto(data, address)
+            except OSError:
+                pass # Unreachable for now; UDP carries on and the next packet resends everything
+
+    def receive(self):
+        """Returns (datagram, sender address) for everything waiting from the peer."""
+        datagrams = []
+        while True:
+            try:
+                data, sender = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return datagrams
+            if self.peer is None or sender == self.peer:
+                datagrams.append((data, sender))
+
+    def close(self):
+        self.sock.close()
+
+
+class NetplaySession:
+    """One side of a netplay match: handshake, then rollback play.
+
+    The host (player 1) picks the seed; the joining side (player 2) learns it
+    from the handshake. Once `connected`, the caller creates the match from
+    `seed` exactly as the other side does and hands it to begin(); from then
+    on advance() is called once per tick with the local held direction, and
+    poll() once per frame at least, so packets are answered while not ticking.
+    """
+
+    def __init__(self, transport, local_player, seed=None, tick_rate=pong_sim.TICK_RATE, clock=time.monotonic):
+        if local_player not in (1, 2):
+            raise ValueError(f"local_player must be 1 (host) or 2 (joining), got {local_player!r}")
+        if seed is None and local_player == 1:
+            seed = pong_replay.new_seed()
+        self.transport = transport
+        self.local_player = local_player
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.clock = clock
+        self.connected = False
+        self.closed = False
+        self.error = None        # Why the session closed, if it wasn't a normal goodbye
+        self.state = None
+        self.tick = 0            # Ticks simulated so far (state.ticks stops counting at game over)
+
+        self.local_inputs = []   # Our input for every tick
+        self.remote_inputs = []  # The peer's confirmed input for every tick it has sent so far
+        self.used_remote = []    # The peer input each tick was simulated with (predicted or confirmed)
+        self.snapshots = {}      # Tick -> state snapshot taken before simulating it
+        self.peer_acked = 0      # Ticks of our input the peer has confirmed
+        self.peer_lead = 0       # How far the peer runs ahead of our inputs, as of its last packet
+        self.last_sync_skip = 0
+
+        self.digests = {}        # Tick -> CRC of our confirmed state after that many ticks, until compared
+        self.peer_digests = {}
+        self.latest_digest = (0, 0) # Most recent (tick, CRC) of ours, sent with every packet
+        self.next_digest = DIGEST_INTERVAL
+        self.desynced = False
+
+        # Counters for tests and the profiler overlay
+        self.rollbacks = 0
+        self.rolled_back_ticks = 0
+        self.max_rollback = 0
+        self.stalls = 0
+        self.sync_skips = 0
+
+        now = clock()
+        self.last_received = now
+        self.last_sent = None
+
+    # --- Connection ---
+
+    @classmethod
+    def host(cls, port=NETPLAY_PORT, **kwargs):
+        """Waits for a player to join on `port`; this side plays the left paddle."""
+        return cls(UdpTransport(port), 1, **kwargs)
+
+    @classmethod
+    def join(cls, host_address, port=NETPLAY_PORT, **kwargs):
+        """Joins the match hosted at `host_address`; this side plays the right paddle."""
+        return cls(UdpTransport(0, (host_address, port)), 2, **kwargs)
+
+    def _send(self, kind, body=b"", address=None):
+        self.transport.send(_HEADER.pack(_MAGIC, kind) + body, address)
+        self.last_sent = self.clock()
+
+    def _fail(self, reason):
+        self.error = reason
+        self.closed = True
+
+    def close(self):
+        """Says goodbye to the peer and releases the socket."""
+        if not self.closed:
+            self._send(_BYE)
+            self.closed = True
+        self.transport.close()
+
+    def poll(self):
+        """Handles every packet that has arrived and resends whatever is due."""
+        if self.closed:
+            return
+        for data, sender in self.transport.receive():
+            if len(data) < _HEADER.size:
+                continue
+            magic, kind = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                continue
+            self.last_received = self.clock()
+            body = data[_HEADER.size:]
+            if kind == _HELLO:
+                self._on_hello(body, sender)
+            elif kind == _START:
+                self._on_start(body)
+            elif kind == _INPUTS and self.state is not None:
+                self._on_inputs(body)
+            elif kind == _BYE:
+                self.closed = True
+                self.error = "The other player left"
+                return
+
+        now = self.clock()
+        if self.connected and now - self.last_received > TIMEOUT_SECONDS:
+            self._fail("Connection lost")
+        elif not self.connected and self.local_player == 2 and now - self.last_received > CONNECT_TIMEOUT_SECONDS:
+            self._fail("No answer from the host")
+        elif self.last_sent is None or now - self.last_sent >= RESEND_SECONDS:
+            if not self.connected and self.local_player == 2:
+                self._send(_HELLO, _HELLO_BODY.pack(PROTOCOL_VERSION))
+            elif self.state is not None:
+                self._send_inputs()
+
+    def _on_hello(self, body, sender):
+        if self.local_player != 1 or len(body) < _HELLO_BODY.size:
+            return
+        (version,) = _HELLO_BODY.unpack_from(body)
+        if version != PROTOCOL_VERSION:
+            # Not our opponent: tell it which version we run, so it gives up
+            # with an error instead of waiting, and keep waiting for a match
+            self._send(_START, _START_BODY.pack(PROTOCOL_VERSION, 0, self.tick_rate), sender)
+            return
+        # The first player to say hello is the opponent; stray packets from
+        # anyone else (an earlier match, say) are ignored from now on
+        self.transport.peer = sender
+        # Answered every time, in case the first START was lost
+        self._send(_START, _START_BODY.pack(PROTOCOL_VERSION, self.seed, self.tick_rate))
+        self.connected = True
+
+    def _on_start(self, body):
+        if self.local_player != 2 or self.connected or len(body) < _START_BODY.size:
+            return
+        version, seed, tick_rate = _START_BODY.unpack_from(body)
+        if version != PROTOCOL_VERSION or tick_rate != self.tick_rate:
+            self._fail("The host runs a different version of the game")
+            return
+        self.seed = seed
+        self.connected = True
+
+    # --- Rollback ---
+
+    def begin(self, state):
+        """Starts playing `state`, a match both sides created from `seed` with the same settings."""
+        self.state = state
+
+    def _inputs(self, local, remote):
+        return (local, remote) if self.local_player == 1 else (remote, local)
+
+    def _predict(self, tick):
+        """The peer's input for `tick`: confirmed if known, otherwise its last known one held."""
+        if tick < len(self.remote_inputs):
+            return self.remote_inputs[tick]
+        return self.remote_inputs[-1] if self.remote_inputs else 0
+
+    def _on_inputs(self, body):
+        if len(body) < _INPUTS_BODY.size:
+            return
+        first, acked, digest_tick, digest, count = _INPUTS_BODY.unpack_from(body)
+        count = min(count, len(body) - _INPUTS_BODY.size) # Only the inputs that actually arrived
+        self.peer_acked = max(self.peer_acked, acked)
+        self.peer_lead = first + count - acked
+        if digest_tick:
+            self.peer_digests[digest_tick] = digest
+            self._check_digest(digest_tick)
+
+        # Inputs arrive in order from the peer's last acknowledgement, so
+        # anything new continues the confirmed list without a gap
+        known = len(self.remote_inputs)
+        if first > known:
+            return
+        start = _INPUTS_BODY.size + known - first
+        new_inputs = [byte - 1 for byte in body[start:_INPUTS_BODY.size + count]]
+        if not new_inputs:
+            return
+        self.remote_inputs.extend(new_inputs)
+
+        # Roll back to the first simulated tick that was predicted wrong
+        for tick in range(known, min(len(self.remote_inputs), self.tick)):
+            if self.used_remote[tick] != self.remote_inputs[tick]:
+                self._rollback(tick)
+                break
+        self._confirm()
+
+    def _rollback(self, tick):
+        """Re-simulates from `tick` to the present with the inputs known now."""
+        state = self.state
+        state.restore(self.snapshots[tick])
+        for replayed in range(tick, self.tick):
+            if replayed > tick:
+                self.snapshots[replayed] = state.snapshot()
+            remote = self._predict(replayed)
+            self.used_remote[replayed] = remote
+            pong_sim.step(state, self._inputs(self.local_inputs[replayed], remote))
+        depth = self.tick - tick
+        self.rollbacks += 1
+        self.rolled_back_ticks += depth
+        self.max_rollback = max(self.max_rollback, depth)
+
+    def _confirm(self):
+        """Checksums newly confirmed states and drops snapshots no rollback can reach."""
+        confirmed = min(len(self.remote_inputs), self.tick)
+        while self.next_digest <= confirmed:
+            tick = self.next_digest
+            if tick == self.tick:
+                digest = pong_replay.state_digest(self.state)
+            else:
+                saved = self.state.snapshot()
+                self.state.restore(self.snapshots[tick])
+                digest = pong_replay.state_digest(self.state)
+                self.state.restore(saved)
+            self.digests[tick] = digest
+            self.latest_digest = (tick, digest)
+            self._check_digest(tick)
+            self.next_digest += DIGEST_INTERVAL
+        for tick in [tick for tick in self.snapshots if tick < confirmed]:
+            del self.snapshots[tick]
+
+    def _check_digest(self, tick):
+        mine, theirs = self.digests.get(tick), self.peer_digests.get(tick)
+        if mine is not None and theirs is not None:
+            if mine != theirs:
+                self.desynced = True
+            self.digests.pop(tick)
+            self.peer_digests.pop(tick)
+
+    def _send_inputs(self):
+        first = self.peer_acked
+        count = min(self.tick - first, MAX_INPUTS_PER_PACKET)
+        body = _INPUTS_BODY.pack(first, len(self.remote_inputs), *self.latest_digest, count)
+        self._send(_INPUTS, body + bytes(direction + 1 for direction in self.local_inputs[first:first + count]))
+
+    def advance(self, local_input):
+        """Simulates the next tick with `local_input` and returns its events.
+
+        Returns None, without simulating, while this side is
+        MAX_ROLLBACK_TICKS ahead of the peer's confirmed inputs, or is
+        sitting out a tick to let the peer catch up. The caller should let
+        that tick's time pass rather than make it up later.
+        """
+        self.poll()
+        if self.closed or self.state is None:
+            return None
+        lead = self.tick - len(self.remote_inputs)
+        if lead >= MAX_ROLLBACK_TICKS:
+            self.stalls += 1
+            self._send_inputs()
+            return None
+        if lead - self.peer_lead > SYNC_MARGIN_TICKS and self.tick - self.last_sync_skip >= SYNC_SKIP_INTERVAL:
+            self.sync_skips += 1
+            self.last_sync_skip = self.tick
+            self._send_inputs()
+            return None
+
+        tick = self.tick
+        self.snapshots[tick] = self.state.snapshot()
+        remote = self._predict(tick)
+        self.local_inputs.append(local_input)
+        self.used_remote.append(remote)
+        events = pong_sim.step(self.state, self._inputs(local_input, remote))
+        self.tick += 1
+        self._confirm()
+        self._send_inputs()
+        return events
+
+    @property
+    def confirmed_ticks(self):
+        """Ticks whose inputs both sides have; the state up to there is final."""
+        return min(len(self.remote_inputs), self.tick)
+
+    @property
+    def finished(self):
+        """True once the match is over with every input that led there confirmed."""
+        state = self.state
+        return state is not None and state.game_over and len(self.remote_inputs) >= state.ticks
+
+    def replay(self, serve_delay=0, arena=None):
+        """The match as a pong_replay.Replay, from the confirmed inputs only.
+
+        `serve_delay` is the one the match was created with. The replay is
+        stamped with the final result once the match has finished.
+        """
+        state = self.state
+        recorder = pong_replay.ReplayRecorder.for_game(state, self.seed, serve_delay, arena)
+        for tick in range(min(self.confirmed_ticks, state.ticks)):
+            recorder.record(tick, self._inputs(self.local_inputs[tick], self.remote_inputs[tick]))
+        if self.finished:
+            recorder.finish(state)
+        return recorder.replay
+
+
+# --- Loopback Test Harness ---
+
+class ConditionedTransport:
+    """Wraps a transport with simulated one-way latency, jitter and packet loss.
+
+    Sends are queued and released by flush() once their delivery time on
+    `clock` has come, so jitter can reorder them like a real network.
+    """
+
+    def __init__(self, transport, clock, latency, jitter, loss, rng):
+        self.transport = transport
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = rng
+        self.queue = [] # (delivery time, sequence, datagram, address or None for the peer)
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def peer(self):
+        return self.transport.peer
+
+    @peer.setter
+    def peer(self, address):
+        self.transport.peer = address
+
+    def send(self, data, address=None):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        heapq.heappush(self.queue, (self.clock() + delay, self.sent, data, address))
+
+    def flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.queue)
+            self.transport.send(data, address)
+
+    def receive(self):
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+
+def _scripted_input(rng, held):
+    """A player who changes direction now and then, like someone rallying."""
+    return rng.choice((-1, 0, 1)) if rng.random() < 0.08 else held
+
+
+def run_loopback(rtt=0.08, jitter=0.02, loss=0.05, ticks=3600, seed=1, max_seconds=60.0):
+    """Plays a scripted match between two sessions over localhost UDP under the given conditions.
+
+    Time is simulated (one tick per loop), so a minute-long match takes a
+    few seconds. Returns a result dict; result["converged"] is True when
+    both sides confirmed the same inputs and ended in the same state as an
+    offline run of those inputs.
+    """
+    now = [0.0]
+    clock = lambda: now[0]
+    rng = random.Random(seed)
+    host_socket = UdpTransport(0, bind_address="127.0.0.1")
+    join_socket = UdpTransport(0, peer=("127.0.0.1", host_socket.address[1]), bind_address="127.0.0.1")
+    links = [ConditionedTransport(sock, clock, rtt / 2, jitter, loss, random.Random(rng.getrandbits(64)))
+             for sock in (host_socket, join_socket)]
+    sessions = [NetplaySession(links[0], 1, seed=seed, clock=clock), NetplaySession(links[1], 2, clock=clock)]
+    players = [random.Random(rng.getrandbits(64)) for _ in sessions]
+    held = [0, 0]
+
+    deadline = time.monotonic() + max_seconds
+    while time.monotonic() < deadline:
+        for link in links:
+            link.flush()
+        for i, session in enumerate(sessions):
+            session.poll()
+            if session.connected and session.state is None:
+                session.begin(pong_sim.new_game("two_player", rng=random.Random(session.seed), serve_delay=0))
+            if session.state is not None and session.tick < ticks and not session.state.game_over:
+                held[i] = _scripted_input(players[i], held[i])
+                session.advance(held[i])
+        if all(session.state is not None and session.confirmed_ticks == session.tick
+               and (session.tick >= ticks or session.finished) for session in sessions):
+            break
+        if any(session.closed for session in sessions):
+            break
+        now[0] += 1 / pong_sim.TICK_RATE
+        time.sleep(0) # Let the OS deliver the datagrams sent this round
+
+    # Both sides should agree on every confirmed input, and re-running those
+    # offline must land exactly where each side's rolled-back match did
+    host, joiner = sessions
+    confirmed = min(host.confirmed_ticks, joiner.confirmed_ticks)
+    same_inputs = (host.tick == joiner.tick == confirmed
+                   and host.local_inputs == joiner.remote_inputs[:confirmed]
+                   and joiner.local_inputs == host.remote_inputs[:confirmed])
+    reference = pong_sim.new_game("two_player", rng=random.Random(seed), serve_delay=0)
+    for tick in range(confirmed):
+        pong_sim.step(reference, (host.local_inputs[tick], joiner.local_inputs[tick]))
+    expected = pong_replay.state_digest(reference)
+    digests = [pong_replay.state_digest(session.state) for session in sessions]
+    for session in sessions:
+        session.close()
+
+    return {
+        "ticks": confirmed,
+        "score": (reference.player1_score, reference.player2_score),
+        "converged": same_inputs and digests == [expected, expected] and not any(s.desynced for s in sessions),
+        "desynced": any(s.desynced for s in sessions),
+        "rollbacks": [s.rollbacks for s in sessions],
+        "max_rollback": [s.max_rollback for s in sessions],
+        "stalls": [s.stalls for s in sessions],
+        "sync_skips": [s.sync_skips for s in sessions],
+        "packets_sent": [link.sent for link in links],
+        "packets_dropped": [link.dropped for link in links],
+        "errors": [s.error for s in sessions if s.error],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PyPong netplay loopback test")
+    parser.add_argument("--loopback", action="store_true", help="run the localhost test (the only mode so far)")
+    parser.add_argument("--rtt", type=float, default=80, help="round-trip time in ms (default 80)")
+    parser.add_argument("--jitter", type=float, default=20, help="random +/- ms on each packet (default 20)")
+    parser.add_argument("--loss", type=float, default=0.05, help="fraction of packets dropped (default 0.05)")
+    parser.add_argument("--ticks", type=int, default=3600, help="ticks to play (default 3600, one minute)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    if not args.loopback:
+        parser.error("nothing to do: pass --loopback")
+
+    result = run_loopback(args.rtt / 1000, args.jitter / 1000, args.loss, args.ticks, args.seed)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0 if result["converged"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
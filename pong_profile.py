@@ -0,0 +1,191 @@
+# PyPong - Frame Profiler
+# Scoped timers for the per-frame hot paths, plus a small metrics API the
+# in-game overlay and tools read from. Sections are wrapped in
+# `with profiler.section("name"):`; while the profiler is disabled that
+# returns one shared do-nothing context manager, so instrumented code pays
+# for an attribute lookup and a call, nothing is timed or stored.
+#
+# InputLatency follows input changes from the read that saw them to the
+# frame that shows their first tick, for input-to-display percentiles.
+#
+# Has no pygame dependency; the overlay that draws these numbers lives in
+# the front end.
+
+import time
+from collections import deque
+
+# Frames of history kept for averages and maxima (two seconds at 60 FPS)
+PROFILE_HISTORY = 120
+
+# Input changes kept for the latency percentiles
+LATENCY_HISTORY = 1000
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+class _NullSection:
+    """What section() hands out while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """A reusable timer adding its elapsed time to one named section of the current frame."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        frame = self.profiler._frame
+        frame[self.name] = frame.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def _summary(values):
+    if not values:
+        return {"last": 0.0, "mean": 0.0, "max": 0.0}
+    return {"last": values[-1], "mean": sum(values) / len(values), "max": max(values)}
+
+
+class Profiler:
+    """Collects per-frame section timings and live counters while enabled.
+
+    Call begin_frame() before a frame's work and end_frame() after it is
+    presented; sections timed in between are attributed to that frame.
+    A section may be entered several times a frame and its times add up,
+    but must not be nested inside itself.
+    """
+
+    def __init__(self, enabled=False, history=PROFILE_HISTORY):
+        self.enabled = enabled
+        self.history = history
+        self.frames = 0
+        self.frame_times = deque(maxlen=history) # Milliseconds from begin_frame to end_frame
+        self.sections = {}                       # Name -> deque of milliseconds per frame
+        self.counters = {}                       # Name -> latest value
+        self._timers = {}
+        self._frame = {}
+        self._frame_start = None
+
+    def section(self, name):
+        """Context manager timing the enclosed block under `name` (a no-op while disabled)."""
+        if not self.enabled:
+            return NULL_SECTION
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _Section(self, name)
+        return timer
+
+    def count(self, name, value):
+        """Sets a live counter shown alongside the timings."""
+        if self.enabled:
+            self.counters[name] = value
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Closes the frame, recording every section (0 for ones that didn't run)."""
+        if not self.enabled or self._frame_start is None:
+            return
+        self.frame_times.append((time.perf_counter() - self._frame_start) * 1000)
+        frame = self._frame
+        for name in frame:
+            if name not in self.sections:
+                self.sections[name] = deque(maxlen=self.history)
+        for name, times in self.sections.items():
+            times.append(frame.get(name, 0.0) * 1000)
+        frame.clear()
+        self._frame_start = None
+        self.frames += 1
+
+    def reset(self):
+        """Forgets all collected timings and counters."""
+        self.frames = 0
+        self.frame_times.clear()
+        self.sections.clear()
+        self.counters.clear()
+        self._frame.clear()
+        self._frame_start = None
+
+    def metrics(self):
+        """Last, mean and max milliseconds for the frame and each section, plus the counters."""
+        return {
+            "frames": self.frames,
+            "frame_ms": _summary(self.frame_times),
+            "sections_ms": {name: _summary(times) for name, times in self.sections.items()},
+            "counters": dict(self.counters),
+        }
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[rank - 1]
+
+
+class InputLatency:
+    """Times each input change from when it could have happened to the frame that shows it.
+
+    Call sampled(changed) after every read of the input (event queue or
+    keyboard state), applied() when a tick consumes the current inputs, and
+    presented() once a frame is on screen. A change is seen at the read that
+    found it, but the key may have gone down any time after the read before,
+    so each latency is known within those bounds: `upper` counts from the
+    previous read, `lower` from the one that saw it. Time after the flip
+    returns (compositor, scan-out, the panel) is not included.
+    """
+
+    def __init__(self, enabled=False, history=LATENCY_HISTORY):
+        self.enabled = enabled
+        self.upper = deque(maxlen=history) # Milliseconds
+        self.lower = deque(maxlen=history)
+        self._last_read = None
+        self._seen = None    # (previous read, read that saw it) of the change waiting for a tick
+        self._applied = []   # Changes a tick has consumed, waiting for the frame to be shown
+
+    def sampled(self, changed):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if changed and self._seen is None and self._last_read is not None:
+            self._seen = (self._last_read, now)
+        self._last_read = now
+
+    def applied(self):
+        if self._seen is not None:
+            self._applied.append(self._seen)
+            self._seen = None
+
+    def presented(self):
+        if not self._applied:
+            return
+        now = time.perf_counter()
+        for earliest, seen in self._applied:
+            self.upper.append((now - earliest) * 1000)
+            self.lower.append((now - seen) * 1000)
+        self._applied.clear()
+
+    def percentiles(self):
+        """Sample count and p50/p95/p99 milliseconds of both bounds."""
+        report = {"samples": len(self.upper)}
+        for name, values in (("upper_ms", self.upper), ("lower_ms", self.lower)):
+            ordered = sorted(values)
+            report[name] = {f"p{percent}": round(_percentile(ordered, percent), 2) if ordered else 0.0
+                            for percent in LATENCY_PERCENTILES}
+        return report
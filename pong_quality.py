@@ -0,0 +1,97 @@
+# PyPong - Adaptive Quality Governor
+# Watches how long recent frames took to produce and trades visual effects
+# for frame rate: when frames run close to the budget it sheds one effect
+# tier, and when there is plenty of headroom again it restores one. Gameplay
+# never depends on it; the simulation runs on a fixed timestep either way.
+#
+# Hysteresis keeps it from flapping: shedding and restoring use thresholds
+# far apart, every change restarts the measurement window, and a restore
+# that has to be undone soon after doubles the wait before the next one.
+#
+# Has no pygame dependency; the front end defines what each tier changes.
+
+from collections import deque
+
+QUALITY_WINDOW = 30          # Frames measured before each decision (half a second at 60 FPS)
+QUALITY_PERCENTILE = 90      # Frame time percentile compared against the budget
+QUALITY_SHED_RATIO = 0.9     # Shed a tier when that percentile passes 90% of the budget...
+QUALITY_RESTORE_RATIO = 0.6  # ...and restore one once it is back under 60%
+QUALITY_RESTORE_WAIT = 180   # Frames to hold a tier before trying the next one up
+QUALITY_MAX_RESTORE_WAIT = 1800
+
+
+def shed_levels(full, steps):
+    """Quality levels from `full` settings down, applying one (key, value) step per level."""
+    levels = [dict(full)]
+    for key, value in steps:
+        level = dict(levels[-1])
+        level[key] = value
+        levels.append(level)
+    return levels
+
+
+class QualityGovernor:
+    """Chooses a quality level (0 is best) from observed frame times.
+
+    Call observe() once per frame with the milliseconds the frame's work
+    took (not counting the frame-rate limiter's sleep); it returns True
+    when the level changed and `settings` should be re-applied.
+    """
+
+    def __init__(self, levels, budget_ms, window=QUALITY_WINDOW, percentile=QUALITY_PERCENTILE,
+                 shed_ratio=QUALITY_SHED_RATIO, restore_ratio=QUALITY_RESTORE_RATIO,
+                 restore_wait=QUALITY_RESTORE_WAIT, max_restore_wait=QUALITY_MAX_RESTORE_WAIT):
+        self.levels = levels
+        self.level = 0
+        self.shed_ms = budget_ms * shed_ratio
+        self.restore_ms = budget_ms * restore_ratio
+        self.percentile = percentile
+        self.base_restore_wait = restore_wait
+        self.restore_wait = restore_wait
+        self.max_restore_wait = max_restore_wait
+        self.frames_at_level = 0
+        self.last_change = None # "shed" or "restore"
+        self.changes = 0
+        self._times = deque(maxlen=window)
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def reset(self):
+        """Back to full quality with no history."""
+        self.level = 0
+        self.restore_wait = self.base_restore_wait
+        self.frames_at_level = 0
+        self.last_change = None
+        self._times.clear()
+
+    def _recent_ms(self):
+        times = sorted(self._times)
+        return times[min(len(times) - 1, len(times) * self.percentile // 100)]
+
+    def _change(self, step, direction):
+        self.level += step
+        self.last_change = direction
+        self.frames_at_level = 0
+        self.changes += 1
+        self._times.clear()
+
+    def observe(self, frame_ms):
+        """Records one frame's work time; returns True if the quality level changed."""
+        self.frames_at_level += 1
+        self._times.append(frame_ms)
+        if len(self._times) < self._times.maxlen:
+            return False
+
+        recent = self._recent_ms()
+        if recent > self.shed_ms and self.level < len(self.levels) - 1:
+            if self.last_change == "restore" and self.frames_at_level < self.restore_wait:
+                # That restore didn't hold: wait longer before trying it again
+                self.restore_wait = min(self.restore_wait * 2, self.max_restore_wait)
+            self._change(1, "shed")
+            return True
+        if recent < self.restore_ms and self.level > 0 and self.frames_at_level >= self.restore_wait:
+            self._change(-1, "restore")
+            return True
+        return False
@@ -0,0 +1,236 @@
+# PyPong - Match Replays
+# A match is fully determined by its settings, its RNG seed and the players'
+# inputs, so a replay stores just those: a small header plus one entry per
+# input change (ticks since the last change and the new held directions).
+# Playing it back re-runs the rules (pong_sim, or pong_multiball for
+# multi-ball matches) and reproduces the match bit for bit, as fast as the
+# simulation can step. A minutes-long match is a few KB.
+#
+# Usage: python pong_replay.py match.pprp [more.pprp ...]
+# replays each file headlessly and checks it against its recorded result.
+
+import random
+import struct
+import sys
+import zlib
+from array import array
+
+import pong_sim
+import pong_multiball
+
+REPLAY_MAGIC = b"PPRP"
+REPLAY_VERSION = 1
+REPLAY_EXTENSION = ".pprp"
+
+# Version, seed, tick rate, serve delay
+_HEADER = struct.Struct("<BQHI")
+# Final tick count and state digest, written when the match is finished
+_FOOTER = struct.Struct("<QI")
+# Ticks, scores, ball and paddle positions, ball velocity: what a desync would change
+_DIGEST = struct.Struct("<QiiddddddB")
+
+
+def new_seed():
+    """A fresh random seed for a match."""
+    return random.getrandbits(64)
+
+
+def state_digest(state):
+    """CRC32 of the parts of a match a replay must reproduce exactly."""
+    ball = state.ball
+    if ball is None:
+        # Multi-ball: the same fields, with every ball's position and velocity
+        balls = state.balls
+        digest = zlib.crc32(_DIGEST.pack(state.ticks, state.player1_score, state.player2_score,
+                                         0.0, 0.0, 0.0, 0.0, state.paddle1.y, state.paddle2.y, state.game_over))
+        return zlib.crc32(array("d", balls.x + balls.y + balls.speed_x + balls.speed_y).tobytes(), digest)
+    return zlib.crc32(_DIGEST.pack(state.ticks, state.player1_score, state.player2_score,
+                                   ball.x, ball.y, ball.speed_x, ball.speed_y,
+                                   state.paddle1.y, state.paddle2.y, state.game_over))
+
+
+def _pack_inputs(inputs):
+    """Both held directions (-1, 0 or 1) in one byte."""
+    return (inputs[0] + 1) | ((inputs[1] + 1) << 2)
+
+
+def _unpack_inputs(byte):
+    return ((byte & 3) - 1, ((byte >> 2) & 3) - 1)
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_text(out, text):
+    encoded = (text or "").encode("utf-8")
+    out.append(len(encoded))
+    out += encoded
+
+
+def _read_text(data, pos):
+    length = data[pos]
+    pos += 1
+    return data[pos:pos + length].decode("utf-8") or None, pos + length
+
+
+class Replay:
+    """Settings, seed and input changes of one match; see ReplayRecorder and play()."""
+
+    def __init__(self, mode, difficulty, seed, player1_difficulty=None, arena=None,
+                 tick_rate=pong_sim.TICK_RATE, serve_delay=pong_sim.SERVE_DELAY_TICKS):
+        self.mode = mode
+        self.difficulty = difficulty
+        self.player1_difficulty = player1_difficulty
+        self.arena = arena # Cosmetic; kept so a viewer can show the same arena
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.serve_delay = serve_delay
+        self.changes = []  # (tick, inputs) whenever the held directions change
+        self.final_ticks = None
+        self.final_digest = None
+
+    def new_game(self):
+        """Creates the match exactly as it was when recording started."""
+        return pong_multiball.rules_for(self.mode).new_game(
+            self.mode, self.difficulty, self.player1_difficulty, rng=random.Random(self.seed),
+            serve_delay=self.serve_delay, tick_rate=self.tick_rate)
+
+    def play(self, state=None):
+        """Re-runs the match, yielding (state, events) after every tick."""
+        if state is None:
+            state = self.new_game()
+        step = pong_multiball.rules_for(self.mode).step
+        changes = iter(self.changes)
+        next_change = next(changes, None)
+        inputs = (0, 0)
+        end = self.final_ticks
+        while not state.game_over and (end is None or state.ticks < end):
+            while next_change is not None and next_change[0] <= state.ticks:
+                inputs = next_change[1]
+                next_change = next(changes, None)
+            if end is None and next_change is None:
+                break # Unfinished recording: nothing more is known past the last change
+            yield state, step(state, inputs)
+
+    def run(self):
+        """Re-runs the whole match as fast as possible and returns the final state."""
+        state = self.new_game()
+        for _ in self.play(state):
+            pass
+        return state
+
+    def verify(self, state=None):
+        """True if re-running the match (or `state`) ends exactly as recorded."""
+        if state is None:
+            state = self.run()
+        return state.ticks == self.final_ticks and state_digest(state) == self.final_digest
+
+    # --- Serialization ---
+
+    def to_bytes(self):
+        out = bytearray(REPLAY_MAGIC)
+        out += _HEADER.pack(REPLAY_VERSION, self.seed, self.tick_rate, self.serve_delay)
+        for text in (self.mode, self.difficulty, self.player1_difficulty, self.arena):
+            _write_text(out, text)
+        _write_varint(out, len(self.changes))
+        last_tick = 0
+        for tick, inputs in self.changes:
+            _write_varint(out, tick - last_tick)
+            out.append(_pack_inputs(inputs))
+            last_tick = tick
+        if self.final_ticks is not None:
+            out += _FOOTER.pack(self.final_ticks, self.final_digest)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != REPLAY_MAGIC:
+            raise ValueError("Not a PyPong replay")
+        version, seed, tick_rate, serve_delay = _HEADER.unpack_from(data, 4)
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        pos = 4 + _HEADER.size
+        mode, pos = _read_text(data, pos)
+        difficulty, pos = _read_text(data, pos)
+        player1_difficulty, pos = _read_text(data, pos)
+        arena, pos = _read_text(data, pos)
+        replay = cls(mode, difficulty, seed, player1_difficulty, arena, tick_rate, serve_delay)
+
+        count, pos = _read_varint(data, pos)
+        tick = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            tick += delta
+            replay.changes.append((tick, _unpack_inputs(data[pos])))
+            pos += 1
+        if len(data) >= pos + _FOOTER.size:
+            replay.final_ticks, replay.final_digest = _FOOTER.unpack_from(data, pos)
+        return replay
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Records a match as it is played: call record() before every step() and finish() at the end."""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self._inputs = (0, 0)
+
+    @classmethod
+    def for_game(cls, state, seed, serve_delay, arena=None):
+        """Starts recording a match created with new_game(..., rng=random.Random(seed))."""
+        return cls(Replay(state.mode, state.difficulty, seed, state.player1_difficulty, arena,
+                          state.tick_rate, serve_delay))
+
+    def record(self, tick, inputs):
+        """Notes the inputs about to be stepped with; only changes are stored."""
+        inputs = tuple(inputs)
+        if inputs != self._inputs:
+            self._inputs = inputs
+            self.replay.changes.append((tick, inputs))
+
+    def finish(self, state):
+        """Stamps the final tick count and state digest that playback is checked against."""
+        self.replay.final_ticks = state.ticks
+        self.replay.final_digest = state_digest(state)
+        return self.replay
+
+
+def main(paths):
+    ok = True
+    for path in paths:
+        replay = Replay.load(path)
+        state = replay.run()
+        matches = replay.verify(state)
+        ok = ok and matches
+        print(f"{path}: {replay.mode} ({replay.difficulty}) {len(replay.changes)} input changes, "
+              f"{state.ticks} ticks, score {state.player1_score}-{state.player2_score}, "
+              f"{'verified' if matches else 'DESYNC'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,336 @@
+# PyPong - Shared-Memory State Export
+# Publishes a running game's state, and optionally a downscaled copy of each
+# rendered frame, in a named shared memory segment with a fixed layout, so
+# analytics and bot processes can follow a match without screen scraping.
+#
+# Every section is guarded by a seqlock: the writer makes the section's
+# sequence number odd, writes the section, and makes it even again. A reader
+# copies the section and keeps the copy only if the sequence was even and the
+# same before and after, retrying otherwise. The game never waits for readers
+# and readers never take a lock. A state update costs the game a few
+# microseconds (about 20 with a hundred multi-ball balls); a frame costs a
+# downscale and a copy of its pixels.
+#
+# Layout (little-endian; offsets are in the header, so readers don't hard-code them):
+#   header  magic "PPSM", version, ball capacity, section offsets, frame size,
+#           the writing game's process id
+#   state   sequence, then one fixed record: tick, tick rate, game state (a
+#           GAME_STATES number), mode and arena names, scores, winner's name,
+#           paddles, the ball, and the number of multi-ball balls, followed by
+#           their x, y, speed_x and speed_y as four columns of `max_balls` doubles
+#   frame   sequence, frame number, then width * height RGB24 pixels (if enabled)
+#
+# Game state numbers (the front end's game_state):
+#   0 splash  1 menu  2 single_player_difficulty_select  3 arena_loading
+#   4 game_running  5 game_over  6 netplay_connecting
+#
+# Names are ASCII, at most 16 bytes. A segment name belongs to one running
+# game at a time: a second game can't take it over, but a segment left by a
+# game that has exited is reclaimed.
+#
+# SharedStateWriter is the game's side; SharedStateReader needs only the
+# standard library (no pygame).
+#
+# Usage: python pong_shared.py [name]   prints the published state of a running game
+
+import os
+import struct
+import sys
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+SHARED_MAGIC = b"PPSM"
+SHARED_VERSION = 3
+DEFAULT_SEGMENT_NAME = "pypong"
+MAX_SHARED_BALLS = 256  # Multi-ball balls exported; the mode serves 100
+READ_RETRIES = 100      # Torn reads tolerated before read_state()/read_frame() give up
+
+# The front end's game states, numbered by position; append new ones, never reorder
+GAME_STATES = ("splash", "menu", "single_player_difficulty_select", "arena_loading",
+               "game_running", "game_over", "netplay_connecting")
+_GAME_STATE_NUMBERS = {name: number for number, name in enumerate(GAME_STATES)}
+
+# Magic, version, max balls, state offset, frame offset, frame width, frame height, writer pid
+_HEADER = struct.Struct("<4sHHIIHHI")
+_SEQUENCE = struct.Struct("<Q")
+# Tick, tick rate, game state number, mode, arena, scores, winner (pong_sim's
+# winning_player, empty if none), game over, paddle ys, ball x, y, speed_x, speed_y,
+# ball active, multi-ball ball count
+_STATE = struct.Struct("<QHB16s16sii16sBddddddBH")
+_FRAME_NUMBER = struct.Struct("<Q")
+_ALIGN = 8
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _text(value):
+    text = (value or "").encode("ascii")
+    if len(text) > 16:
+        raise ValueError(f"{value!r} is longer than the 16 bytes shared names have")
+    return text
+
+
+def _game_state_number(game_state):
+    try:
+        return _GAME_STATE_NUMBERS[game_state]
+    except KeyError:
+        raise ValueError(f"Unknown game state {game_state!r}; add it to GAME_STATES") from None
+
+
+def _process_alive(pid):
+    if sys.platform == "win32":
+        return True # Windows removes a segment with its last handle, so an existing one is in use
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass # Someone else's process, but running
+    return True
+
+
+class _Layout:
+    """Section offsets and sizes for a ball capacity and frame size."""
+
+    def __init__(self, max_balls, frame_size):
+        self.max_balls = max_balls
+        self.frame_size = frame_size
+        self.state_offset = _aligned(_HEADER.size)
+        self.record_offset = self.state_offset + _SEQUENCE.size
+        self.balls_offset = _aligned(self.record_offset + _STATE.size)
+        self.balls_size = 4 * max_balls * 8
+        end = self.balls_offset + self.balls_size
+        width, height = frame_size
+        self.frame_bytes = width * height * 3
+        self.frame_offset = self.pixels_offset = 0
+        if self.frame_bytes:
+            self.frame_offset = _aligned(end)
+            self.pixels_offset = self.frame_offset + _SEQUENCE.size + _FRAME_NUMBER.size
+            end = self.pixels_offset + self.frame_bytes
+        self.size = end
+
+    @classmethod
+    def read(cls, buffer):
+        magic, version, max_balls, state_offset, frame_offset, width, height, _ = _HEADER.unpack_from(buffer)
+        if magic != SHARED_MAGIC:
+            raise ValueError("Not a PyPong shared state segment")
+        if version != SHARED_VERSION:
+            raise ValueError(f"Unsupported shared state version {version}")
+        layout = cls(max_balls, (width, height))
+        if (layout.state_offset, layout.frame_offset) != (state_offset, frame_offset):
+            raise ValueError("Shared state segment layout doesn't match its header")
+        return layout
+
+    def write_header(self, buffer, pid):
+        _HEADER.pack_into(buffer, 0, SHARED_MAGIC, SHARED_VERSION, self.max_balls,
+                          self.state_offset, self.frame_offset, *self.frame_size, pid)
+
+
+def _writer_pid(buffer):
+    """Process id of the game that created a current-version segment, or None if it isn't one."""
+    if len(buffer) < _HEADER.size:
+        return None
+    magic, version, *_, pid = _HEADER.unpack_from(buffer)
+    if magic != SHARED_MAGIC or version != SHARED_VERSION:
+        return None
+    return pid
+
+
+class SharedStateWriter:
+    """Creates the shared segment and publishes the game into it.
+
+    Call publish_state() after each tick (and whenever the game state
+    changes) and, if a frame_size was given, publish_frame() with RGB24
+    pixels after each frame. close() removes the segment.
+
+    Raises FileExistsError if another running game, or anything other than
+    a PyPong segment, already has the name.
+    """
+
+    def __init__(self, name=DEFAULT_SEGMENT_NAME, max_balls=MAX_SHARED_BALLS, frame_size=(0, 0)):
+        self.layout = _Layout(max_balls, frame_size)
+        try:
+            self.memory = shared_memory.SharedMemory(name, create=True, size=self.layout.size)
+        except FileExistsError:
+            self._reclaim(name)
+            self.memory = shared_memory.SharedMemory(name, create=True, size=self.layout.size)
+        self.name = name
+        buffer = self.memory.buf
+        self.layout.write_header(buffer, os.getpid())
+        self._state_sequence = 0
+        self._frame_sequence = 0
+        self.frames = 0
+        layout = self.layout
+        self._balls = buffer[layout.balls_offset:layout.balls_offset + layout.balls_size].cast("d")
+        if layout.frame_bytes:
+            self._pixels = buffer[layout.pixels_offset:layout.pixels_offset + layout.frame_bytes]
+
+    @staticmethod
+    def _reclaim(name):
+        """Removes a segment left by a game that has exited; anything else keeps the name."""
+        existing = shared_memory.SharedMemory(name)
+        try:
+            pid = _writer_pid(existing.buf)
+            if pid is not None and not _process_alive(pid):
+                existing.unlink() # Readers still attached keep the old segment until they detach
+                return
+            if pid != os.getpid():
+                # Attaching registered it to be removed when this process exits; it isn't ours
+                resource_tracker.unregister(existing._name, "shared_memory")
+        finally:
+            existing.close()
+        if pid is None:
+            raise FileExistsError(f"Shared memory {name!r} exists and isn't a PyPong state segment "
+                                  f"of this version; pick another name")
+        raise FileExistsError(f"Shared memory {name!r} is in use by the game in process {pid}; pick another name")
+
+    def publish_state(self, state, game_state, arena=None):
+        """Publishes a pong_sim or pong_multiball match, as of its latest tick.
+
+        `game_state` must be one of GAME_STATES.
+        """
+        buffer = self.memory.buf
+        layout = self.layout
+        sequence = self._state_sequence + 1
+        _SEQUENCE.pack_into(buffer, layout.state_offset, sequence) # Odd: readers retry
+
+        ball = state.ball
+        ball_count = 0
+        if ball is None:
+            balls = state.balls
+            ball_count = min(len(balls.x), layout.max_balls)
+            capacity = layout.max_balls
+            for column, values in enumerate((balls.x, balls.y, balls.speed_x, balls.speed_y)):
+                start = column * capacity
+                self._balls[start:start + ball_count] = array("d", values[:ball_count])
+            ball_values = (0.0, 0.0, 0.0, 0.0, False)
+        else:
+            ball_values = (ball.x, ball.y, ball.speed_x, ball.speed_y, ball.active)
+        _STATE.pack_into(buffer, layout.record_offset, state.ticks, state.tick_rate, _game_state_number(game_state),
+                         _text(state.mode), _text(arena), state.player1_score, state.player2_score,
+                         _text(state.winning_player), state.game_over, state.paddle1.y, state.paddle2.y,
+                         *ball_values, ball_count)
+
+        self._state_sequence = sequence + 1
+        _SEQUENCE.pack_into(buffer, layout.state_offset, self._state_sequence)
+
+    def publish_frame(self, pixels):
+        """Publishes one frame of frame_size RGB24 pixels (bytes or any buffer of that size)."""
+        buffer = self.memory.buf
+        offset = self.layout.frame_offset
+        sequence = self._frame_sequence + 1
+        _SEQUENCE.pack_into(buffer, offset, sequence)
+        self.frames += 1
+        _FRAME_NUMBER.pack_into(buffer, offset + _SEQUENCE.size, self.frames)
+        self._pixels[:] = pixels
+        self._frame_sequence = sequence + 1
+        _SEQUENCE.pack_into(buffer, offset, self._frame_sequence)
+
+    def close(self):
+        """Detaches from the segment and removes it; attached readers keep their mapping."""
+        self._balls.release()
+        if self.layout.frame_bytes:
+            self._pixels.release()
+        self.memory.close()
+        self.memory.unlink()
+
+
+class SharedState:
+    """One consistent copy of the published state record."""
+
+    def __init__(self, sequence, record, balls, max_balls):
+        (self.ticks, self.tick_rate, game_state, mode, arena, self.player1_score, self.player2_score,
+         winner, game_over, self.paddle1_y, self.paddle2_y, self.ball_x, self.ball_y,
+         self.ball_speed_x, self.ball_speed_y, ball_active, ball_count) = record
+        self.sequence = sequence
+        # None for a state a newer game added that this copy doesn't know
+        self.game_state = GAME_STATES[game_state] if game_state < len(GAME_STATES) else None
+        self.mode = mode.rstrip(b"\0").decode("ascii")
+        self.arena = arena.rstrip(b"\0").decode("ascii") or None
+        self.winning_player = winner.rstrip(b"\0").decode("ascii") or None
+        self.game_over = bool(game_over)
+        self.ball_active = bool(ball_active)
+        columns = array("d", balls)
+        # Multi-ball only: (x, y, speed_x, speed_y) of each ball
+        self.balls = [(columns[i], columns[max_balls + i], columns[2 * max_balls + i], columns[3 * max_balls + i])
+                      for i in range(ball_count)]
+
+    def __repr__(self):
+        return (f"SharedState(tick={self.ticks}, game_state={self.game_state!r}, mode={self.mode!r}, "
+                f"score={self.player1_score}-{self.player2_score}, balls={len(self.balls) or 1})")
+
+
+class SharedStateReader:
+    """Attaches to a running game's segment and reads consistent copies of it, without locking."""
+
+    def __init__(self, name=DEFAULT_SEGMENT_NAME):
+        self.memory = shared_memory.SharedMemory(name)
+        # Attaching registers the segment to be removed when this process exits (before
+        # Python 3.13's track=False); it's the game's to remove
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+        self.layout = _Layout.read(self.memory.buf)
+
+    def _read_section(self, offset, start, end):
+        buffer = self.memory.buf
+        for _ in range(READ_RETRIES):
+            before = _SEQUENCE.unpack_from(buffer, offset)[0]
+            if before & 1:
+                time.sleep(0) # The game is writing it; let it finish
+                continue
+            data = bytes(buffer[start:end])
+            if _SEQUENCE.unpack_from(buffer, offset)[0] == before:
+                return before, data
+        return None, None
+
+    def read_state(self):
+        """The latest state as a SharedState, or None if none was published yet (or no clean read)."""
+        layout = self.layout
+        sequence, data = self._read_section(layout.state_offset, layout.record_offset,
+                                            layout.balls_offset + layout.balls_size)
+        if not sequence:
+            return None
+        balls_start = layout.balls_offset - layout.record_offset
+        return SharedState(sequence, _STATE.unpack_from(data), data[balls_start:], layout.max_balls)
+
+    def read_frame(self):
+        """(frame number, RGB24 bytes) of the latest frame, or None if frames aren't published."""
+        layout = self.layout
+        if not layout.frame_bytes:
+            return None
+        number_offset = layout.frame_offset + _SEQUENCE.size
+        sequence, data = self._read_section(layout.frame_offset, number_offset, layout.pixels_offset + layout.frame_bytes)
+        if not sequence:
+            return None
+        return _FRAME_NUMBER.unpack_from(data)[0], data[_FRAME_NUMBER.size:]
+
+    @property
+    def frame_size(self):
+        return self.layout.frame_size
+
+    def close(self):
+        self.memory.close()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    reader = SharedStateReader(args[0] if args else DEFAULT_SEGMENT_NAME)
+    last = None
+    try:
+        while True:
+            state = reader.read_state()
+            if state is not None and state.sequence != last:
+                last = state.sequence
+                print(state)
+            time.sleep(0.25)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
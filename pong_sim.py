@@ -0,0 +1,599 @@
+# PyPong - Headless Simulation Core
+# The game rules (paddles, ball, AI, scoring, survival and win conditions)
+# with no pygame, display or font dependency. The pygame front end in
+# PyPongBeta0.13.py drives this module once per frame and only draws the
+# result, so the same matches can also run without a window (CI, AI tuning).
+
+import math
+import random
+
+# --- Game Constants ---
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 700
+PADDLE_WIDTH = 20
+PADDLE_HEIGHT = 120
+BALL_SIZE = 20
+MAX_SCORE = 5
+
+# Speeds, delays and AI reaction times below are tuned per tick at TICK_RATE.
+# A match can step at another rate (new_game's tick_rate); they are rescaled
+# so the game plays the same in real time, just in finer or coarser steps.
+TICK_RATE = 60 # Simulation steps per second
+
+# Paddles sit this far in from the left and right edges
+PADDLE_MARGIN = 50
+
+# Initial speeds
+BALL_INITIAL_SPEED = 7
+PADDLE_SPEED = 8
+
+# Ball speed-up on every paddle hit, and the cap on each velocity component
+BALL_SPEED_INCREMENT = 0.3
+BALL_MAX_AXIS_SPEED = 20
+
+# Delay before the ball is served after a point (1.5 seconds)
+SERVE_DELAY_TICKS = 90
+
+# AI Speeds for different difficulties
+AI_SPEEDS = {
+    "easy": 6,
+    "medium": 7,
+    "hard": 8
+}
+
+# AI reaction delay: ticks between a new prediction and the paddle acting on it
+AI_REACTION_TICKS = {
+    "easy": 20,
+    "medium": 10,
+    "hard": 3
+}
+
+# AI aim error: a random offset in [-n, n] pixels at serve speed, rolled once
+# per prediction and scaled up as the ball speeds up
+AI_ERROR = {
+    "easy": 110,
+    "medium": 90,
+    "hard": 75
+}
+
+GAME_MODES = ("classic_ai", "two_player", "survival")
+
+# Ball x (top-left) when it touches paddle 1's or paddle 2's face
+PADDLE1_CONTACT_X = PADDLE_MARGIN + PADDLE_WIDTH
+PADDLE2_CONTACT_X = SCREEN_WIDTH - PADDLE_MARGIN - PADDLE_WIDTH - BALL_SIZE
+
+# Ball y (top-left) when it touches the bottom wall
+BALL_MAX_Y = SCREEN_HEIGHT - BALL_SIZE
+
+# Most bounces resolved within one tick (a wall and a paddle face, plus slack)
+MAX_SUBSTEPS = 4
+
+# --- Simulation Events ---
+# Appended to GameState.events during a step so a front end can react
+# (particles, sounds, trail resets) without re-deriving what happened.
+EVENT_WALL_BOUNCE = "wall_bounce"   # (EVENT_WALL_BOUNCE,)
+EVENT_PADDLE_HIT = "paddle_hit"     # (EVENT_PADDLE_HIT, ball_centerx, ball_centery)
+EVENT_SCORE = "score"               # (EVENT_SCORE, scoring_player) with player 1 or 2
+EVENT_SERVE = "serve"               # (EVENT_SERVE,)
+EVENT_GAME_OVER = "game_over"       # (EVENT_GAME_OVER, winning_player)
+
+
+def _round(value):
+    """Rounds half up, the same way pygame.Rect stores float coordinates."""
+    return math.floor(value + 0.5)
+
+
+def ai_profile(mode, difficulty):
+    """Returns the (speed, reaction_ticks, error) an AI paddle plays with."""
+    if mode == "survival":
+        # Survival AI is perfect: medium speed, instant reaction and perfect aim
+        return AI_SPEEDS["medium"], 0, 0
+    return AI_SPEEDS[difficulty], AI_REACTION_TICKS[difficulty], AI_ERROR[difficulty]
+
+
+def fold_ball_y(y):
+    """Maps an unbounded ball top y back into the court, mirroring at each wall."""
+    span = SCREEN_HEIGHT - BALL_SIZE
+    y %= 2 * span
+    return y if y <= span else 2 * span - y
+
+
+def predict_arrival_y(x, y, speed_x, speed_y, player):
+    """Predicts the ball's center y when it next reaches the given player's paddle.
+
+    Wall bounces are solved in closed form by unfolding the path. If the ball is
+    moving away, the path is continued through a bounce off the far paddle,
+    which reverses x but keeps the direction of travel, so only the slope matters.
+    """
+    if speed_x == 0:
+        return y + BALL_SIZE / 2
+    if player == 2:
+        distance = PADDLE2_CONTACT_X - x if speed_x > 0 else (
+            (x - PADDLE1_CONTACT_X) + (PADDLE2_CONTACT_X - PADDLE1_CONTACT_X))
+    else:
+        distance = x - PADDLE1_CONTACT_X if speed_x < 0 else (
+            (PADDLE2_CONTACT_X - x) + (PADDLE2_CONTACT_X - PADDLE1_CONTACT_X))
+    travel = max(distance, 0) / abs(speed_x) * speed_y
+    return fold_ball_y(y + travel) + BALL_SIZE / 2
+
+
+class PaddleAI:
+    """Predictive AI for one paddle.
+
+    Instead of chasing the ball every tick, it solves where the ball will
+    cross its paddle once per serve or paddle hit, adds its aim error, and
+    after its reaction delay moves toward that point at its top speed.
+    """
+    __slots__ = ("player", "speed", "reaction_ticks", "error", "target", "planned_target", "react_at")
+
+    def __init__(self, player, speed, reaction_ticks, error):
+        self.player = player
+        self.speed = speed
+        self.reaction_ticks = reaction_ticks
+        self.error = error
+        self.target = SCREEN_HEIGHT // 2         # Paddle center the AI is heading for
+        self.planned_target = SCREEN_HEIGHT // 2 # Next target, adopted at react_at
+        self.react_at = 0
+
+    def _schedule(self, target, ticks):
+        half = PADDLE_HEIGHT // 2
+        self.planned_target = min(max(target, half), SCREEN_HEIGHT - half)
+        self.react_at = ticks + self.reaction_ticks
+        if self.reaction_ticks == 0:
+            self.target = self.planned_target
+
+    def plan(self, state):
+        """Predicts where the ball will arrive and schedules the paddle's reaction."""
+        ball = state.ball
+        arrival = predict_arrival_y(ball.x, ball.y, ball.speed_x, ball.speed_y, self.player)
+        # Faster balls are harder to read: the aim error grows with the rally speed
+        error = 0
+        if self.error:
+            spread = _round(self.error * ball.speed_magnitude / BALL_INITIAL_SPEED)
+            error = state.rng.randint(-spread, spread)
+        self._schedule(_round(arrival) + error, state.ticks)
+
+    def plan_center(self, state):
+        """Heads back to the middle while the ball waits to be served."""
+        self._schedule(SCREEN_HEIGHT // 2, state.ticks)
+
+    def paddle_speed(self, paddle, ticks):
+        """Speed this tick: straight toward the target, never overshooting it."""
+        if ticks >= self.react_at:
+            self.target = self.planned_target
+        offset = self.target - (paddle.y + PADDLE_HEIGHT // 2)
+        return max(-self.speed, min(self.speed, offset))
+
+
+class PaddleState:
+    """A paddle's top-left position and vertical speed, in screen pixels."""
+    __slots__ = ("x", "y", "speed")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.speed = 0
+
+    @property
+    def centery(self):
+        return self.y + PADDLE_HEIGHT // 2
+
+    def move(self):
+        """Updates the paddle's vertical position and keeps it within screen bounds."""
+        y = self.y + self.speed
+        if y < 0:
+            y = 0
+        elif y > SCREEN_HEIGHT - PADDLE_HEIGHT:
+            y = SCREEN_HEIGHT - PADDLE_HEIGHT
+        self.y = y
+
+
+class BallState:
+    """The ball's top-left position, velocity and serve status.
+
+    The position is kept as floats; front ends round it into a pygame.Rect
+    only for drawing, so slow angles never lose their fractional movement.
+    """
+    __slots__ = ("x", "y", "speed_x", "speed_y", "speed_magnitude", "active", "serve_timer")
+
+    def __init__(self):
+        self.x = float(SCREEN_WIDTH // 2 - BALL_SIZE // 2)
+        self.y = float(SCREEN_HEIGHT // 2 - BALL_SIZE // 2)
+        self.speed_x = 0
+        self.speed_y = 0
+        self.speed_magnitude = BALL_INITIAL_SPEED
+        self.active = False
+        self.serve_timer = 0
+
+    @property
+    def centerx(self):
+        return self.x + BALL_SIZE // 2
+
+    @property
+    def centery(self):
+        return self.y + BALL_SIZE // 2
+
+    def reset_speeds(self, rng):
+        """Calculates initial speed vectors with varied angles."""
+        self.speed_magnitude = BALL_INITIAL_SPEED
+        angle = rng.uniform(math.pi/6, math.pi/3)
+        direction_x = rng.choice((-1, 1))
+        direction_y = rng.choice((-1, 1))
+
+        self.speed_x = direction_x * math.cos(angle) * self.speed_magnitude
+        self.speed_y = direction_y * math.sin(angle) * self.speed_magnitude
+
+    def reset(self, rng, serve_delay=SERVE_DELAY_TICKS):
+        """Puts the ball back in the center with a new direction, waiting to be served."""
+        self.x = float(SCREEN_WIDTH // 2 - BALL_SIZE // 2)
+        self.y = float(SCREEN_HEIGHT // 2 - BALL_SIZE // 2)
+        self.reset_speeds(rng)
+        self.active = serve_delay <= 0
+        self.serve_timer = serve_delay
+
+
+class GameState:
+    """Everything needed to advance one match; see new_game() and step()."""
+    modes = GAME_MODES # Modes these rules play; pong_multiball's state plays its own
+    __slots__ = ("mode", "difficulty", "player1_difficulty", "paddle1", "paddle2", "ball",
+                 "player1_score", "player2_score", "winning_player", "game_over",
+                 "ticks", "rng", "events", "player1_ai", "player2_ai",
+                 "tick_rate", "tick_scale", "serve_delay")
+
+    def __init__(self, mode, difficulty=None, player1_difficulty=None, rng=None, tick_rate=TICK_RATE):
+        if mode not in self.modes:
+            raise ValueError(f"Unknown game mode: {mode!r}")
+        if tick_rate <= 0:
+            raise ValueError(f"Tick rate must be positive, got {tick_rate!r}")
+        self.mode = mode
+        self.difficulty = difficulty
+        self.player1_difficulty = player1_difficulty
+        self.rng = rng if rng is not None else random.Random()
+        self.paddle1 = PaddleState(PADDLE_MARGIN, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
+        self.paddle2 = PaddleState(SCREEN_WIDTH - PADDLE_MARGIN - PADDLE_WIDTH, SCREEN_HEIGHT // 2 - PADDLE_HEIGHT // 2)
+        self.ball = BallState()
+        self.player1_score = 0
+        self.player2_score = 0
+        self.winning_player = None
+        self.game_over = False
+        self.ticks = 0
+        self.events = []
+
+        # TICK_RATE ticks per tick of this match, and the serve delay in its own ticks
+        self.tick_rate = tick_rate
+        self.tick_scale = TICK_RATE / tick_rate
+        self.serve_delay = self.scale_ticks(SERVE_DELAY_TICKS)
+
+        # Paddle 2 is AI-controlled in every mode but two player
+        self.player2_ai = None
+        if mode != "two_player":
+            self.player2_ai = self._new_ai(2, *ai_profile(mode, difficulty))
+
+        # Paddle 1 is human unless a difficulty is given (headless AI vs AI)
+        self.player1_ai = None
+        if player1_difficulty is not None:
+            self.player1_ai = self._new_ai(1, *ai_profile("classic_ai", player1_difficulty))
+
+    def scale_ticks(self, ticks):
+        """Converts a duration in TICK_RATE ticks to this match's ticks."""
+        return _round(ticks / self.tick_scale)
+
+    def _new_ai(self, player, speed, reaction_ticks, error):
+        return PaddleAI(player, speed * self.tick_scale, self.scale_ticks(reaction_ticks), error)
+
+    def set_ai(self, player, speed, reaction_ticks, error):
+        """Hands paddle 1 or 2 to an AI with a custom profile (units as in ai_profile)."""
+        ai = self._new_ai(player, speed, reaction_ticks, error)
+        if player == 1:
+            self.player1_ai = ai
+        else:
+            self.player2_ai = ai
+        if self.ball.active:
+            ai.plan(self)
+
+    @property
+    def survival_time(self):
+        """Seconds of game time played so far."""
+        return self.ticks / self.tick_rate
+
+    def snapshot(self):
+        """Everything step() can change, as a value restore() rolls the match back to.
+
+        Much cheaper than copying the state, so rollback netplay can take one every tick.
+        """
+        ball = self.ball
+        ais = tuple((ai.target, ai.planned_target, ai.react_at)
+                    for ai in (self.player1_ai, self.player2_ai) if ai is not None)
+        return (self.paddle1.y, self.paddle1.speed, self.paddle2.y, self.paddle2.speed,
+                ball.x, ball.y, ball.speed_x, ball.speed_y, ball.speed_magnitude, ball.active, ball.serve_timer,
+                self.player1_score, self.player2_score, self.winning_player, self.game_over, self.ticks,
+                self.rng.getstate(), ais)
+
+    def restore(self, snapshot):
+        """Puts the match back exactly as it was when `snapshot` was taken."""
+        ball = self.ball
+        (self.paddle1.y, self.paddle1.speed, self.paddle2.y, self.paddle2.speed,
+         ball.x, ball.y, ball.speed_x, ball.speed_y, ball.speed_magnitude, ball.active, ball.serve_timer,
+         self.player1_score, self.player2_score, self.winning_player, self.game_over, self.ticks,
+         rng_state, ais) = snapshot
+        self.rng.setstate(rng_state)
+        players = [ai for ai in (self.player1_ai, self.player2_ai) if ai is not None]
+        for ai, (target, planned_target, react_at) in zip(players, ais):
+            ai.target, ai.planned_target, ai.react_at = target, planned_target, react_at
+
+
+def new_game(mode, difficulty="medium", player1_difficulty=None, rng=None, serve_delay=SERVE_DELAY_TICKS,
+             tick_rate=TICK_RATE):
+    """Creates a fresh match with the ball in the center waiting to be served.
+
+    `serve_delay` is in TICK_RATE ticks, like SERVE_DELAY_TICKS.
+    """
+    state = GameState(mode, difficulty, player1_difficulty, rng, tick_rate)
+    state.ball.reset(state.rng, state.scale_ticks(serve_delay))
+    if state.ball.active:
+        _plan_ai(state)
+    return state
+
+
+def _plan_ai(state):
+    """Re-predicts the ball's arrival for every AI paddle (on serves and paddle hits)."""
+    if state.player1_ai is not None:
+        state.player1_ai.plan(state)
+    if state.player2_ai is not None:
+        state.player2_ai.plan(state)
+
+
+def _wall_time(ball):
+    """Fraction of a tick until the ball touches the wall it is heading for (inf if none)."""
+    if ball.speed_y < 0:
+        return max(ball.y, 0.0) / -ball.speed_y
+    if ball.speed_y > 0:
+        return max(BALL_MAX_Y - ball.y, 0.0) / ball.speed_y
+    return math.inf
+
+
+def _face_time(ball, paddle1, paddle2):
+    """Fraction of a tick until the ball meets the face of the paddle it is heading for.
+
+    Only a ball still in front of the face can hit it; once past, it can no
+    longer be caught by the paddle's edges, so it never sticks inside one.
+    """
+    if ball.speed_x < 0:
+        gap = ball.x - PADDLE1_CONTACT_X
+        paddle = paddle1
+    else:
+        gap = PADDLE2_CONTACT_X - ball.x
+        paddle = paddle2
+    if gap < 0 or ball.speed_x == 0:
+        return math.inf
+    t = gap / abs(ball.speed_x)
+    y = ball.y + ball.speed_y * t
+    if paddle.y - BALL_SIZE < y < paddle.y + PADDLE_HEIGHT:
+        return t
+    return math.inf
+
+
+def _paddle_bounce(state):
+    """Reverses the ball off a paddle face, speeding it up and capping each axis."""
+    ball = state.ball
+    ball.speed_x *= -1
+    ball.speed_magnitude += BALL_SPEED_INCREMENT
+
+    current_vector_length = (ball.speed_x**2 + ball.speed_y**2)**0.5
+    if current_vector_length > 0:
+        ball.speed_x = (ball.speed_x / current_vector_length) * ball.speed_magnitude
+        ball.speed_y = (ball.speed_y / current_vector_length) * ball.speed_magnitude
+    else:
+        ball.reset_speeds(state.rng)
+
+    if abs(ball.speed_x) > BALL_MAX_AXIS_SPEED:
+        ball.speed_x = BALL_MAX_AXIS_SPEED * (1 if ball.speed_x > 0 else -1)
+    if abs(ball.speed_y) > BALL_MAX_AXIS_SPEED:
+        ball.speed_y = BALL_MAX_AXIS_SPEED * (1 if ball.speed_y > 0 else -1)
+
+
+def _move_ball(state):
+    """Moves the ball one tick, bouncing at the exact time of impact; True on a paddle hit.
+
+    Times here are in TICK_RATE ticks, the unit the ball's speed is given in.
+
+    Each pass finds the earliest wall or paddle-face contact along the ball's
+    path (a swept test, so no speed can tunnel through a 20px paddle or past
+    a wall), advances to it, reflects and carries on with the rest of the tick.
+    """
+    ball = state.ball
+    hit = False
+    remaining = state.tick_scale
+    for _ in range(MAX_SUBSTEPS):
+        wall_time = _wall_time(ball)
+        face_time = _face_time(ball, state.paddle1, state.paddle2)
+        t = min(wall_time, face_time, remaining)
+        ball.x += ball.speed_x * t
+        ball.y += ball.speed_y * t
+        remaining -= t
+        if wall_time <= t:
+            ball.speed_y *= -1
+            state.events.append((EVENT_WALL_BOUNCE,))
+        if face_time <= t:
+            state.events.append((EVENT_PADDLE_HIT, ball.x + BALL_SIZE / 2, ball.y + BALL_SIZE / 2))
+            _paddle_bounce(state)
+            hit = True
+        if remaining <= 0:
+            break
+    return hit
+
+
+def _point_scored(state, scoring_player):
+    """Awards a point (or ends survival) and re-serves the ball."""
+    state.events.append((EVENT_SCORE, scoring_player))
+    if state.mode == "survival":
+        if scoring_player == 2:
+            # The ball got past the player: survival run is over
+            state.winning_player = "You"
+            state.game_over = True
+            state.events.append((EVENT_GAME_OVER, state.winning_player))
+            return
+        # AI is perfect, so this shouldn't happen unless
+        # the ball spawns weirdly. We just reset.
+    elif scoring_player == 1:
+        state.player1_score += 1
+    else:
+        state.player2_score += 1
+    state.ball.reset(state.rng, state.serve_delay)
+    for ai in (state.player1_ai, state.player2_ai):
+        if ai is not None:
+            ai.plan_center(state)
+
+
+def step(state, inputs=(0, 0)):
+    """Advances the match by one tick and returns the events it produced.
+
+    `inputs` holds the held direction (-1 up, 0 none, 1 down) for paddle 1 and
+    paddle 2; a paddle's input is ignored while the AI controls it.
+    """
+    events = state.events
+    events.clear()
+    if state.game_over:
+        return events
+
+    ball = state.ball
+    paddle1 = state.paddle1
+    paddle2 = state.paddle2
+
+    # Serve countdown
+    if not ball.active:
+        ball.serve_timer -= 1
+        if ball.serve_timer <= 0:
+            ball.active = True
+            events.append((EVENT_SERVE,))
+            _plan_ai(state)
+
+    ticks = state.ticks
+    if state.player1_ai is None:
+        paddle1.speed = inputs[0] * PADDLE_SPEED * state.tick_scale
+    else:
+        paddle1.speed = state.player1_ai.paddle_speed(paddle1, ticks)
+    paddle1.move()
+
+    if state.player2_ai is None:
+        paddle2.speed = inputs[1] * PADDLE_SPEED * state.tick_scale
+    else:
+        paddle2.speed = state.player2_ai.paddle_speed(paddle2, ticks)
+    paddle2.move()
+
+    if ball.active and _move_ball(state):
+        _plan_ai(state)
+
+    # Scoring Logic
+    if ball.x <= 0:
+        _point_scored(state, 2)
+    elif ball.x + BALL_SIZE >= SCREEN_WIDTH:
+        _point_scored(state, 1)
+
+    # Game Win Condition
+    if state.mode != "survival" and not state.game_over:
+        if state.player1_score >= MAX_SCORE:
+            state.winning_player = "Player 1"
+        elif state.player2_score >= MAX_SCORE:
+            state.winning_player = "Player 2"
+        if state.winning_player:
+            state.game_over = True
+            events.append((EVENT_GAME_OVER, state.winning_player))
+
+    state.ticks += 1
+    return events
+
+
+def run_match(state, max_ticks=None, inputs=(0, 0)):
+    """Steps a match until it ends (or max_ticks pass) with fixed inputs; returns the state."""
+    while not state.game_over and (max_ticks is None or state.ticks < max_ticks):
+        step(state, inputs)
+    return state
+
+
+# --- Fast-Forward ---
+# Between events every tick is the same linear update: the ball keeps its
+# velocity and each paddle heads for a fixed target at a fixed speed. So the
+# quiet stretch up to the next event tick (a wall or paddle-face contact, a
+# goal, a serve or an AI reaction) is applied in one closed-form jump, and only
+# event ticks go through step(). Random draws happen at the same ticks as in a
+# stepped run, so results match it up to floating-point rounding.
+
+def _ticks_until_contact(ball, tick_scale):
+    """Whole ticks the ball can move before its move touches a wall, a paddle face or a goal line."""
+    if not ball.active:
+        return math.inf
+    t = _wall_time(ball)
+    if ball.speed_x < 0:
+        gap = ball.x - PADDLE1_CONTACT_X
+        if gap < 0:
+            gap = ball.x # Already past the face: next stop is the goal line
+        t = min(t, max(gap, 0.0) / -ball.speed_x)
+    elif ball.speed_x > 0:
+        gap = PADDLE2_CONTACT_X - ball.x
+        if gap < 0:
+            gap = SCREEN_WIDTH - BALL_SIZE - ball.x
+        t = min(t, max(gap, 0.0) / ball.speed_x)
+    if t == math.inf:
+        return t
+    return max(math.ceil(t / tick_scale) - 1, 0)
+
+
+def _quiet_ticks(state):
+    """Ticks from now that are pure linear motion, with no event of any kind."""
+    ball = state.ball
+    quiet = _ticks_until_contact(ball, state.tick_scale)
+    if not ball.active:
+        quiet = min(quiet, ball.serve_timer - 1)
+    for ai in (state.player1_ai, state.player2_ai):
+        if ai is not None and ai.target != ai.planned_target:
+            quiet = min(quiet, ai.react_at - state.ticks)
+    return max(quiet, 0)
+
+
+def _coast_paddle(paddle, ai, held_input, ticks, tick_scale):
+    """Moves a paddle as `ticks` ticks of step() would, toward a fixed target or held input."""
+    if ai is None:
+        paddle.speed = held_input * PADDLE_SPEED * tick_scale
+        y = paddle.y + paddle.speed * ticks
+    else:
+        offset = ai.target - (paddle.y + PADDLE_HEIGHT // 2)
+        reach = ai.speed * ticks
+        y = paddle.y + max(-reach, min(reach, offset))
+    paddle.y = min(max(y, 0), SCREEN_HEIGHT - PADDLE_HEIGHT)
+
+
+def _coast(state, ticks, inputs):
+    """Advances a quiet stretch of `ticks` ticks in one step (see _quiet_ticks)."""
+    state.events.clear()
+    tick_scale = state.tick_scale
+    _coast_paddle(state.paddle1, state.player1_ai, inputs[0], ticks, tick_scale)
+    _coast_paddle(state.paddle2, state.player2_ai, inputs[1], ticks, tick_scale)
+    ball = state.ball
+    if ball.active:
+        ball.x += ball.speed_x * tick_scale * ticks
+        ball.y += ball.speed_y * tick_scale * ticks
+    else:
+        ball.serve_timer -= ticks
+    state.ticks += ticks
+
+
+def fast_forward(state, max_ticks=None, inputs=(0, 0), on_events=None):
+    """Plays a match like run_match(), but jumps over the quiet ticks between events.
+
+    A whole AI-vs-AI or survival match takes a few hundred step() calls
+    instead of thousands; tick counts and scores match a stepped run.
+    `on_events(state, events)` is called after every step() that runs, which
+    includes every tick that produced an event.
+    """
+    while not state.game_over and (max_ticks is None or state.ticks < max_ticks):
+        quiet = _quiet_ticks(state)
+        if max_ticks is not None:
+            quiet = min(quiet, max_ticks - state.ticks)
+        if quiet > 0:
+            _coast(state, quiet, inputs)
+        else:
+            events = step(state, inputs)
+            if on_events is not None and events:
+                on_events(state, events)
+    return state
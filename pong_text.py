@@ -0,0 +1,59 @@
+# PyPong - Text Surface Cache
+# Rendering text is the most expensive thing the menus and HUD do each frame,
+# yet almost every string drawn (titles, buttons, scores, timers) is the same
+# as last frame. TextCache renders each (font, text, color, antialias) once
+# and hands back the same Surface until it falls out of the LRU window.
+#
+# Only needs the font objects passed in; pygame itself is never imported here.
+
+from collections import OrderedDict
+
+# Distinct strings kept rendered; comfortably more than one screen's worth
+TEXT_CACHE_SIZE = 256
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Returned surfaces are shared between callers, so they must be blitted,
+    never drawn on. `hits` and `misses` count lookups for instrumentation.
+    """
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """Returns font.render(text, antialias, color), rendering it only on a cache miss."""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False) # Evict the least recently used string
+        return surface
+
+    def clear(self):
+        """Drops every cached surface (the hit and miss counters are kept)."""
+        self._surfaces.clear()
+
+    def stats(self):
+        """Cache counters as a dict, for profiling overlays and benchmarks."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
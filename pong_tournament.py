@@ -0,0 +1,257 @@
+# PyPong - Tournament Runner
+# Plays headless round-robin tournaments between AI difficulties, custom AI
+# profiles and scripted opponents, spread over a process pool, and reports
+# win rates, rally lengths and peak ball speeds per pairing as CSV or JSON.
+# Used to tune AI_SPEEDS / AI_REACTION_TICKS / AI_ERROR in pong_sim.
+#
+# Every match seed is derived from the tournament seed and the match's place
+# in it, so results are identical whatever the worker count or scheduling.
+# Arenas are purely cosmetic (they never touch pong_sim), so they are not a
+# tournament dimension.
+#
+# Usage: python pong_tournament.py --matches 500 --output results.csv
+#        python pong_tournament.py --profile quick=9:5:80 --player2 medium quick
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pong_sim
+
+DIFFICULTIES = tuple(pong_sim.AI_SPEEDS)
+
+# Player 1 only: opponents driven by inputs instead of an AI
+SCRIPTED_OPPONENTS = ("idle", "tracker")
+
+# Player 2 only: the perfect survival AI (the match is a survival run)
+SURVIVAL_OPPONENT = "survival"
+
+DEFAULT_PLAYER1 = DIFFICULTIES + SCRIPTED_OPPONENTS
+DEFAULT_PLAYER2 = DIFFICULTIES + (SURVIVAL_OPPONENT,)
+
+# Pixels the tracker lets the ball drift from its paddle center before moving
+TRACKER_DEAD_ZONE = 10
+
+# Matches played per task sent to a worker; big enough to amortize the round trip
+DEFAULT_CHUNK_SIZE = 25
+
+# Unfinished matches are stopped after an hour of game time
+DEFAULT_MAX_TICKS = 60 * 60 * pong_sim.TICK_RATE
+
+REPORT_FIELDS = ("player1", "player2", "mode", "matches", "player1_win_rate", "player2_win_rate",
+                 "unfinished", "mean_match_seconds", "mean_rally_hits", "longest_rally_hits",
+                 "mean_peak_speed", "peak_speed")
+
+
+def match_seed(seed, player1, player2, index):
+    """The RNG seed for one match, fixed by its place in the tournament."""
+    return random.Random(f"{seed}:{player1}:{player2}:{index}").getrandbits(64)
+
+
+def parse_profile(text):
+    """Parses NAME=SPEED:REACTION:ERROR into (name, (speed, reaction_ticks, error))."""
+    name, _, values = text.partition("=")
+    try:
+        speed, reaction_ticks, error = values.split(":")
+        return name, (float(speed), int(reaction_ticks), int(error))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected NAME=SPEED:REACTION:ERROR, got {text!r}") from None
+
+
+def _tracker_inputs(state):
+    """Scripted player 1 that holds toward the ball's center, like the old chasing AI."""
+    offset = state.ball.centery - state.paddle1.centery
+    if offset < -TRACKER_DEAD_ZONE:
+        return (-1, 0)
+    if offset > TRACKER_DEAD_ZONE:
+        return (1, 0)
+    return (0, 0)
+
+
+def new_match(player1, player2, seed, profiles):
+    """Creates the pong_sim match for one pairing."""
+    mode = "survival" if player2 == SURVIVAL_OPPONENT else "classic_ai"
+    difficulty = player2 if player2 in DIFFICULTIES else "medium"
+    player1_difficulty = player1 if player1 in DIFFICULTIES else None
+    state = pong_sim.new_game(mode, difficulty, player1_difficulty, rng=random.Random(seed))
+    if player2 in profiles:
+        state.set_ai(2, *profiles[player2])
+    if player1 in profiles:
+        state.set_ai(1, *profiles[player1])
+    return state
+
+
+def play_match(player1, player2, seed, profiles, max_ticks):
+    """Plays one match; returns (winner 0/1/2, ticks, points, paddle hits, longest rally, peak speed)."""
+    state = new_match(player1, player2, seed, profiles)
+    rally = [0, 0, 0, state.ball.speed_magnitude] # Hits this point, total hits, longest, peak speed
+    points = 0
+
+    def on_events(state, events):
+        nonlocal points
+        for event in events:
+            if event[0] == pong_sim.EVENT_PADDLE_HIT:
+                rally[0] += 1
+                rally[1] += 1
+                rally[2] = max(rally[2], rally[0])
+                rally[3] = max(rally[3], state.ball.speed_magnitude)
+            elif event[0] == pong_sim.EVENT_SCORE:
+                points += 1
+                rally[0] = 0
+
+    if player1 == "tracker":
+        # Inputs change every tick, so this one has to be stepped
+        while not state.game_over and state.ticks < max_ticks:
+            on_events(state, pong_sim.step(state, _tracker_inputs(state)))
+    else:
+        pong_sim.fast_forward(state, max_ticks, on_events=on_events)
+
+    if not state.game_over:
+        winner = 0
+    elif state.mode == "survival" or state.winning_player == "Player 2":
+        winner = 2 # A survival run only ends when the AI gets the ball past player 1
+    else:
+        winner = 1
+    return winner, state.ticks, points, rally[1], rally[2], rally[3]
+
+
+def _new_totals():
+    return {"matches": 0, "wins": [0, 0, 0], "ticks": 0, "points": 0, "hits": 0,
+            "longest_rally": 0, "peak_speed": 0.0, "peak_speed_sum": 0.0}
+
+
+def play_chunk(player1, player2, seed, first, count, profiles, max_ticks):
+    """Plays matches first..first+count-1 of a pairing and returns their summed statistics."""
+    totals = _new_totals()
+    for index in range(first, first + count):
+        winner, ticks, points, hits, longest, peak = play_match(
+            player1, player2, match_seed(seed, player1, player2, index), profiles, max_ticks)
+        totals["matches"] += 1
+        totals["wins"][winner] += 1
+        totals["ticks"] += ticks
+        totals["points"] += points
+        totals["hits"] += hits
+        totals["longest_rally"] = max(totals["longest_rally"], longest)
+        totals["peak_speed"] = max(totals["peak_speed"], peak)
+        totals["peak_speed_sum"] += peak
+    return player1, player2, totals
+
+
+def _merge(into, totals):
+    into["matches"] += totals["matches"]
+    into["wins"] = [a + b for a, b in zip(into["wins"], totals["wins"])]
+    for key in ("ticks", "points", "hits", "peak_speed_sum"):
+        into[key] += totals[key]
+    into["longest_rally"] = max(into["longest_rally"], totals["longest_rally"])
+    into["peak_speed"] = max(into["peak_speed"], totals["peak_speed"])
+
+
+def report_row(player1, player2, totals):
+    """One report line for a finished pairing."""
+    matches = totals["matches"]
+    return {
+        "player1": player1,
+        "player2": player2,
+        "mode": "survival" if player2 == SURVIVAL_OPPONENT else "classic_ai",
+        "matches": matches,
+        "player1_win_rate": round(totals["wins"][1] / matches, 4),
+        "player2_win_rate": round(totals["wins"][2] / matches, 4),
+        "unfinished": totals["wins"][0],
+        "mean_match_seconds": round(totals["ticks"] / matches / pong_sim.TICK_RATE, 2),
+        "mean_rally_hits": round(totals["hits"] / max(totals["points"], 1), 2),
+        "longest_rally_hits": totals["longest_rally"],
+        "mean_peak_speed": round(totals["peak_speed_sum"] / matches, 2),
+        "peak_speed": round(totals["peak_speed"], 2),
+    }
+
+
+def run_tournament(player1s, player2s, matches, seed=0, profiles=None, workers=None,
+                   chunk_size=DEFAULT_CHUNK_SIZE, max_ticks=DEFAULT_MAX_TICKS, on_row=None):
+    """Plays `matches` matches for every pairing across a process pool; returns the report rows.
+
+    `on_row(row)` is called as soon as each pairing has finished, for streaming reports.
+    """
+    profiles = profiles or {}
+    pairings = [(p1, p2) for p1 in player1s for p2 in player2s]
+    totals = {pairing: _new_totals() for pairing in pairings}
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_chunk, p1, p2, seed, first, min(chunk_size, matches - first),
+                               profiles, max_ticks)
+                   for p1, p2 in pairings for first in range(0, matches, chunk_size)]
+        for future in as_completed(futures):
+            player1, player2, chunk = future.result()
+            pairing_totals = totals[(player1, player2)]
+            _merge(pairing_totals, chunk)
+            if pairing_totals["matches"] == matches:
+                row = report_row(player1, player2, pairing_totals)
+                rows.append(row)
+                if on_row is not None:
+                    on_row(row)
+    rows.sort(key=lambda row: pairings.index((row["player1"], row["player2"])))
+    return rows
+
+
+def _check_players(names, allowed, side):
+    for name in names:
+        if name not in allowed:
+            raise SystemExit(f"Unknown {side} opponent {name!r}; choose from {', '.join(allowed)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless PyPong AI tournaments.")
+    parser.add_argument("--player1", nargs="+", default=list(DEFAULT_PLAYER1),
+                        help="left paddle: difficulties, scripted opponents or custom profiles")
+    parser.add_argument("--player2", nargs="+", default=list(DEFAULT_PLAYER2),
+                        help="right paddle: difficulties, 'survival' or custom profiles")
+    parser.add_argument("--profile", action="append", type=parse_profile, default=[],
+                        metavar="NAME=SPEED:REACTION:ERROR", help="define a custom AI profile")
+    parser.add_argument("--matches", type=int, default=200, help="matches per pairing")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="matches per worker task")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS, help="ticks before a match is abandoned")
+    parser.add_argument("--output", help="report file, .csv or .json (default: CSV on stdout)")
+    args = parser.parse_args(argv)
+
+    profiles = dict(args.profile)
+    _check_players(args.player1, DIFFICULTIES + SCRIPTED_OPPONENTS + tuple(profiles), "player 1")
+    _check_players(args.player2, DIFFICULTIES + (SURVIVAL_OPPONENT,) + tuple(profiles), "player 2")
+
+    as_json = args.output is not None and args.output.endswith(".json")
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = None
+    if not as_json:
+        # CSV rows are written (and flushed) as each pairing finishes
+        writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+
+    def on_row(row):
+        print(f"{row['player1']:>10} vs {row['player2']:<10} player 1 wins {row['player1_win_rate']:.1%}",
+              file=sys.stderr)
+        if writer is not None:
+            writer.writerow(row)
+            out.flush()
+
+    start = time.perf_counter()
+    rows = run_tournament(args.player1, args.player2, args.matches, args.seed, profiles,
+                          args.workers, args.chunk_size, args.max_ticks, on_row)
+    elapsed = time.perf_counter() - start
+    if as_json:
+        json.dump({"seed": args.seed, "matches_per_pairing": args.matches, "profiles": profiles,
+                   "results": rows}, out, indent=2)
+        out.write("\n")
+    if out is not sys.stdout:
+        out.close()
+    total = args.matches * len(rows)
+    print(f"{total} matches in {elapsed:.1f}s ({total / elapsed:.0f} matches/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import random
+import statistics
+
+import pytest
+
+import pong_sim
+
+np = pytest.importorskip("numpy")
+import pong_batch  # noqa: E402  (needs NumPy)
+
+
+@pytest.mark.parametrize("player1_difficulty, difficulty", [("medium", "medium"), ("easy", "hard")])
+def test_batch_matches_scalar_statistics(player1_difficulty, difficulty):
+    batch = pong_batch.BatchSim(500, "classic_ai", difficulty, player1_difficulty=player1_difficulty, seed=1)
+    batch.run()
+    summary = batch.summary()
+    assert summary["matches"] == 500
+
+    wins, ticks = 0, []
+    for seed in range(300):
+        state = pong_sim.new_game("classic_ai", difficulty, player1_difficulty=player1_difficulty,
+                                  rng=random.Random(seed))
+        pong_sim.fast_forward(state)
+        wins += state.winning_player == "Player 1"
+        ticks.append(state.ticks)
+
+    # Same rules, different random streams: equal within sampling error (a few standard errors)
+    assert summary["player1_win_rate"] == pytest.approx(wins / 300, abs=0.1)
+    assert summary["mean_ticks"] == pytest.approx(statistics.mean(ticks), rel=0.05)
+    assert np.all(batch.player1_score[batch.winner == 1] == pong_sim.MAX_SCORE)
+    assert np.all(batch.player2_score[batch.winner == 2] == pong_sim.MAX_SCORE)
+
+
+def test_ball_on_a_wall_with_no_vertical_speed_keeps_moving():
+    batch = pong_batch.BatchSim(1, seed=1, serve_delay=0)
+    batch.ball_x[0], batch.ball_y[0] = pong_batch.BALL_START_X, pong_batch.BALL_MAX_Y
+    batch.speed_x[0], batch.speed_y[0] = -5, 0 # On the wall line, so it is swept: a wall time of 0/0
+
+    batch.step()
+
+    assert batch.ball_x[0] == pong_batch.BALL_START_X - 5
+    assert batch.ball_y[0] == pong_batch.BALL_MAX_Y
+    assert batch.speed_y[0] == 0
+
+
+def test_balls_never_leave_the_court():
+    batch = pong_batch.BatchSim(2000, "classic_ai", "hard", player1_difficulty="easy", seed=3)
+    for _ in range(3000):
+        batch.step()
+        assert np.all((batch.ball_y >= 0) & (batch.ball_y <= pong_batch.BALL_MAX_Y))
+        assert np.all((batch.ball_x > -pong_sim.BALL_MAX_AXIS_SPEED) &
+                      (batch.ball_x < pong_sim.SCREEN_WIDTH + pong_sim.BALL_MAX_AXIS_SPEED))
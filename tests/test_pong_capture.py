@@ -0,0 +1,96 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+import pong_capture
+
+SIZE = (8, 6)
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (10, 20, 30)]
+
+
+def new_surface(depth=32):
+    return pygame.Surface(SIZE, 0, depth)
+
+
+def rgb_frame(color):
+    return bytes(color) * (SIZE[0] * SIZE[1])
+
+
+@pytest.mark.parametrize("depth", [32, 24]) # Copied straight out of the pixel buffer, or converted first
+def test_png_frames_are_written_by_the_workers(tmp_path, depth):
+    surface = new_surface(depth)
+    capture = pong_capture.FrameCapture(surface, str(tmp_path), workers=2, block=True)
+    for color in COLORS:
+        surface.fill(color)
+        assert capture.capture(surface)
+    capture.close()
+
+    assert sorted(os.listdir(tmp_path)) == [f"frame_{i:06d}.png" for i in range(len(COLORS))]
+    for i, color in enumerate(COLORS):
+        image = pygame.image.load(str(tmp_path / f"frame_{i:06d}.png"))
+        assert image.get_size() == SIZE
+        assert image.get_at((3, 2))[:3] == color
+    stats = capture.stats()
+    assert (stats["frames"], stats["dropped"], stats["encoded"]) == (len(COLORS), 0, len(COLORS))
+    assert capture.error is None
+
+
+def test_raw_frames_keep_capture_order(tmp_path):
+    surface = new_surface()
+    output = tmp_path / "frames.rgb"
+    capture = pong_capture.FrameCapture(surface, str(output), "raw", workers=3, block=True)
+    colors = COLORS * 5
+    for color in colors:
+        surface.fill(color)
+        capture.capture(surface)
+    capture.close()
+
+    assert output.read_bytes() == b"".join(rgb_frame(color) for color in colors)
+    assert capture.encoded == len(colors)
+
+
+def test_frames_are_dropped_while_every_slot_is_busy(tmp_path):
+    surface = new_surface()
+    output = tmp_path / "frames.rgb"
+    # One slot for the frame being encoded and one for the queue
+    capture = pong_capture.FrameCapture(surface, str(output), "raw", workers=1, queue_frames=1)
+    with capture._turn: # Holds the worker at its write, so no slot comes free
+        results = []
+        for color in COLORS[:3]:
+            surface.fill(color)
+            results.append(capture.capture(surface))
+            while not capture._queue.empty(): # Let the worker take it
+                time.sleep(0.001)
+    capture.close()
+
+    assert results == [True, True, False]
+    assert (capture.frames, capture.dropped, capture.encoded) == (2, 1, 2)
+    assert output.read_bytes() == rgb_frame(COLORS[0]) + rgb_frame(COLORS[1])
+
+
+def test_close_without_waiting_flushes_in_the_background(tmp_path):
+    surface = new_surface()
+    capture = pong_capture.FrameCapture(surface, str(tmp_path), workers=2, block=True)
+    for color in COLORS:
+        surface.fill(color)
+        capture.capture(surface)
+    capture.close(wait=False)
+    assert not capture.capture(surface) # Closing: no new frames
+
+    capture.close() # Waits for the same close to finish
+    assert capture.finished is not None
+    assert capture.encoded == len(COLORS)
+    assert len(os.listdir(tmp_path)) == len(COLORS)
+    assert not any(worker.is_alive() for worker in capture._workers)
+
+
+def test_frames_of_another_size_are_dropped(tmp_path):
+    capture = pong_capture.FrameCapture(new_surface(), str(tmp_path), block=True)
+    assert not capture.capture(pygame.Surface((4, 4), 0, 32))
+    capture.close()
+    assert (capture.frames, capture.dropped) == (0, 1)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,113 @@
+import pytest
+
+import pong_env
+
+np = pytest.importorskip("numpy")
+
+
+def test_pong_env_reset_and_step():
+    env = pong_env.PongEnv(seed=1)
+    observation, info = env.reset()
+    assert len(observation) == pong_env.OBSERVATION_SIZE
+    assert env.observation_space.contains(observation)
+    assert info == {}
+
+    observation, reward, terminated, truncated, info = env.step(pong_env.ACTION_DOWN)
+    assert len(observation) == pong_env.OBSERVATION_SIZE
+    assert (reward, terminated, truncated) == (0.0, False, False)
+    assert observation[4] > 0.5 # The agent's paddle moved down from the center
+
+
+def test_pong_env_point_episode_terminates_on_a_point():
+    env = pong_env.PongEnv(frame_skip=4, seed=2)
+    env.reset()
+    for _ in range(10_000):
+        _, reward, terminated, truncated, _ = env.step(pong_env.ACTION_STAY)
+        if terminated:
+            break
+    assert terminated and not truncated
+    assert reward in (1.0, -1.0)
+
+
+def test_pong_env_truncates_after_max_episode_ticks():
+    env = pong_env.PongEnv(frame_skip=3, max_episode_ticks=9, seed=3)
+    env.reset()
+    results = [env.step(pong_env.ACTION_STAY)[2:4] for _ in range(3)]
+    assert results == [(False, False), (False, False), (False, True)]
+
+
+def test_vec_env_shapes():
+    env = pong_env.VecPongEnv(5, seed=1)
+    observations, info = env.reset()
+    assert observations.shape == (5, pong_env.OBSERVATION_SIZE)
+    assert observations.dtype == np.float32
+    assert info == {}
+
+    observations, rewards, terminated, truncated, info = env.step(np.full(5, pong_env.ACTION_UP))
+    assert observations.shape == (5, pong_env.OBSERVATION_SIZE)
+    assert rewards.shape == terminated.shape == truncated.shape == (5,)
+    assert terminated.dtype == truncated.dtype == bool
+    assert np.all(observations[:, 4] < 0.5)
+    assert "final_observation" not in info
+
+
+def test_vec_env_masks_an_env_once_its_point_ends():
+    # The same matches one tick per step show exactly where each point ended
+    env = pong_env.VecPongEnv(16, frame_skip=8, seed=4)
+    reference = pong_env.VecPongEnv(16, frame_skip=1, seed=4)
+    env.reset()
+    reference.reset()
+    actions = np.random.default_rng(4)
+    for _ in range(500):
+        action = actions.integers(0, 3, 16)
+        observations, rewards, terminated, truncated, info = env.step(action)
+        reference_rewards = np.zeros(16, dtype=np.float32)
+        reference_final = np.zeros((16, pong_env.OBSERVATION_SIZE), dtype=np.float32)
+        reference_ended = np.zeros(16, dtype=bool)
+        for _ in range(8):
+            _, step_rewards, step_terminated, _, step_info = reference.step(action)
+            first = step_terminated & ~reference_ended
+            reference_rewards += np.where(reference_ended, 0, step_rewards)
+            reference_final[first] = step_info.get("final_observation", reference_final)[first]
+            reference_ended |= step_terminated
+        assert np.array_equal(terminated, reference_ended)
+        if terminated.any():
+            break
+    assert terminated.any()
+
+    # Each ended env keeps its point and how it ended, and its paddle stopped there
+    final = info["final_observation"]
+    assert np.array_equal(rewards, reference_rewards)
+    assert np.array_equal(final[terminated], reference_final[terminated])
+    assert np.array_equal(observations[terminated, 4], final[terminated, 4])
+    assert np.all(env.episode_ticks[terminated] == 0)
+
+
+def test_vec_env_truncates_and_restarts_matches():
+    env = pong_env.VecPongEnv(3, episode="match", frame_skip=2, max_episode_ticks=6, seed=5)
+    env.reset()
+    for _ in range(2):
+        _, _, terminated, truncated, info = env.step(np.full(3, pong_env.ACTION_DOWN))
+        assert not truncated.any()
+    observations, _, terminated, truncated, info = env.step(np.full(3, pong_env.ACTION_DOWN))
+    assert truncated.all() and not terminated.any()
+    assert np.all(info["final_observation"][:, 4] > 0.5)
+    # Restarted: paddles back in the center and the clock at zero
+    assert np.allclose(observations[:, 4], 0.5)
+    assert np.all(env.episode_ticks == 0)
+
+
+def test_vec_env_match_episode_auto_resets():
+    env = pong_env.VecPongEnv(4, episode="match", frame_skip=8, seed=1)
+    env.reset()
+    for _ in range(1000):
+        _, rewards, terminated, truncated, info = env.step(np.full(4, pong_env.ACTION_STAY))
+        if terminated.any():
+            break
+    assert terminated.any() and not truncated[terminated].any()
+    assert np.all(rewards[terminated] == -1) # A paddle that never moves loses the match
+    sim = env.sim
+    assert np.all(sim.player1_score[terminated] == 0)
+    assert np.all(sim.player2_score[terminated] == 0)
+    assert not sim.done[terminated].any()
+    assert np.all(env.episode_ticks[terminated] == 0)
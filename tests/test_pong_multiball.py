@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import pong_multiball
+import pong_sim
+from pong_multiball import GRID_CELL, BALL_SIZE
+
+
+def new_game(ball_count, seed=1):
+    return pong_multiball.new_game(difficulty="medium", rng=random.Random(seed), serve_delay=0,
+                                   ball_count=ball_count)
+
+
+def place(state, i, x, y, speed_x, speed_y):
+    balls = state.balls
+    balls.x[i], balls.y[i] = float(x), float(y)
+    balls.speed_x[i], balls.speed_y[i] = float(speed_x), float(speed_y)
+    balls.active[i] = True
+
+
+def test_rules_for_picks_the_mode_rules():
+    assert pong_multiball.rules_for(pong_multiball.MULTI_BALL_MODE) is pong_multiball.MULTI_BALL_RULES
+    assert pong_multiball.rules_for("classic_ai") is pong_multiball.SIM_RULES
+    state = pong_multiball.rules_for(pong_multiball.MULTI_BALL_MODE).new_game(rng=random.Random(1))
+    assert isinstance(state, pong_multiball.MultiBallState)
+    assert pong_multiball.SIM_RULES.step is pong_sim.step
+
+
+# Second ball's offset from the first, which sits just before a cell corner
+@pytest.mark.parametrize("dx, dy", [
+    (BALL_SIZE - 4, 0), # Across a column boundary
+    (0, BALL_SIZE - 4), # Across a row boundary
+    (12, 12),           # Into the diagonal cell
+])
+def test_touching_balls_in_neighbouring_cells_bounce(dx, dy):
+    state = new_game(2)
+    x, y = 10 * GRID_CELL - 2, 10 * GRID_CELL - 2
+    place(state, 0, x, y, 4, 3)
+    place(state, 1, x + dx, y + dy, -4, -3)
+    balls = state.balls
+    assert int(balls.x[0] // GRID_CELL) != int(balls.x[1] // GRID_CELL) or dx == 0
+    assert int(balls.y[0] // GRID_CELL) != int(balls.y[1] // GRID_CELL) or dy == 0
+
+    assert pong_multiball._collide_balls(balls) == 1
+
+    # Now moving apart along the line between the centers, and just as fast
+    assert (balls.speed_x[1] - balls.speed_x[0]) * dx + (balls.speed_y[1] - balls.speed_y[0]) * dy > 0
+    assert balls.speed_x[0] + balls.speed_x[1] == pytest.approx(0)
+    assert balls.speed_y[0] + balls.speed_y[1] == pytest.approx(0)
+
+
+def test_balls_moving_apart_or_out_of_reach_do_not_bounce():
+    state = new_game(3)
+    place(state, 0, 500, 300, -4, 0)
+    place(state, 1, 510, 300, 4, 0)             # Overlapping ball 0 but already separating
+    place(state, 2, 500 - BALL_SIZE, 300, 4, 0) # Closing on ball 0 but a full diameter away
+
+    assert pong_multiball._collide_balls(state.balls) == 0
+    assert state.balls.speed_x == [-4, 4, 4]
+
+
+def test_simultaneous_goals_all_score():
+    state = new_game(4)
+    place(state, 0, 2, 100, -5, 1)                                  # Past paddle 1: player 2 scores
+    place(state, 1, 3, 500, -5, -1)                                 # Same goal, same tick
+    place(state, 2, pong_sim.SCREEN_WIDTH - BALL_SIZE - 2, 300, 5, 0) # Past paddle 2: player 1 scores
+    place(state, 3, 500, 300, 3, 0)                                 # Still in play
+
+    events = pong_multiball.step(state)
+
+    assert [event for event in events if event[0] == pong_sim.EVENT_SCORE] == [
+        (pong_sim.EVENT_SCORE, 2), (pong_sim.EVENT_SCORE, 2), (pong_sim.EVENT_SCORE, 1)]
+    assert (state.player1_score, state.player2_score) == (1, 2)
+    assert state.balls.active == [False, False, False, True]
+    assert state.balls.serve_timer[:3] == [state.reserve_delay] * 3
+    for i in range(3):
+        assert state.balls.x[i] == pong_sim.SCREEN_WIDTH // 2 - BALL_SIZE // 2
@@ -0,0 +1,108 @@
+import pytest
+
+import pong_net
+import pong_sim
+
+# (round trip, jitter, loss): a clean link, a typical LAN/Wi-Fi link and a bad one
+CONDITIONS = [(0.0, 0.0, 0.0), (0.08, 0.02, 0.05), (0.2, 0.05, 0.15)]
+
+
+@pytest.mark.parametrize("rtt, jitter, loss", CONDITIONS)
+def test_loopback_converges(rtt, jitter, loss):
+    for seed in range(1, 4):
+        result = pong_net.run_loopback(rtt, jitter, loss, ticks=1200, seed=seed, max_seconds=30.0)
+        assert result["converged"], result
+        assert result["ticks"] == 1200
+        assert not result["desynced"] and not result["errors"]
+        if rtt:
+            # Inputs arrive late, so both sides must have predicted and rolled back
+            assert min(result["rollbacks"]) > 0
+        if loss:
+            assert sum(result["packets_dropped"]) > 0
+
+
+def test_loopback_plays_to_game_over():
+    result = pong_net.run_loopback(0.08, 0.02, 0.05, ticks=100_000, seed=3, max_seconds=30.0)
+    assert result["converged"], result
+    assert result["ticks"] < 100_000
+    assert pong_sim.MAX_SCORE in result["score"]
+
+
+class FakeTransport:
+    """Hands the session whatever datagrams a test queues, and keeps what it sends."""
+
+    def __init__(self, peer=None):
+        self.peer = peer
+        self.inbox = []
+        self.sent = [] # (datagram, address it went to)
+
+    def send(self, data, address=None):
+        self.sent.append((data, address or self.peer))
+
+    def receive(self):
+        datagrams, self.inbox = self.inbox, []
+        return datagrams
+
+    def close(self):
+        pass
+
+
+def packet(kind, body=b""):
+    return pong_net._HEADER.pack(pong_net._MAGIC, kind) + body
+
+
+def sent_kinds(transport):
+    return [pong_net._HEADER.unpack_from(data)[1] for data, _ in transport.sent]
+
+
+def test_short_or_truncated_inputs_are_ignored():
+    transport = FakeTransport(("peer", 1))
+    session = pong_net.NetplaySession(transport, 1, seed=1, clock=lambda: 0.0)
+    session.begin(pong_sim.new_game("two_player", serve_delay=0))
+
+    transport.inbox.append((packet(pong_net._INPUTS, b"\x00" * (pong_net._INPUTS_BODY.size - 1)), ("peer", 1)))
+    session.poll()
+    assert session.remote_inputs == []
+
+    # Says 10 inputs follow, but only 3 made it
+    body = pong_net._INPUTS_BODY.pack(0, 0, 0, 0, 10) + bytes([2, 0, 1])
+    transport.inbox.append((packet(pong_net._INPUTS, body), ("peer", 1)))
+    session.poll()
+    assert session.remote_inputs == [1, -1, 0]
+    assert session.peer_lead == 3
+
+
+def test_host_turns_away_another_protocol_version(monkeypatch):
+    host_transport = FakeTransport()
+    host = pong_net.NetplaySession(host_transport, 1, seed=1, clock=lambda: 0.0)
+    stranger = ("10.0.0.9", 50601)
+    hello = packet(pong_net._HELLO, pong_net._HELLO_BODY.pack(pong_net.PROTOCOL_VERSION + 1))
+    host_transport.inbox.append((hello, stranger))
+    host.poll()
+    assert not host.connected and host_transport.peer is None # Still waiting for a real opponent
+    assert sent_kinds(host_transport) == [pong_net._START]
+    answer, address = host_transport.sent[0]
+    assert address == stranger
+
+    # The stranger runs the other version, and gives up on the host's START
+    monkeypatch.setattr(pong_net, "PROTOCOL_VERSION", pong_net.PROTOCOL_VERSION + 1)
+    join_transport = FakeTransport(("host", pong_net.NETPLAY_PORT))
+    joiner = pong_net.NetplaySession(join_transport, 2, clock=lambda: 0.0)
+    join_transport.inbox.append((answer, join_transport.peer))
+    joiner.poll()
+    assert joiner.closed and not joiner.connected
+    assert joiner.error == "The host runs a different version of the game"
+
+
+def test_join_gives_up_when_the_host_never_answers():
+    now = [0.0]
+    transport = FakeTransport(("host", pong_net.NETPLAY_PORT))
+    joiner = pong_net.NetplaySession(transport, 2, clock=lambda: now[0])
+    while now[0] < pong_net.CONNECT_TIMEOUT_SECONDS:
+        joiner.poll()
+        assert not joiner.closed
+        now[0] += 0.5
+    now[0] += 0.5
+    joiner.poll()
+    assert joiner.closed and joiner.error == "No answer from the host"
+    assert set(sent_kinds(transport)) == {pong_net._HELLO}
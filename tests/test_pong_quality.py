@@ -0,0 +1,72 @@
+import pong_quality
+
+LEVELS = pong_quality.shed_levels({"particles": True, "trails": True}, [("particles", False), ("trails", False)])
+BUDGET_MS = 10.0 # Sheds above 9 ms, restores below 6 ms
+SLOW_MS, MIDDLE_MS, FAST_MS = 9.5, 7.0, 3.0
+
+
+def new_governor(**options):
+    options = {"window": 4, "restore_wait": 10, "max_restore_wait": 25, **options}
+    return pong_quality.QualityGovernor(LEVELS, BUDGET_MS, **options)
+
+
+def feed(governor, frame_ms, frames):
+    """Observes `frames` frames of `frame_ms`; returns the (1-based) frames that changed the level."""
+    return [frame for frame in range(1, frames + 1) if governor.observe(frame_ms)]
+
+
+def test_shed_levels_turn_off_one_setting_per_level():
+    assert LEVELS == [{"particles": True, "trails": True},
+                      {"particles": False, "trails": True},
+                      {"particles": False, "trails": False}]
+
+
+def test_slow_frames_shed_one_level_per_window():
+    governor = new_governor()
+    assert feed(governor, SLOW_MS, 3) == [] # Window not full yet
+    assert feed(governor, SLOW_MS, 1) == [1]
+    assert governor.settings == LEVELS[1]
+    assert feed(governor, SLOW_MS, 8) == [4] # Each change starts a fresh window
+    assert governor.level == 2
+    assert feed(governor, SLOW_MS, 20) == [] # Nothing left to shed
+
+
+def test_a_single_slow_frame_does_not_shed():
+    governor = new_governor(window=20) # The 90th percentile of 20 frames skips the worst one
+    assert feed(governor, FAST_MS, 19) == []
+    assert feed(governor, 50.0, 1) == []
+    assert feed(governor, SLOW_MS, 1) == [1]
+
+
+def test_restores_only_after_waiting_with_headroom():
+    governor = new_governor()
+    feed(governor, SLOW_MS, 4)
+    assert feed(governor, MIDDLE_MS, 40) == [] # Between the thresholds: hold
+    governor = new_governor()
+    feed(governor, SLOW_MS, 4)
+    assert feed(governor, FAST_MS, 20) == [10] # restore_wait frames at the level
+    assert governor.level == 0 and governor.last_change == "restore"
+
+
+def test_a_restore_that_does_not_hold_doubles_the_wait():
+    governor = new_governor()
+    feed(governor, SLOW_MS, 4)
+    feed(governor, FAST_MS, 10)
+    assert feed(governor, SLOW_MS, 4) == [4] # Too slow again right after the restore
+    assert governor.restore_wait == 20
+    assert feed(governor, FAST_MS, 20) == [20]
+
+    assert feed(governor, SLOW_MS, 4) == [4]
+    assert governor.restore_wait == 25 # Capped at max_restore_wait
+    assert feed(governor, FAST_MS, 25) == [25]
+    governor.reset()
+    assert (governor.level, governor.restore_wait, governor.last_change) == (0, 10, None)
+
+
+def test_a_shed_long_after_a_restore_keeps_the_wait():
+    governor = new_governor()
+    feed(governor, SLOW_MS, 4)
+    assert feed(governor, FAST_MS, 10) == [10]
+    assert feed(governor, FAST_MS, 30) == [] # The restore held
+    assert feed(governor, SLOW_MS, 1) == [1] # A new load, not a failed restore
+    assert governor.restore_wait == 10
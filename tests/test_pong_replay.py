@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import pong_multiball
+import pong_replay
+import pong_sim
+
+
+def record_match(mode, seed, player1_difficulty=None, max_ticks=20_000):
+    """Plays a match with players that change direction at random, recording it."""
+    rules = pong_multiball.rules_for(mode)
+    state = rules.new_game(mode, "medium", player1_difficulty, rng=random.Random(seed))
+    recorder = pong_replay.ReplayRecorder.for_game(state, seed, pong_sim.SERVE_DELAY_TICKS, "classic")
+    players = random.Random(seed + 1000)
+    inputs = (0, 0)
+    while not state.game_over and state.ticks < max_ticks:
+        if players.random() < 1 / 30:
+            inputs = (players.choice((-1, 0, 1)), players.choice((-1, 0, 1)))
+        recorder.record(state.ticks, inputs)
+        rules.step(state, inputs)
+    return recorder.finish(state), state
+
+
+@pytest.mark.parametrize("mode, player1_difficulty", [
+    ("two_player", None),
+    ("classic_ai", None),
+    ("classic_ai", "hard"),
+    ("survival", None),
+    (pong_multiball.MULTI_BALL_MODE, None),
+])
+def test_record_save_load_verify(tmp_path, mode, player1_difficulty):
+    replay, state = record_match(mode, 11, player1_difficulty)
+    path = tmp_path / f"match{pong_replay.REPLAY_EXTENSION}"
+    replay.save(path)
+
+    loaded = pong_replay.Replay.load(path)
+    assert (loaded.mode, loaded.difficulty, loaded.player1_difficulty, loaded.arena, loaded.seed) == \
+        (mode, "medium", player1_difficulty, "classic", 11)
+    assert loaded.changes == replay.changes
+    assert loaded.final_ticks == state.ticks
+    assert loaded.verify()
+    played = loaded.run()
+    assert (played.player1_score, played.player2_score) == (state.player1_score, state.player2_score)
+    assert pong_replay.state_digest(played) == pong_replay.state_digest(state)
+
+
+def test_cli_reports_verified_and_desync(tmp_path, capsys):
+    replay, _ = record_match("two_player", 4)
+    good = tmp_path / "good.pprp"
+    replay.save(good)
+    assert pong_replay.main([str(good)]) == 0
+    assert "verified" in capsys.readouterr().out
+
+    # Another seed serves differently, so the match can't end with the recorded digest
+    replay.seed += 1
+    tampered = tmp_path / "tampered.pprp"
+    replay.save(tampered)
+    assert pong_replay.main([str(tampered)]) == 1
+    assert "DESYNC" in capsys.readouterr().out
@@ -0,0 +1,143 @@
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+import pong_multiball
+import pong_sim
+from pong_shared import GAME_STATES, SharedStateReader, SharedStateWriter
+
+ROOT = os.path.dirname(os.path.abspath(pong_sim.__file__))
+
+# The reader runs in its own process, as it would beside a running game
+READ_BACK = """
+import json, sys
+from pong_shared import SharedStateReader
+reader = SharedStateReader(sys.argv[1])
+state = reader.read_state()
+frame = reader.read_frame()
+print(json.dumps({
+    "ticks": state.ticks, "game_state": state.game_state, "mode": state.mode, "arena": state.arena,
+    "score": [state.player1_score, state.player2_score], "winning_player": state.winning_player,
+    "game_over": state.game_over, "paddles": [state.paddle1_y, state.paddle2_y], "balls": state.balls,
+    "frame": frame and [frame[0], frame[1].hex()],
+}))
+reader.close()
+"""
+
+# Creates a segment and exits without removing it, like a game killed along with its
+# resource tracker (which would otherwise remove the segment)
+ABANDON = """
+import os, sys
+from multiprocessing import resource_tracker
+from pong_shared import SharedStateWriter
+writer = SharedStateWriter(sys.argv[1])
+resource_tracker.unregister(writer.memory._name, "shared_memory")
+os._exit(0)
+"""
+
+
+def run_python(script, name):
+    return subprocess.run([sys.executable, "-c", script, name], capture_output=True, text=True,
+                          check=True, cwd=ROOT).stdout
+
+
+def read_back(name):
+    return json.loads(run_python(READ_BACK, name))
+
+
+def segment_name():
+    return f"pypong-test-{uuid.uuid4().hex[:8]}"
+
+
+def front_end_game_states():
+    with open(os.path.join(ROOT, "PyPongBeta0.13.py"), encoding="utf-8") as f:
+        source = f.read()
+    return set(re.findall(r'game_state (?:=|==|!=) "(\w+)"', source))
+
+
+def test_finished_match_round_trip():
+    for mode, winner in (("classic_ai", ("Player 1", "Player 2")), ("survival", ("You",))):
+        state = pong_sim.new_game(mode, "hard", player1_difficulty="easy", rng=random.Random(3))
+        pong_sim.run_match(state)
+        assert state.game_over and state.winning_player in winner
+
+        writer = SharedStateWriter(segment_name(), max_balls=4, frame_size=(4, 2))
+        try:
+            writer.publish_state(state, "game_over", arena="table_tennis")
+            writer.publish_frame(bytes(range(24)))
+            shared = read_back(writer.name)
+        finally:
+            writer.close()
+        assert shared["ticks"] == state.ticks
+        assert (shared["game_state"], shared["mode"], shared["arena"]) == ("game_over", mode, "table_tennis")
+        assert shared["score"] == [state.player1_score, state.player2_score]
+        assert shared["winning_player"] == state.winning_player
+        assert shared["game_over"] is True
+        assert shared["paddles"] == [state.paddle1.y, state.paddle2.y]
+        assert shared["balls"] == []
+        assert shared["frame"] == [1, bytes(range(24)).hex()]
+
+
+def test_multi_ball_round_trip():
+    state = pong_multiball.new_game(rng=random.Random(5))
+    for _ in range(200):
+        pong_multiball.step(state)
+    writer = SharedStateWriter(segment_name(), max_balls=8)
+    try:
+        writer.publish_state(state, "game_running")
+        shared = read_back(writer.name)
+    finally:
+        writer.close()
+    assert shared["winning_player"] is None and shared["game_over"] is False
+    assert shared["frame"] is None
+    count = min(len(state.balls.x), 8)
+    assert shared["balls"] == [list(ball) for ball in zip(state.balls.x[:count], state.balls.y[:count],
+                                                          state.balls.speed_x[:count], state.balls.speed_y[:count])]
+
+
+def test_every_front_end_game_state_round_trips():
+    names = front_end_game_states()
+    assert "single_player_difficulty_select" in names and "netplay_connecting" in names
+    assert names <= set(GAME_STATES)
+    state = pong_sim.new_game("classic_ai")
+    writer = SharedStateWriter(segment_name(), max_balls=1)
+    try:
+        for name in GAME_STATES:
+            writer.publish_state(state, name)
+            assert read_back(writer.name)["game_state"] == name
+        with pytest.raises(ValueError):
+            writer.publish_state(state, "not_a_state")
+        with pytest.raises(ValueError):
+            writer.publish_state(state, "menu", arena="an_arena_name_too_long")
+    finally:
+        writer.close()
+
+
+def test_running_game_keeps_its_segment():
+    writer = SharedStateWriter(segment_name(), max_balls=1)
+    try:
+        writer.publish_state(pong_sim.new_game("classic_ai"), "menu")
+        with pytest.raises(FileExistsError, match=str(os.getpid())):
+            SharedStateWriter(writer.name, max_balls=1)
+        assert read_back(writer.name)["game_state"] == "menu"
+    finally:
+        writer.close()
+
+
+def test_segment_of_an_exited_game_is_reclaimed():
+    name = segment_name()
+    run_python(ABANDON, name)
+    abandoned = SharedStateReader(name) # Still there, header and all
+    abandoned.close()
+    writer = SharedStateWriter(name, max_balls=1)
+    try:
+        writer.publish_state(pong_sim.new_game("classic_ai"), "splash")
+        assert read_back(name)["game_state"] == "splash"
+    finally:
+        writer.close()
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+import pong_sim
+
+# (mode, difficulty, player1_difficulty, held inputs, tick rate)
+MATCHES = [
+    ("classic_ai", "hard", "easy", (0, 0), pong_sim.TICK_RATE),
+    ("classic_ai", "medium", "medium", (0, 0), 120),
+    ("survival", "easy", None, (1, 0), pong_sim.TICK_RATE),
+    ("survival", "hard", None, (0, 0), pong_sim.TICK_RATE),
+    ("two_player", "medium", None, (1, -1), pong_sim.TICK_RATE),
+]
+
+
+def new_game(mode, difficulty, player1_difficulty, tick_rate, seed):
+    return pong_sim.new_game(mode, difficulty, player1_difficulty=player1_difficulty, rng=random.Random(seed),
+                             tick_rate=tick_rate)
+
+
+def assert_same_match(stepped, forwarded):
+    assert forwarded.ticks == stepped.ticks
+    assert (forwarded.player1_score, forwarded.player2_score) == (stepped.player1_score, stepped.player2_score)
+    assert forwarded.winning_player == stepped.winning_player
+    assert forwarded.game_over == stepped.game_over
+    assert forwarded.paddle1.y == pytest.approx(stepped.paddle1.y, abs=1e-6)
+    assert forwarded.paddle2.y == pytest.approx(stepped.paddle2.y, abs=1e-6)
+    assert forwarded.ball.x == pytest.approx(stepped.ball.x, abs=1e-6)
+    assert forwarded.ball.y == pytest.approx(stepped.ball.y, abs=1e-6)
+
+
+@pytest.mark.parametrize("mode, difficulty, player1_difficulty, inputs, tick_rate", MATCHES)
+def test_fast_forward_matches_run_match(mode, difficulty, player1_difficulty, inputs, tick_rate):
+    for seed in range(10):
+        stepped = new_game(mode, difficulty, player1_difficulty, tick_rate, seed)
+        forwarded = new_game(mode, difficulty, player1_difficulty, tick_rate, seed)
+        pong_sim.run_match(stepped, inputs=inputs)
+        pong_sim.fast_forward(forwarded, inputs=inputs)
+        assert stepped.game_over
+        assert_same_match(stepped, forwarded)
+
+
+def test_fast_forward_stops_at_max_ticks():
+    for max_ticks in (1, 89, 90, 1234):
+        stepped = new_game("classic_ai", "hard", "hard", pong_sim.TICK_RATE, 7)
+        forwarded = new_game("classic_ai", "hard", "hard", pong_sim.TICK_RATE, 7)
+        pong_sim.run_match(stepped, max_ticks=max_ticks)
+        pong_sim.fast_forward(forwarded, max_ticks=max_ticks)
+        assert forwarded.ticks == max_ticks
+        assert_same_match(stepped, forwarded)
+
+
+def rounded(tick, event):
+    # Paddle hit positions come out of a coasted stretch, so they match up to float rounding
+    return (tick,) + tuple(round(value, 6) if isinstance(value, float) else value for value in event)
+
+
+def test_fast_forward_reports_every_event():
+    stepped = new_game("classic_ai", "medium", "easy", pong_sim.TICK_RATE, 3)
+    expected = []
+    while not stepped.game_over:
+        events = pong_sim.step(stepped)
+        expected.extend(rounded(stepped.ticks, event) for event in events)
+
+    forwarded = new_game("classic_ai", "medium", "easy", pong_sim.TICK_RATE, 3)
+    reported = []
+    pong_sim.fast_forward(forwarded, on_events=lambda state, events: reported.extend(
+        rounded(state.ticks, event) for event in events))
+    assert reported == expected
+    assert expected[-1][1] == pong_sim.EVENT_GAME_OVER
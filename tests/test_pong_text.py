@@ -0,0 +1,54 @@
+import pong_text
+
+
+class FakeFont:
+    """Stands in for a pygame font: records what it renders and returns a fresh object each time."""
+
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, text, antialias, color):
+        self.rendered.append((text, antialias, color))
+        return object()
+
+
+def test_repeated_text_is_rendered_once():
+    font = FakeFont()
+    cache = pong_text.TextCache()
+    first = cache.render(font, "Score", (255, 255, 255))
+    assert cache.render(font, "Score", (255, 255, 255)) is first
+    assert font.rendered == [("Score", True, (255, 255, 255))]
+
+    # Any part of the key differing is another string to render
+    cache.render(font, "Score", (255, 0, 0))
+    cache.render(font, "Score", (255, 255, 255), antialias=False)
+    cache.render(FakeFont(), "Score", (255, 255, 255))
+    assert len(font.rendered) == 3
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_least_recently_used_text_is_evicted_first():
+    font = FakeFont()
+    cache = pong_text.TextCache(max_entries=3)
+    surfaces = {text: cache.render(font, text, (0, 0, 0)) for text in ("a", "b", "c")}
+    cache.render(font, "a", (0, 0, 0)) # "b" is now the least recently used
+    cache.render(font, "d", (0, 0, 0))
+    assert len(cache) == 3
+
+    assert cache.render(font, "a", (0, 0, 0)) is surfaces["a"]
+    assert cache.render(font, "c", (0, 0, 0)) is surfaces["c"]
+    assert cache.render(font, "b", (0, 0, 0)) is not surfaces["b"] # Rendered again
+    assert [text for text, _, _ in font.rendered] == ["a", "b", "c", "d", "b"]
+
+
+def test_stats_count_hits_and_misses():
+    font = FakeFont()
+    cache = pong_text.TextCache()
+    assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+    for text in ("1", "1", "1", "2"):
+        cache.render(font, text, (0, 0, 0))
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 2, "hit_rate": 0.5}
+
+    cache.clear() # Drops the surfaces but keeps counting
+    cache.render(font, "1", (0, 0, 0))
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 3, "hit_rate": 0.4}